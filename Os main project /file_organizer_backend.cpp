@@ -5,8 +5,1553 @@
 #include <ctime>
 #include <cstring>
 #include <map>
+#include <tuple>
+#include <unordered_map>
 #include <chrono>
 #include <algorithm>  
+#include <atomic>
+#include <thread>
+#include <set>
+#include <mutex>
+#include <condition_variable>
+#include <cstdio>
+#include <fstream>
+#include <sstream>
+#include <regex>
+#include <memory>
+#include <limits>
+#include <sys/stat.h>
+#include <cerrno>
+#if defined(_WIN32)
+#include <io.h>
+#else
+#include <unistd.h>
+#endif
+#if defined(__linux__)
+#include <fcntl.h>
+#include <sys/ioctl.h>
+#include <sys/sendfile.h>
+#ifndef FICLONE
+#define FICLONE _IOW(0x94, 9, int)
+#endif
+#endif
+
+
+struct FileRecord {
+    const char* name;
+    const char* path;
+    unsigned long long size;
+    double modified;
+    long long modified_ns;
+    double created;
+    int is_dir;
+    const char* sniffed;  // Extension found from the content of files the name doesn't categorize, or null
+    const char* category;  // Category under the rules in use, after sniffing
+};
+
+struct DirectoryListing {
+    FileRecord* records;
+    size_t count;
+    char* strings;
+};
+
+// How a file was copied, fastest first. Returned by copy_file_with().
+enum CopyStrategy {
+    COPY_FAILED = -1,
+    COPY_REFLINK = 0,      // FICLONE: shares extents on btrfs/XFS, no data is copied
+    COPY_FILE_RANGE = 1,   // copy_file_range: in-kernel copy, may be offloaded by the filesystem
+    COPY_SENDFILE = 2,     // sendfile: in-kernel copy through the page cache
+    COPY_BUFFERED = 3,     // read/write loop with a large buffer
+    COPY_FILESYSTEM = 4,   // std::filesystem::copy (directories, non-Linux platforms)
+    COPY_AUTO = -2         // try the strategies above in order
+};
+
+static const size_t COPY_BUFFER_SIZE = 1 << 20;
+
+// Outcome of an organize run with progress reporting.
+enum OrganizeResult {
+    ORGANIZE_OK = 0,
+    ORGANIZE_PARTIAL = 1,     // finished, but some files failed
+    ORGANIZE_CANCELLED = 2,
+    ORGANIZE_ERROR = 3        // nothing was organized (unreadable directory, ...)
+};
+
+// How an organize treats files whose target already exists.
+enum OrganizeIncremental {
+    INCREMENTAL_OFF = 0,       // overwrite every target
+    INCREMENTAL_METADATA = 1,  // skip targets with the same size and mtime
+    INCREMENTAL_CONTENT = 2    // ...and also skip same-size targets with the same content
+};
+
+// What an organize run did, filled in for the caller when requested.
+struct OrganizeCounts {
+    unsigned long long created;    // target did not exist
+    unsigned long long updated;    // target existed but differed
+    unsigned long long unchanged;  // target already up to date; a move only removes the source
+};
+
+// Called with (files done, files total, bytes done, bytes total).
+typedef void (*ProgressCallback)(unsigned long long, unsigned long long, unsigned long long, unsigned long long);
+
+// Shared between the caller and the organize workers, which check it between files.
+struct CancelToken {
+    std::atomic<int> cancelled{0};
+};
+
+// Completed operations are fsynced to the journal in batches of this size, or
+// at least this often.
+static const size_t JOURNAL_SYNC_ENTRIES = 256;
+static const auto JOURNAL_SYNC_INTERVAL = std::chrono::seconds(1);
+
+// Files a recursive organize plans, journals and executes at a time.
+static const size_t ORGANIZE_BATCH_SIZE = 1024;
+
+
+static long long stat_mtime_ns(const struct stat& st) {
+#if defined(__APPLE__)
+    return (long long)st.st_mtimespec.tv_sec * 1000000000LL + st.st_mtimespec.tv_nsec;
+#elif defined(_WIN32)
+    return (long long)st.st_mtime * 1000000000LL;
+#else
+    return (long long)st.st_mtim.tv_sec * 1000000000LL + st.st_mtim.tv_nsec;
+#endif
+}
+
+static double stat_seconds(const struct stat& st, bool modified) {
+#if defined(__APPLE__)
+    const struct timespec& ts = modified ? st.st_mtimespec : st.st_ctimespec;
+    return (double)ts.tv_sec + ts.tv_nsec / 1e9;
+#elif defined(_WIN32)
+    return (double)(modified ? st.st_mtime : st.st_ctime);
+#else
+    const struct timespec& ts = modified ? st.st_mtim : st.st_ctim;
+    return (double)ts.tv_sec + ts.tv_nsec / 1e9;
+#endif
+}
+
+
+// Match c against the [...] class at pattern. Returns the position after the
+// closing ']', or null if the class is not closed (the '[' is then literal).
+static const char* match_class(const char* pattern, char c, bool& matched) {
+    const char* p = pattern + 1;
+    bool negate = *p == '!';
+    if (negate) {
+        ++p;
+    }
+    matched = false;
+    for (bool first = true; *p != '\0' && (first || *p != ']'); first = false) {
+        if (p[1] == '-' && p[2] != '\0' && p[2] != ']') {
+            matched = matched || ((unsigned char)p[0] <= (unsigned char)c && (unsigned char)c <= (unsigned char)p[2]);
+            p += 3;
+        } else {
+            matched = matched || *p == c;
+            ++p;
+        }
+    }
+    if (*p != ']') {
+        return nullptr;
+    }
+    matched = matched != negate;
+    return p + 1;
+}
+
+// Glob match with the same rules as Python's fnmatch.fnmatchcase ('*' also
+// matches '/'). Backtracks only to the last '*', so it never goes exponential.
+static bool glob_match(const char* pattern, const char* text) {
+    const char* star = nullptr;
+    const char* retry = nullptr;
+    while (*text != '\0') {
+        if (*pattern == '*') {
+            star = ++pattern;
+            retry = text;
+            continue;
+        }
+        bool matched = false;
+        const char* next = *pattern == '[' ? match_class(pattern, *text, matched) : nullptr;
+        if (next == nullptr && *pattern != '\0') {
+            matched = *pattern == '?' || *pattern == *text;
+            next = pattern + 1;
+        }
+        if (matched) {
+            pattern = next;
+            ++text;
+        } else if (star != nullptr) {
+            pattern = star;
+            text = ++retry;
+        } else {
+            return false;
+        }
+    }
+    while (*pattern == '*') {
+        ++pattern;
+    }
+    return *pattern == '\0';
+}
+
+// Category rules, in the format the Python apps read (DEFAULT_CATEGORY_RULES
+// there documents it): "Category: condition ..." per line, where conditions are
+// ext=, name=, regex=, size>/size< and age>/age<. A file goes to the category
+// of the first rule whose conditions all hold, or to Others.
+static const char* const DEFAULT_CATEGORY_RULES = R"(
+Images: ext=.jpg,.jpeg,.png,.gif,.bmp,.tiff,.webp
+Videos: ext=.mp4,.avi,.mov,.wmv,.flv,.mkv,.webm
+Audio: ext=.mp3,.wav,.ogg,.flac,.aac,.wma
+Documents: ext=.pdf,.doc,.docx,.rtf,.tex
+Spreadsheets: ext=.xls,.xlsx,.csv
+Presentations: ext=.ppt,.pptx
+Text: ext=.txt,.md,.log
+Archives: ext=.zip,.rar,.7z,.tar,.gz,.iso
+Executables: ext=.exe,.msi,.app
+OneNote: ext=.one,.onetoc2
+)";
+
+static const std::string& others_category() {
+    static const std::string others = "Others";
+    return others;
+}
+
+struct CategoryRule {
+    std::string category;
+    std::set<std::string> keys;   // conditions given, each at most once
+    std::string glob;             // empty: no name condition
+    std::regex regex;
+    bool has_regex = false;
+    double size_over = -std::numeric_limits<double>::infinity();
+    double size_under = std::numeric_limits<double>::infinity();
+    double age_over = -std::numeric_limits<double>::infinity();
+    double age_under = std::numeric_limits<double>::infinity();
+
+    bool holds(const std::string& name, unsigned long long size, double age) const {
+        return (glob.empty() || glob_match(glob.c_str(), name.c_str())) &&
+               (!has_regex || std::regex_search(name, regex)) &&
+               size > size_over && size < size_under && age > age_over && age < age_under;
+    }
+};
+
+// Same as Python's os.path.splitext: leading dots don't start an extension.
+static std::string name_extension(const std::string& name) {
+    size_t dot = name.rfind('.');
+    size_t leading = name.find_first_not_of('.');
+    if (dot == std::string::npos || leading == std::string::npos || dot < leading) {
+        return "";
+    }
+    std::string ext = name.substr(dot);
+    std::transform(ext.begin(), ext.end(), ext.begin(), ::tolower);
+    return ext;
+}
+
+// Rules compiled for matching: each extension maps to the rules that can
+// apply to it in file order (those listing it plus every rule without an
+// extension condition), so extension-only rules cost one hash lookup.
+class CategoryRules {
+public:
+    // Returns 0, or the line number of the first invalid rule.
+    size_t parse(const std::string& text) {
+        std::istringstream lines(text);
+        std::string line;
+        for (size_t number = 1; std::getline(lines, line); ++number) {
+            size_t start = line.find_first_not_of(" \t\r");
+            if (start == std::string::npos || line[start] == '#') {
+                continue;
+            }
+            size_t colon = line.find(':');
+            std::string category = colon == std::string::npos ? "" : trim(line.substr(0, colon));
+            if (category.empty()) {
+                return number;
+            }
+            CategoryRule rule;
+            rule.category = category;
+            std::vector<std::string> extensions;
+            std::istringstream tokens(line.substr(colon + 1));
+            std::string token;
+            while (tokens >> token) {
+                if (!parse_condition(token, rule, extensions)) {
+                    return number;
+                }
+            }
+            size_t index = rules.size();
+            for (const auto& ext : extensions) {
+                by_extension[ext].push_back(index);
+            }
+            if (!rule.keys.count("ext")) {
+                generic.push_back(index);
+            }
+            needs_stat = needs_stat || rule.keys.count("size>") || rule.keys.count("size<") ||
+                         rule.keys.count("age>") || rule.keys.count("age<");
+            if (std::find(names.begin(), names.end(), category) == names.end()) {
+                names.push_back(category);
+            }
+            rules.push_back(std::move(rule));
+        }
+        if (std::find(names.begin(), names.end(), others_category()) == names.end()) {
+            names.push_back(others_category());
+        }
+        for (auto& [ext, indexes] : by_extension) {
+            indexes.insert(indexes.end(), generic.begin(), generic.end());
+            std::sort(indexes.begin(), indexes.end());
+            indexes.erase(std::unique(indexes.begin(), indexes.end()), indexes.end());
+        }
+        return 0;
+    }
+
+    const std::string& match(const std::string& name, unsigned long long size, double age) const {
+        auto found = by_extension.find(name_extension(name));
+        for (size_t i : found != by_extension.end() ? found->second : generic) {
+            if (rules[i].holds(name, size, age)) {
+                return rules[i].category;
+            }
+        }
+        return others_category();
+    }
+
+    // Category names in file order, Others last.
+    const std::vector<std::string>& categories() const {
+        return names;
+    }
+
+    // Set if any rule looks at size or age, which then have to be read.
+    bool uses_stat() const {
+        return needs_stat;
+    }
+
+private:
+    static std::string trim(const std::string& text) {
+        size_t start = text.find_first_not_of(" \t\r");
+        size_t end = text.find_last_not_of(" \t\r");
+        return start == std::string::npos ? "" : text.substr(start, end - start + 1);
+    }
+
+    static bool parse_condition(const std::string& token, CategoryRule& rule, std::vector<std::string>& extensions) {
+        size_t equals = token.find('=');
+        std::string key = token.substr(0, equals);
+        if (equals != std::string::npos && (key == "ext" || key == "name" || key == "regex")) {
+            std::string value = token.substr(equals + 1);
+            if (value.empty() || !rule.keys.insert(key).second) {
+                return false;
+            }
+            if (key == "name") {
+                rule.glob = value;
+            } else if (key == "regex") {
+                try {
+                    rule.regex = std::regex(value, std::regex::ECMAScript | std::regex::optimize);
+                    rule.has_regex = true;
+                } catch (const std::regex_error&) {
+                    return false;
+                }
+            } else {
+                std::istringstream list(value);
+                std::string ext;
+                while (std::getline(list, ext, ',')) {
+                    if (!ext.empty()) {
+                        std::transform(ext.begin(), ext.end(), ext.begin(), ::tolower);
+                        extensions.push_back(ext[0] == '.' ? ext : "." + ext);
+                    }
+                }
+            }
+            return true;
+        }
+
+        // size>10M, age<2w: a number with an optional unit letter
+        size_t op = token.find_first_of("<>");
+        key = token.substr(0, op == std::string::npos ? 0 : op + 1);
+        if ((key != "size>" && key != "size<" && key != "age>" && key != "age<") || !rule.keys.insert(key).second) {
+            return false;
+        }
+        std::string number = token.substr(op + 1);
+        char unit = 0;
+        if (!number.empty() && isalpha((unsigned char)number.back())) {
+            unit = (char)tolower((unsigned char)number.back());
+            number.pop_back();
+        }
+        size_t point = number.find('.');
+        std::string whole = number.substr(0, point);
+        std::string fraction = point == std::string::npos ? "1" : number.substr(point + 1);
+        auto digits = [](const std::string& text) {
+            return !text.empty() && std::all_of(text.begin(), text.end(), [](char c) { return isdigit((unsigned char)c); });
+        };
+        if (!digits(whole) || !digits(fraction)) {
+            return false;
+        }
+        static const std::map<char, double> size_units = {
+            {0, 1.0}, {'k', 1024.0}, {'m', 1048576.0}, {'g', 1073741824.0}, {'t', 1099511627776.0}};
+        static const std::map<char, double> age_units = {
+            {0, 1.0}, {'s', 1.0}, {'m', 60.0}, {'h', 3600.0}, {'d', 86400.0}, {'w', 604800.0}};
+        const auto& units = key[0] == 's' ? size_units : age_units;
+        auto found = units.find(unit);
+        if (found == units.end()) {
+            return false;
+        }
+        double value = std::strtod(number.c_str(), nullptr) * found->second;
+        if (key == "size>") {
+            rule.size_over = value;
+        } else if (key == "size<") {
+            rule.size_under = value;
+        } else if (key == "age>") {
+            rule.age_over = value;
+        } else {
+            rule.age_under = value;
+        }
+        return true;
+    }
+
+    std::vector<CategoryRule> rules;
+    std::unordered_map<std::string, std::vector<size_t>> by_extension;
+    std::vector<size_t> generic;
+    std::vector<std::string> names;
+    bool needs_stat = false;
+};
+
+static std::mutex category_rules_mutex;
+
+static std::shared_ptr<const CategoryRules>& current_category_rules() {
+    static std::shared_ptr<const CategoryRules> rules;
+    return rules;
+}
+
+// The rules organize by type uses; an organize run keeps the ones it started
+// with even if load_category_rules() replaces them meanwhile.
+static std::shared_ptr<const CategoryRules> active_category_rules() {
+    std::lock_guard<std::mutex> lock(category_rules_mutex);
+    auto& rules = current_category_rules();
+    if (rules == nullptr) {
+        auto defaults = std::make_shared<CategoryRules>();
+        defaults->parse(DEFAULT_CATEGORY_RULES);
+        rules = defaults;
+    }
+    return rules;
+}
+
+
+static unsigned int clamp_workers(int workers, size_t tasks) {
+    unsigned int count = workers > 0 ? (unsigned int)workers : std::max(1u, std::thread::hardware_concurrency());
+    return (unsigned int)std::max<size_t>(1, std::min<size_t>(count, tasks));
+}
+
+// Content sniffing: files whose name gives no category are categorized by the
+// signature ("magic bytes") at the start of their content instead.
+static const size_t SNIFF_BYTES = 64;
+static const unsigned int SNIFF_WORKERS = 8;  // Header reads mostly wait on the disk
+static const size_t SNIFF_CACHE_MAX_ENTRIES = 100000;
+
+// Byte strings at fixed offsets that must all match. A matching file is
+// categorized as if its name ended with extension.
+struct FileSignature {
+    const char* extension;
+    std::vector<std::pair<size_t, std::string>> parts;
+};
+
+// Signatures in the order they are tried, the same as FILE_SIGNATURES in the
+// GUIs: longer signatures before shorter ones they start with, and the ones
+// that don't start at offset 0 last.
+static const std::vector<FileSignature>& file_signatures() {
+    using namespace std::string_literals;
+    static const std::vector<FileSignature> signatures = {
+        {".jpg", {{0, "\xff\xd8\xff"s}}},
+        {".png", {{0, "\x89PNG\r\n\x1a\n"s}}},
+        {".gif", {{0, "GIF87a"s}}},
+        {".gif", {{0, "GIF89a"s}}},
+        {".bmp", {{0, "BM"s}, {6, "\0\0\0\0"s}}},
+        {".tiff", {{0, "II*\0"s}}},
+        {".tiff", {{0, "MM\0*"s}}},
+        {".webp", {{0, "RIFF"s}, {8, "WEBP"s}}},
+        {".wav", {{0, "RIFF"s}, {8, "WAVE"s}}},
+        {".avi", {{0, "RIFF"s}, {8, "AVI "s}}},
+        {".mkv", {{0, "\x1a\x45\xdf\xa3"s}}},
+        {".flv", {{0, "FLV\x01"s}}},
+        {".mp3", {{0, "ID3"s}}},
+        {".mp3", {{0, "\xff\xfb"s}}},
+        {".mp3", {{0, "\xff\xf3"s}}},
+        {".mp3", {{0, "\xff\xf2"s}}},
+        {".ogg", {{0, "OggS"s}}},
+        {".flac", {{0, "fLaC"s}}},
+        {".pdf", {{0, "%PDF-"s}}},
+        {".rtf", {{0, "{\\rtf"s}}},
+        {".doc", {{0, "\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"s}}},
+        {".docx", {{0, "PK\x03\x04"s}, {30, "[Content_Types].xml"s}}},
+        {".zip", {{0, "PK\x03\x04"s}}},
+        {".rar", {{0, "Rar!\x1a\x07"s}}},
+        {".7z", {{0, "7z\xbc\xaf\x27\x1c"s}}},
+        {".gz", {{0, "\x1f\x8b\x08"s}}},
+        {".exe", {{0, "MZ"s}}},
+        {".exe", {{0, "\x7f" "ELF"s}}},
+        {".exe", {{0, "\xcf\xfa\xed\xfe"s}}},
+        {".exe", {{0, "\xfe\xed\xfa\xcf"s}}},
+        {".mov", {{4, "ftypqt  "s}}},
+        {".mp4", {{4, "ftyp"s}}},
+    };
+    return signatures;
+}
+
+// The signatures indexed by the first byte they expect, so a header is only
+// compared against the few that can match it.
+class SignatureTable {
+public:
+    SignatureTable() {
+        for (const auto& signature : file_signatures()) {
+            const auto& first = signature.parts.front();
+            if (first.first == 0) {
+                by_first_byte[(unsigned char)first.second[0]].push_back(&signature);
+            } else {
+                unanchored.push_back(&signature);
+            }
+        }
+    }
+
+    const char* match(const unsigned char* header, size_t length) const {
+        if (length > 0) {
+            for (const FileSignature* signature : by_first_byte[header[0]]) {
+                if (matches(*signature, header, length)) {
+                    return signature->extension;
+                }
+            }
+        }
+        for (const FileSignature* signature : unanchored) {
+            if (matches(*signature, header, length)) {
+                return signature->extension;
+            }
+        }
+        return nullptr;
+    }
+
+private:
+    static bool matches(const FileSignature& signature, const unsigned char* header, size_t length) {
+        for (const auto& part : signature.parts) {
+            if (part.first + part.second.size() > length ||
+                memcmp(header + part.first, part.second.data(), part.second.size()) != 0) {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    std::vector<const FileSignature*> by_first_byte[256];
+    std::vector<const FileSignature*> unanchored;
+};
+
+static std::mutex sniff_cache_mutex;
+
+// Extension shown by the first SNIFF_BYTES bytes of path, or null. Results
+// are cached by device, inode and mtime, so a file is only read again after
+// it changes.
+static const char* sniff_file(const std::string& path, const struct stat& st) {
+    static const SignatureTable table;
+    static std::map<std::tuple<unsigned long long, unsigned long long, long long>, const char*> cache;
+    auto key = std::make_tuple((unsigned long long)st.st_dev, (unsigned long long)st.st_ino, stat_mtime_ns(st));
+    bool cacheable = st.st_ino != 0;  // Windows has no inode numbers here
+    if (cacheable) {
+        std::lock_guard<std::mutex> lock(sniff_cache_mutex);
+        auto found = cache.find(key);
+        if (found != cache.end()) {
+            return found->second;
+        }
+    }
+
+    unsigned char header[SNIFF_BYTES];
+    FILE* file = fopen(path.c_str(), "rb");
+    if (file == nullptr) {
+        return nullptr;
+    }
+    setvbuf(file, nullptr, _IONBF, 0);  // Read just the header, not a whole stdio buffer
+    size_t length = fread(header, 1, SNIFF_BYTES, file);
+    fclose(file);
+    const char* extension = table.match(header, length);
+
+    if (cacheable) {
+        std::lock_guard<std::mutex> lock(sniff_cache_mutex);
+        if (cache.size() >= SNIFF_CACHE_MAX_ENTRIES) {
+            cache.clear();
+        }
+        cache[key] = extension;
+    }
+    return extension;
+}
+
+// Sniff many files at once on a small pool of threads; results[i] is the
+// extension for files[i], or null.
+static std::vector<const char*> sniff_files(const std::vector<std::pair<std::string, struct stat>>& files) {
+    std::vector<const char*> results(files.size(), nullptr);
+    std::atomic<size_t> next(0);
+    auto worker = [&]() {
+        for (size_t i = next.fetch_add(1); i < files.size(); i = next.fetch_add(1)) {
+            results[i] = sniff_file(files[i].first, files[i].second);
+        }
+    };
+    unsigned int count = clamp_workers((int)SNIFF_WORKERS, files.size());
+    std::vector<std::thread> pool;
+    for (unsigned int i = 1; i < count; ++i) {
+        pool.emplace_back(worker);
+    }
+    worker();  // The calling thread works too
+    for (auto& thread : pool) {
+        thread.join();
+    }
+    return results;
+}
+
+
+#if defined(__linux__)
+// Errors that mean "this strategy is not supported here", as opposed to a
+// real I/O failure; the next strategy is tried instead.
+static bool unsupported(int error) {
+    return error == EXDEV || error == EINVAL || error == ENOSYS || error == EOPNOTSUPP ||
+           error == ENOTTY || error == EBADF || error == EPERM;
+}
+
+// Each copier returns 1 on success, 0 if the strategy is unsupported (nothing
+// was written yet) and -1 on a real error.
+static int copy_reflink(int in, int out, off_t) {
+    if (ioctl(out, FICLONE, in) == 0) {
+        return 1;
+    }
+    return unsupported(errno) ? 0 : -1;
+}
+
+static int copy_range(int in, int out, off_t size) {
+    if (size == 0) {
+        return 0;  // Possibly a pseudo file whose size is unknown; read it instead
+    }
+    off_t copied = 0;
+    while (copied < size) {
+        ssize_t n = copy_file_range(in, nullptr, out, nullptr, (size_t)(size - copied), 0);
+        if (n < 0) {
+            if (errno == EINTR) {
+                continue;
+            }
+            return copied == 0 && unsupported(errno) ? 0 : -1;
+        }
+        if (n == 0) {
+            // Some pseudo filesystems report a size but copy nothing
+            return copied == 0 ? 0 : 1;
+        }
+        copied += n;
+    }
+    return 1;
+}
+
+static int copy_sendfile(int in, int out, off_t size) {
+    if (size == 0) {
+        return 0;  // Possibly a pseudo file whose size is unknown; read it instead
+    }
+    off_t copied = 0;
+    while (copied < size) {
+        ssize_t n = sendfile(out, in, nullptr, (size_t)std::min<off_t>(size - copied, 0x7ffff000));
+        if (n < 0) {
+            if (errno == EINTR) {
+                continue;
+            }
+            return copied == 0 && unsupported(errno) ? 0 : -1;
+        }
+        if (n == 0) {
+            return copied == 0 ? 0 : 1;
+        }
+        copied += n;
+    }
+    return 1;
+}
+
+static int copy_buffered(int in, int out, off_t) {
+    std::vector<char> buffer(COPY_BUFFER_SIZE);
+    for (;;) {
+        ssize_t n = read(in, buffer.data(), buffer.size());
+        if (n < 0) {
+            if (errno == EINTR) {
+                continue;
+            }
+            return -1;
+        }
+        if (n == 0) {
+            return 1;
+        }
+        for (ssize_t written = 0; written < n;) {
+            ssize_t w = write(out, buffer.data() + written, (size_t)(n - written));
+            if (w < 0) {
+                if (errno == EINTR) {
+                    continue;
+                }
+                return -1;
+            }
+            written += w;
+        }
+    }
+}
+
+// Copy one regular file, trying reflink, copy_file_range, sendfile and a
+// buffered loop in that order (or only the requested strategy). The data goes
+// to a hidden temporary file next to dest, which is renamed over dest only
+// once the copy is complete, so a failed copy never costs an existing dest.
+static int copy_regular_file(const char* src, const char* dest, int strategy) {
+    int in = open(src, O_RDONLY | O_CLOEXEC);
+    if (in < 0) {
+        return COPY_FAILED;
+    }
+    struct stat st;
+    struct stat dest_st;
+    if (fstat(in, &st) != 0 ||
+        (stat(dest, &dest_st) == 0 && dest_st.st_dev == st.st_dev && dest_st.st_ino == st.st_ino)) {
+        close(in);  // Copying a file onto itself would truncate it
+        return COPY_FAILED;
+    }
+    std::filesystem::path dest_path(dest);
+    std::string temp = (dest_path.parent_path() / ("." + dest_path.filename().string() + ".XXXXXX")).string();
+    int out = mkostemp(&temp[0], O_CLOEXEC);
+    if (out < 0) {
+        close(in);
+        return COPY_FAILED;
+    }
+
+    static int (*const copiers[])(int, int, off_t) = {copy_reflink, copy_range, copy_sendfile, copy_buffered};
+    int used = COPY_FAILED;
+    for (int i = COPY_REFLINK; i <= COPY_BUFFERED; ++i) {
+        if (strategy != COPY_AUTO && strategy != i) {
+            continue;
+        }
+        int result = copiers[i](in, out, st.st_size);
+        if (result > 0) {
+            used = i;
+            break;
+        }
+        if (result < 0) {
+            break;
+        }
+    }
+
+    if (used != COPY_FAILED) {
+        fchmod(out, st.st_mode & 07777);
+        // Keep the timestamps, so incremental organizes can compare them
+        struct timespec times[2] = {st.st_atim, st.st_mtim};
+        futimens(out, times);
+    }
+    if (close(out) != 0) {
+        used = COPY_FAILED;
+    }
+    close(in);
+    if (used == COPY_FAILED || rename(temp.c_str(), dest) != 0) {
+        unlink(temp.c_str());
+        return COPY_FAILED;
+    }
+    return used;
+}
+#endif
+
+// Copy src to dest, overwriting dest, with the fastest strategy available.
+static int copy_path(const char* src, const char* dest, int strategy) {
+#if defined(__linux__)
+    struct stat st;
+    if (stat(src, &st) == 0 && S_ISREG(st.st_mode) && strategy != COPY_FILESYSTEM) {
+        return copy_regular_file(src, dest, strategy);
+    }
+#endif
+    if (strategy != COPY_AUTO && strategy != COPY_FILESYSTEM) {
+        return COPY_FAILED;
+    }
+    std::error_code ec;
+    std::filesystem::copy(src, dest, std::filesystem::copy_options::overwrite_existing |
+                                     std::filesystem::copy_options::recursive, ec);
+    if (ec) {
+        return COPY_FAILED;
+    }
+    if (std::filesystem::is_regular_file(src, ec)) {
+        std::filesystem::last_write_time(dest, std::filesystem::last_write_time(src, ec), ec);
+    }
+    return COPY_FILESYSTEM;
+}
+
+
+// One file to place into its target folder. index is its position in the
+// journal's plan; op is "copy", "rename" or "move" (copy + unlink); update is
+// set when the target already existed and gets replaced.
+struct OrganizeTask {
+    std::filesystem::path source;
+    std::filesystem::path target;
+    unsigned long long size;
+    size_t index;
+    std::string op;
+    bool update;
+    bool unchanged = false;  // move onto an up-to-date target: only the source is removed
+};
+
+// Folder of a file when organizing by type, from a snapshot of the category rules.
+struct TypeFolder {
+    std::shared_ptr<const CategoryRules> rules;
+
+    std::string operator()(const std::filesystem::directory_entry& entry) const {
+        unsigned long long size = 0;
+        double age = 0;
+        struct stat st;
+        std::string path = entry.path().string();
+        bool have_stat = false;
+        if (rules->uses_stat() && stat(path.c_str(), &st) == 0) {
+            have_stat = true;
+            size = (unsigned long long)st.st_size;
+            age = std::chrono::duration<double>(std::chrono::system_clock::now().time_since_epoch()).count() -
+                  stat_seconds(st, true);
+        }
+        std::string name = entry.path().filename().string();
+        std::string category = rules->match(name, size, age);
+
+        // Fall back to the file's content when the name gives no category
+        if (category == others_category() && (have_stat || stat(path.c_str(), &st) == 0) && S_ISREG(st.st_mode)) {
+            const char* extension = sniff_file(path, st);
+            if (extension != nullptr) {
+                category = rules->match(name + extension, size, age);
+            }
+        }
+        return category;
+    }
+};
+
+// Folder of a file when organizing by date; empty if the file can't be
+// stat'ed (e.g. it went away), which callers skip.
+static std::string date_folder(const std::filesystem::directory_entry& entry) {
+    std::error_code ec;
+    auto modified_time = entry.last_write_time(ec);
+    if (ec) {
+        return "";
+    }
+
+    auto sctp = std::chrono::time_point_cast<std::chrono::system_clock::duration>(
+        modified_time - std::filesystem::file_time_type::clock::now() + std::chrono::system_clock::now());
+    std::time_t cftime = std::chrono::system_clock::to_time_t(sctp);
+    std::tm* timeinfo = std::localtime(&cftime);
+    if (timeinfo == nullptr) {
+        return "";
+    }
+
+    char folder[11];
+    std::strftime(folder, sizeof(folder), "%Y-%m-%d", timeinfo);
+    return folder;
+}
+
+// Plan every copy up front on the calling thread. Listing the directory fully
+// before anything is written also keeps new category folders out of the scan.
+template <typename FolderFn>
+static std::vector<OrganizeTask> plan_organize(const char* directory, FolderFn folder_for) {
+    const std::filesystem::path root(directory);
+    std::vector<OrganizeTask> tasks;
+    for (const auto& entry : std::filesystem::directory_iterator(directory)) {
+        if (entry.is_regular_file()) {
+            std::string folder = folder_for(entry);
+            if (folder.empty()) {
+                continue;
+            }
+            std::error_code ec;
+            unsigned long long size = entry.file_size(ec);
+            tasks.push_back({entry.path(), root / folder / entry.path().filename(), ec ? 0 : size,
+                             tasks.size(), "copy", false});
+        }
+    }
+    return tasks;
+}
+
+// Limits for a recursive organize. max_depth is how many folder levels below
+// the directory are entered (0: top level only, < 0: no limit). Patterns are
+// globs (*, ? and [...]) matched against the name, or against the path
+// relative to the directory if they contain a '/'. A file is organized if it
+// matches an include pattern (or there are none) and no exclude pattern;
+// excluded folders are not entered.
+struct WalkOptions {
+    int max_depth;
+    std::vector<std::string> include;
+    std::vector<std::string> exclude;
+};
+
+static bool matches_any(const std::vector<std::string>& patterns, const std::string& name,
+                        const std::string& relative) {
+    for (const auto& pattern : patterns) {
+        const std::string& text = pattern.find('/') != std::string::npos ? relative : name;
+        if (glob_match(pattern.c_str(), text.c_str())) {
+            return true;
+        }
+    }
+    return false;
+}
+
+// Folders an organize creates at the top of the directory: categories and
+// YYYY-MM-DD dates. The recursive walk skips them in either mode, so it never
+// organizes its own output.
+static bool is_output_folder(const std::string& name, const CategoryRules& rules) {
+    const auto& categories = rules.categories();
+    if (std::find(categories.begin(), categories.end(), name) != categories.end()) {
+        return true;
+    }
+    if (name.size() != 10) {
+        return false;
+    }
+    for (size_t i = 0; i < name.size(); ++i) {
+        if (i == 4 || i == 7 ? name[i] != '-' : !isdigit((unsigned char)name[i])) {
+            return false;
+        }
+    }
+    return true;
+}
+
+// Streams organize tasks out of a directory tree in batches. Memory is bounded
+// by the batch and the directories open on the current path, not by the size
+// of the tree. Each file keeps its subfolder inside the category or date
+// folder (trip/a.jpg -> Images/trip/a.jpg). Symlinked folders are not followed.
+class OrganizeWalker {
+public:
+    // rules is the snapshot the run categorizes with, so output folders are
+    // recognised by the same categories the files are placed in
+    OrganizeWalker(const char* directory, const WalkOptions& options, std::shared_ptr<const CategoryRules> rules)
+        : root(directory), options(options), rules(std::move(rules)),
+          it(root, std::filesystem::directory_options::skip_permission_denied) {}
+
+    // Fill tasks with up to limit files; returns false once the walk is done.
+    template <typename FolderFn>
+    bool next_batch(FolderFn folder_for, size_t limit, std::vector<OrganizeTask>& tasks) {
+        tasks.clear();
+        std::error_code ec;
+        while (it != std::filesystem::recursive_directory_iterator() && tasks.size() < limit) {
+            visit(folder_for, tasks);
+            // A failed increment leaves the iterator at the end, so check the
+            // error before the end test can hide it
+            it.increment(ec);
+            if (ec) {
+                error = true;
+                it = std::filesystem::recursive_directory_iterator();
+                break;
+            }
+        }
+        return !tasks.empty();
+    }
+
+    // Set if a folder could not be read part way through the walk.
+    bool failed() const {
+        return error;
+    }
+
+private:
+    // Add a task for the current entry if it is a file to organize, or prune
+    // the walk below it if it is a folder to skip
+    template <typename FolderFn>
+    void visit(FolderFn folder_for, std::vector<OrganizeTask>& tasks) {
+        std::error_code ec;
+        const auto& entry = *it;
+        std::string name = entry.path().filename().string();
+        std::filesystem::path parent = entry.path().parent_path().lexically_relative(root);
+        std::string relative = (parent / name).generic_string();
+        if (entry.is_directory(ec)) {
+            if ((it.depth() == 0 && is_output_folder(name, *rules)) || matches_any(options.exclude, name, relative) ||
+                (options.max_depth >= 0 && it.depth() >= options.max_depth)) {
+                it.disable_recursion_pending();
+            }
+            return;
+        }
+        if (!entry.is_regular_file(ec) || matches_any(options.exclude, name, relative) ||
+            (!options.include.empty() && !matches_any(options.include, name, relative))) {
+            return;
+        }
+        std::string category = folder_for(entry);
+        if (category.empty()) {
+            return;
+        }
+        std::filesystem::path folder = root / category;
+        if (parent != ".") {
+            folder /= parent;
+        }
+        unsigned long long size = entry.file_size(ec);
+        tasks.push_back({entry.path(), folder / entry.path().filename(), ec ? 0 : size, 0, "copy", false});
+    }
+
+    std::filesystem::path root;
+    const WalkOptions& options;
+    std::shared_ptr<const CategoryRules> rules;
+    std::filesystem::recursive_directory_iterator it;
+    bool error = false;
+};
+
+static WalkOptions walk_options(int max_depth, const char* const* include, const char* const* exclude) {
+    WalkOptions options = {max_depth, {}, {}};
+    for (; include != nullptr && *include != nullptr; ++include) {
+        options.include.push_back(*include);
+    }
+    for (; exclude != nullptr && *exclude != nullptr; ++exclude) {
+        options.exclude.push_back(*exclude);
+    }
+    return options;
+}
+
+
+// Journal of an organize run, one JSON object per line, in the same format the
+// Python side reads and writes:
+//   {"journal": 1, "mode": ..., "move": ..., "source_dir": ..., "destination": ...}
+//   {"folder": path}                     folder created by this run
+//   {"plan": i, "op": ..., "source": ..., "target": ..., "bytes": n}
+//   {"done": i} / {"undone": i}
+//   {"end": "completed"} / {"end": "undone"}
+// The header, folders and plan are synced before any file is touched, so an
+// interrupted run can be resumed and a finished one undone.
+static std::string json_string(const std::string& value) {
+    std::string out = "\"";
+    for (unsigned char c : value) {
+        switch (c) {
+            case '"': out += "\\\""; break;
+            case '\\': out += "\\\\"; break;
+            case '\n': out += "\\n"; break;
+            case '\r': out += "\\r"; break;
+            case '\t': out += "\\t"; break;
+            default:
+                if (c < 0x20) {
+                    char escaped[8];
+                    std::snprintf(escaped, sizeof(escaped), "\\u%04x", c);
+                    out += escaped;
+                } else {
+                    out += (char)c;
+                }
+        }
+    }
+    return out + "\"";
+}
+
+static void append_utf8(std::string& out, unsigned long code) {
+    if (code < 0x80) {
+        out += (char)code;
+    } else if (code < 0x800) {
+        out += (char)(0xC0 | (code >> 6));
+        out += (char)(0x80 | (code & 0x3F));
+    } else if (code < 0x10000) {
+        out += (char)(0xE0 | (code >> 12));
+        out += (char)(0x80 | ((code >> 6) & 0x3F));
+        out += (char)(0x80 | (code & 0x3F));
+    } else {
+        out += (char)(0xF0 | (code >> 18));
+        out += (char)(0x80 | ((code >> 12) & 0x3F));
+        out += (char)(0x80 | ((code >> 6) & 0x3F));
+        out += (char)(0x80 | (code & 0x3F));
+    }
+}
+
+// Four hex digits at line[pos]; false if there aren't, e.g. in a torn line
+static bool parse_hex4(const std::string& line, size_t pos, unsigned long& code) {
+    if (pos + 4 > line.size()) {
+        return false;
+    }
+    code = 0;
+    for (size_t k = pos; k < pos + 4; ++k) {
+        unsigned char c = (unsigned char)line[k];
+        if (!isxdigit(c)) {
+            return false;
+        }
+        code = code * 16 + (unsigned long)(isdigit(c) ? c - '0' : tolower(c) - 'a' + 10);
+    }
+    return true;
+}
+
+// Parse one flat journal object into key -> value (strings unescaped, numbers
+// and booleans as written). Returns false for a torn or malformed line.
+static bool parse_journal_line(const std::string& line, std::map<std::string, std::string>& fields) {
+    size_t i = 0;
+    auto skip_space = [&]() { while (i < line.size() && isspace((unsigned char)line[i])) ++i; };
+    auto parse_string = [&](std::string& out) {
+        if (i >= line.size() || line[i] != '"') {
+            return false;
+        }
+        for (++i; i < line.size(); ++i) {
+            char c = line[i];
+            if (c == '"') {
+                ++i;
+                return true;
+            }
+            if (c != '\\') {
+                out += c;
+                continue;
+            }
+            if (++i >= line.size()) {
+                return false;
+            }
+            switch (line[i]) {
+                case 'n': out += '\n'; break;
+                case 'r': out += '\r'; break;
+                case 't': out += '\t'; break;
+                case 'b': out += '\b'; break;
+                case 'f': out += '\f'; break;
+                case 'u': {
+                    unsigned long code;
+                    if (!parse_hex4(line, i + 1, code)) {
+                        return false;
+                    }
+                    i += 4;
+                    // Surrogate pair for characters outside the BMP
+                    unsigned long low;
+                    if (code >= 0xD800 && code < 0xDC00 && i + 2 < line.size() && line[i + 1] == '\\' &&
+                        line[i + 2] == 'u' && parse_hex4(line, i + 3, low) && low >= 0xDC00 && low < 0xE000) {
+                        code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00);
+                        i += 6;
+                    }
+                    append_utf8(out, code);
+                    break;
+                }
+                default: out += line[i];
+            }
+        }
+        return false;
+    };
+
+    skip_space();
+    if (i >= line.size() || line[i++] != '{') {
+        return false;
+    }
+    for (;;) {
+        skip_space();
+        if (i < line.size() && line[i] == '}') {
+            return true;
+        }
+        std::string key, value;
+        if (!parse_string(key)) {
+            return false;
+        }
+        skip_space();
+        if (i >= line.size() || line[i++] != ':') {
+            return false;
+        }
+        skip_space();
+        if (i < line.size() && line[i] == '"') {
+            if (!parse_string(value)) {
+                return false;
+            }
+        } else {
+            while (i < line.size() && line[i] != ',' && line[i] != '}' && !isspace((unsigned char)line[i])) {
+                value += line[i++];
+            }
+        }
+        fields[key] = value;
+        skip_space();
+        if (i < line.size() && line[i] == ',') {
+            ++i;
+        } else if (i >= line.size() || line[i] != '}') {
+            return false;
+        }
+    }
+}
+
+class OrganizeJournal {
+public:
+    ~OrganizeJournal() {
+        close();
+    }
+
+    bool open(const char* path, bool append) {
+        file = std::fopen(path, append ? "ab" : "wb");
+        last_sync = std::chrono::steady_clock::now();
+        return file != nullptr;
+    }
+
+    bool is_open() const {
+        return file != nullptr;
+    }
+
+    void write(const std::string& line, bool sync) {
+        std::lock_guard<std::mutex> lock(mutex);
+        if (file == nullptr) {
+            return;
+        }
+        if (!line.empty()) {
+            std::fputs(line.c_str(), file);
+            std::fputc('\n', file);
+            ++unsynced;
+        }
+        if (sync || unsynced >= JOURNAL_SYNC_ENTRIES ||
+            std::chrono::steady_clock::now() - last_sync >= JOURNAL_SYNC_INTERVAL) {
+            sync_locked();
+        }
+    }
+
+    void close() {
+        std::lock_guard<std::mutex> lock(mutex);
+        if (file != nullptr) {
+            sync_locked();
+            std::fclose(file);
+            file = nullptr;
+        }
+    }
+
+private:
+    void sync_locked() {
+        std::fflush(file);
+#if defined(_WIN32)
+        _commit(_fileno(file));
+#else
+        fsync(fileno(file));
+#endif
+        unsynced = 0;
+        last_sync = std::chrono::steady_clock::now();
+    }
+
+    FILE* file = nullptr;
+    std::mutex mutex;
+    size_t unsynced = 0;
+    std::chrono::steady_clock::time_point last_sync;
+};
+
+// Everything read back from a journal file.
+struct JournalState {
+    std::map<std::string, std::string> header;
+    std::vector<OrganizeTask> plan;
+    std::vector<std::string> folders;
+    std::vector<size_t> done;      // in completion order
+    std::set<size_t> undone;
+    std::string end;
+};
+
+static bool read_journal(const char* path, JournalState& state) {
+    FILE* file = std::fopen(path, "rb");
+    if (file == nullptr) {
+        return false;
+    }
+    std::string line;
+    std::set<size_t> seen_done;
+    for (int c = std::fgetc(file);; c = std::fgetc(file)) {
+        if (c != '\n' && c != EOF) {
+            line += (char)c;
+            continue;
+        }
+        std::map<std::string, std::string> fields;
+        try {
+            if (!line.empty() && parse_journal_line(line, fields)) {
+                if (fields.count("journal")) {
+                    state.header = fields;
+                } else if (fields.count("plan")) {
+                    state.plan.push_back({fields["source"], fields["target"], std::stoull(fields["bytes"]),
+                                          (size_t)std::stoull(fields["plan"]), fields["op"],
+                                          fields["status"] == "update", fields["status"] == "unchanged"});
+                } else if (fields.count("folder")) {
+                    state.folders.push_back(fields["folder"]);
+                } else if (fields.count("done")) {
+                    size_t index = (size_t)std::stoull(fields["done"]);
+                    if (seen_done.insert(index).second) {
+                        state.done.push_back(index);
+                    }
+                } else if (fields.count("undone")) {
+                    state.undone.insert((size_t)std::stoull(fields["undone"]));
+                } else if (fields.count("end")) {
+                    state.end = fields["end"];
+                }
+            }
+        } catch (...) {
+            // A malformed entry is treated like a torn write
+        }
+        line.clear();
+        if (c == EOF) {
+            break;
+        }
+    }
+    std::fclose(file);
+    return !state.header.empty();
+}
+
+static bool same_content(const std::filesystem::path& a, const std::filesystem::path& b) {
+    FILE* fa = std::fopen(a.string().c_str(), "rb");
+    FILE* fb = std::fopen(b.string().c_str(), "rb");
+    bool same = fa != nullptr && fb != nullptr;
+    std::vector<char> buffer_a(COPY_BUFFER_SIZE), buffer_b(COPY_BUFFER_SIZE);
+    while (same) {
+        size_t na = std::fread(buffer_a.data(), 1, buffer_a.size(), fa);
+        size_t nb = std::fread(buffer_b.data(), 1, buffer_b.size(), fb);
+        if (na != nb || std::memcmp(buffer_a.data(), buffer_b.data(), na) != 0) {
+            same = false;
+        } else if (na == 0) {
+            break;
+        }
+    }
+    if (fa != nullptr) {
+        std::fclose(fa);
+    }
+    if (fb != nullptr) {
+        std::fclose(fb);
+    }
+    return same;
+}
+
+// Drop tasks whose target is already up to date and mark the rest as new or
+// updates, counting each kind. When moving, up-to-date tasks are kept so their
+// source is removed rather than left behind. The kept tasks are numbered from
+// first_index.
+static void filter_incremental(std::vector<OrganizeTask>& tasks, int incremental, bool move,
+                               OrganizeCounts& counts, size_t first_index = 0) {
+    std::vector<OrganizeTask> kept;
+    kept.reserve(tasks.size());
+    for (auto& task : tasks) {
+        struct stat source_st, target_st;
+        if (stat(task.target.string().c_str(), &target_st) != 0) {
+            ++counts.created;
+            kept.push_back(std::move(task));
+            continue;
+        }
+        bool unchanged = false;
+        if (incremental != INCREMENTAL_OFF && stat(task.source.string().c_str(), &source_st) == 0 &&
+            source_st.st_size == target_st.st_size) {
+            unchanged = stat_mtime_ns(source_st) == stat_mtime_ns(target_st) ||
+                        (incremental == INCREMENTAL_CONTENT && same_content(task.source, task.target));
+        }
+        if (unchanged) {
+            ++counts.unchanged;
+            if (move) {
+                task.unchanged = true;
+                task.size = 0;
+                kept.push_back(std::move(task));
+            }
+            continue;
+        }
+        ++counts.updated;
+        task.update = true;
+        kept.push_back(std::move(task));
+    }
+    for (size_t i = 0; i < kept.size(); ++i) {
+        kept[i].index = first_index + i;
+    }
+    tasks.swap(kept);
+}
+
+static bool same_device(const std::filesystem::path& a, const std::filesystem::path& b) {
+    struct stat sa, sb;
+    return stat(a.string().c_str(), &sa) == 0 && stat(b.string().c_str(), &sb) == 0 && sa.st_dev == sb.st_dev;
+}
+
+// Copy source to dest, or move it. A move on one filesystem is a rename, which
+// only touches metadata; across filesystems it falls back to copy + unlink.
+static bool place_file(const std::filesystem::path& source, const std::filesystem::path& dest,
+                       bool move, bool rename_ok) {
+    std::error_code ec;
+    if (move && rename_ok) {
+        std::filesystem::rename(source, dest, ec);
+        if (!ec) {
+            return true;
+        }
+        if (ec != std::errc::cross_device_link) {
+            return false;
+        }
+        ec.clear();
+    }
+    if (copy_path(source.string().c_str(), dest.string().c_str(), COPY_AUTO) == COPY_FAILED) {
+        return false;
+    }
+    if (move) {
+        std::filesystem::remove(source, ec);
+    }
+    return !ec;
+}
+
+static bool apply_task(const OrganizeTask& task) {
+    std::error_code ec;
+    if (task.unchanged && std::filesystem::exists(task.target, ec)) {
+        // The target already holds the source's data
+        std::filesystem::remove(task.source, ec);
+        return !ec;
+    }
+    return place_file(task.source, task.target, task.op != "copy", task.op == "rename");
+}
+
+static bool is_cancelled(const CancelToken* token) {
+    return token != nullptr && token->cancelled.load() != 0;
+}
+
+// Files and bytes of a run so far, summed over its batches.
+struct RunTotals {
+    unsigned long long files_done = 0;
+    unsigned long long files_total = 0;
+    unsigned long long bytes_done = 0;
+    unsigned long long bytes_total = 0;
+    size_t failures = 0;
+};
+
+// Spread the tasks over a pool of workers that pull the next task from a
+// shared counter. A failed file does not stop the others. Workers stop taking
+// new files once the cancel token is set. With a progress callback the calling
+// thread only reports progress, at most every interval_ms, so the callback
+// always runs on the thread that called into the backend.
+static void execute_batch(const std::vector<OrganizeTask>& tasks, int workers, ProgressCallback progress,
+                          int interval_ms, CancelToken* token, OrganizeJournal& journal, RunTotals& totals) {
+    totals.files_total += tasks.size();
+    for (const auto& task : tasks) {
+        totals.bytes_total += task.size;
+    }
+
+    std::atomic<size_t> next(0);
+    std::atomic<size_t> done(0);
+    std::atomic<size_t> failures(0);
+    std::atomic<unsigned long long> done_bytes(0);
+    std::atomic<unsigned int> running(0);
+    std::mutex mutex;
+    std::condition_variable finished;
+    auto report = [&]() {
+        progress(totals.files_done + done.load(), totals.files_total, totals.bytes_done + done_bytes.load(),
+                 totals.bytes_total);
+    };
+    auto worker = [&]() {
+        for (size_t i = next.fetch_add(1); i < tasks.size() && !is_cancelled(token); i = next.fetch_add(1)) {
+            const OrganizeTask& task = tasks[i];
+            if (apply_task(task)) {
+                journal.write("{\"done\": " + std::to_string(task.index) + "}", false);
+            } else {
+                failures.fetch_add(1);
+            }
+            done_bytes.fetch_add(task.size);
+            done.fetch_add(1);
+        }
+        std::lock_guard<std::mutex> lock(mutex);
+        if (running.fetch_sub(1) == 1) {
+            finished.notify_all();
+        }
+    };
+
+    unsigned int count = clamp_workers(workers, tasks.size());
+    unsigned int spawned = progress != nullptr ? count : count - 1;
+    running.store(spawned + (progress != nullptr ? 0 : 1));
+    std::vector<std::thread> pool;
+    for (unsigned int i = 0; i < spawned; ++i) {
+        pool.emplace_back(worker);
+    }
+    if (progress != nullptr) {
+        auto interval = std::chrono::milliseconds(std::max(interval_ms, 1));
+        std::unique_lock<std::mutex> lock(mutex);
+        while (!finished.wait_for(lock, interval, [&]() { return running.load() == 0; })) {
+            lock.unlock();
+            report();
+            lock.lock();
+        }
+    } else {
+        worker();  // The calling thread works too
+    }
+    for (auto& thread : pool) {
+        thread.join();
+    }
+    if (progress != nullptr) {
+        report();
+    }
+
+    totals.files_done += done.load();
+    totals.bytes_done += done_bytes.load();
+    totals.failures += failures.load();
+}
+
+// The OrganizeResult of a run; a complete one is marked so in its journal.
+static int finish_run(const RunTotals& totals, bool cancelled, OrganizeJournal& journal) {
+    if (cancelled) {
+        return ORGANIZE_CANCELLED;
+    }
+    if (totals.failures != 0) {
+        return ORGANIZE_PARTIAL;
+    }
+    journal.write("{\"end\": \"completed\"}", true);
+    return ORGANIZE_OK;
+}
+
+static int execute_tasks(const std::vector<OrganizeTask>& tasks, int workers, ProgressCallback progress,
+                         int interval_ms, CancelToken* token, OrganizeJournal& journal) {
+    RunTotals totals;
+    execute_batch(tasks, workers, progress, interval_ms, token, journal, totals);
+    return finish_run(totals, is_cancelled(token) && totals.files_done < totals.files_total, journal);
+}
+
+static bool open_journal(OrganizeJournal& journal, const char* journal_path, const char* mode, bool move,
+                         const std::filesystem::path& root) {
+    if (journal_path == nullptr || journal_path[0] == '\0') {
+        return true;
+    }
+    if (!journal.open(journal_path, false)) {
+        return false;
+    }
+    journal.write(std::string("{\"journal\": 1, \"mode\": ") + json_string(mode) +
+                  ", \"move\": " + (move ? "true" : "false") + ", \"source_dir\": " +
+                  json_string(root.string()) + ", \"destination\": " + json_string(root.string()) + "}", false);
+    return true;
+}
+
+// Create each target folder once, decide per folder whether a move can be a
+// rename, and journal the tasks before any of them runs.
+static bool prepare_tasks(const std::filesystem::path& root, std::vector<OrganizeTask>& tasks, bool move,
+                          OrganizeJournal& journal) {
+    std::set<std::string> folders;
+    for (const auto& task : tasks) {
+        folders.insert(task.target.parent_path().string());
+    }
+
+    // Record folders (and missing parents, outermost first) before creating
+    // them, so an undo can remove them again
+    std::set<std::string> journaled;
+    for (const auto& folder : folders) {
+        std::vector<std::filesystem::path> missing;
+        std::error_code ec;
+        for (std::filesystem::path path = folder; !path.empty() && !std::filesystem::exists(path, ec);
+             path = path.parent_path()) {
+            missing.push_back(path);
+        }
+        for (auto it = missing.rbegin(); it != missing.rend(); ++it) {
+            if (journaled.insert(it->string()).second) {
+                journal.write("{\"folder\": " + json_string(it->string()) + "}", false);
+            }
+        }
+    }
+    journal.write("", true);
+
+    std::map<std::string, bool> rename_ok;  // folder -> on the same device as the sources
+    for (const auto& folder : folders) {
+        std::error_code ec;
+        std::filesystem::create_directories(folder, ec);
+        if (ec) {
+            return false;
+        }
+        rename_ok[folder] = move && same_device(root, folder);
+    }
+    for (auto& task : tasks) {
+        task.op = !move ? "copy" : (rename_ok[task.target.parent_path().string()] ? "rename" : "move");
+        journal.write("{\"plan\": " + std::to_string(task.index) + ", \"op\": " + json_string(task.op) +
+                      ", \"source\": " + json_string(task.source.string()) + ", \"target\": " +
+                      json_string(task.target.string()) + ", \"bytes\": " + std::to_string(task.size) +
+                      ", \"status\": " +
+                      (task.unchanged ? "\"unchanged\"" : task.update ? "\"update\"" : "\"new\"") + "}", false);
+    }
+    journal.write("", true);
+    return true;
+}
+
+// Journal the plan, then execute it. journal_path may be null or empty.
+static int run_organize(const char* directory, const char* mode, std::vector<OrganizeTask>& tasks, int workers,
+                        bool move, ProgressCallback progress, int interval_ms, CancelToken* token,
+                        const char* journal_path) {
+    const std::filesystem::path root(directory);
+    OrganizeJournal journal;
+    if (!open_journal(journal, journal_path, mode, move, root) || !prepare_tasks(root, tasks, move, journal)) {
+        return ORGANIZE_ERROR;
+    }
+    return execute_tasks(tasks, workers, progress, interval_ms, token, journal);
+}
+
+// Organize a whole tree one batch at a time: each batch is walked, filtered,
+// journaled and executed before the walk goes on. Resuming an interrupted run
+// finishes the batches it had journaled; an incremental rerun picks up the
+// rest of the tree.
+template <typename FolderFn>
+static int run_organize_recursive(const char* directory, const char* mode, FolderFn folder_for,
+                                  std::shared_ptr<const CategoryRules> rules,
+                                  const WalkOptions& options, int workers, bool move, int incremental,
+                                  ProgressCallback progress, int interval_ms, CancelToken* token,
+                                  const char* journal_path, OrganizeCounts& counts) {
+    const std::filesystem::path root(directory);
+    OrganizeWalker walker(directory, options, std::move(rules));
+    OrganizeJournal journal;
+    if (!open_journal(journal, journal_path, mode, move, root)) {
+        return ORGANIZE_ERROR;
+    }
+
+    RunTotals totals;
+    std::vector<OrganizeTask> tasks;
+    size_t next_index = 0;
+    bool more = true;
+    while (!is_cancelled(token) && (more = walker.next_batch(folder_for, ORGANIZE_BATCH_SIZE, tasks))) {
+        filter_incremental(tasks, incremental, move, counts, next_index);
+        next_index += tasks.size();
+        if (!prepare_tasks(root, tasks, move, journal)) {
+            return totals.files_done != 0 ? ORGANIZE_PARTIAL : ORGANIZE_ERROR;
+        }
+        execute_batch(tasks, workers, progress, interval_ms, token, journal, totals);
+    }
+    if (walker.failed()) {
+        ++totals.failures;
+    }
+    return finish_run(totals, is_cancelled(token) && (more || totals.files_done < totals.files_total), journal);
+}
 
 extern "C" {
    
@@ -33,20 +1578,128 @@ extern "C" {
     }
 
     
+    DirectoryListing* get_directory_records(const char* directory_path) {
+        std::vector<FileRecord> records;
+        std::vector<std::tuple<size_t, size_t, size_t>> offsets;  // (path, name, category) offsets into the string pool
+        std::vector<std::string> categories;
+        std::string pool;
+        std::vector<std::pair<std::string, struct stat>> unknown;  // Files the name doesn't categorize
+        std::vector<size_t> unknown_records;
+        auto rules = active_category_rules();
+        double now = std::chrono::duration<double>(std::chrono::system_clock::now().time_since_epoch()).count();
+        try {
+            for (const auto& entry : std::filesystem::directory_iterator(directory_path)) {
+                std::string name = entry.path().filename().string();
+                if (name.empty() || name[0] == '.') {
+                    continue;
+                }
+
+                std::string path = entry.path().string();
+                struct stat st;
+                if (stat(path.c_str(), &st) != 0) {
+                    continue;
+                }
+
+                FileRecord record = {};
+                record.is_dir = S_ISDIR(st.st_mode) ? 1 : 0;
+                record.size = record.is_dir ? 0 : (unsigned long long)st.st_size;
+                record.modified = stat_seconds(st, true);
+                record.modified_ns = stat_mtime_ns(st);
+                record.created = stat_seconds(st, false);
+                std::string category = rules->match(name, record.size, now - record.modified);
+                if (S_ISREG(st.st_mode) && record.size > 0 && category == others_category()) {
+                    unknown.emplace_back(path, st);
+                    unknown_records.push_back(records.size());
+                }
+                records.push_back(record);
+                categories.push_back(category);
+
+                size_t path_offset = pool.size();
+                pool.append(path).push_back('\0');
+                size_t name_offset = path_offset + path.size() - name.size();
+                offsets.emplace_back(path_offset, name_offset, 0);
+            }
+        } catch (...) {
+            return nullptr;
+        }
+
+        // Read the headers of those files in one pooled pass
+        std::vector<const char*> sniffed = sniff_files(unknown);
+        for (size_t i = 0; i < sniffed.size(); ++i) {
+            size_t index = unknown_records[i];
+            records[index].sniffed = sniffed[i];
+            if (sniffed[i] != nullptr) {
+                std::string name(pool.c_str() + std::get<1>(offsets[index]));
+                categories[index] = rules->match(name + sniffed[i], records[index].size,
+                                                 now - records[index].modified);
+            }
+        }
+        for (size_t i = 0; i < records.size(); ++i) {
+            std::get<2>(offsets[i]) = pool.size();
+            pool.append(categories[i]).push_back('\0');
+        }
+
+        DirectoryListing* listing = (DirectoryListing*)malloc(sizeof(DirectoryListing));
+        listing->count = records.size();
+        listing->records = (FileRecord*)malloc((records.size() + 1) * sizeof(FileRecord));
+        listing->strings = (char*)malloc(pool.size() + 1);
+        memcpy(listing->strings, pool.data(), pool.size());
+        listing->strings[pool.size()] = '\0';
+        for (size_t i = 0; i < records.size(); ++i) {
+            records[i].path = listing->strings + std::get<0>(offsets[i]);
+            records[i].name = listing->strings + std::get<1>(offsets[i]);
+            records[i].category = listing->strings + std::get<2>(offsets[i]);
+            listing->records[i] = records[i];
+        }
+        return listing;
+    }
+
+    
+    void free_directory_records(DirectoryListing* listing) {
+        if (listing == nullptr) {
+            return;
+        }
+        free(listing->records);
+        free(listing->strings);
+        free(listing);
+    }
+
+    
     bool copy_file(const char* src, const char* dest) {
         try {
-            std::filesystem::copy(src, dest, std::filesystem::copy_options::overwrite_existing);
-            return true;
+            return copy_path(src, dest, COPY_AUTO) != COPY_FAILED;
         } catch (...) {
             return false;
         }
     }
 
     
+    // Returns the CopyStrategy that was used, or COPY_FAILED. strategy is
+    // COPY_AUTO or a single strategy to use without fallback (for benchmarks).
+    int copy_file_with(const char* src, const char* dest, int strategy) {
+        try {
+            return copy_path(src, dest, strategy);
+        } catch (...) {
+            return COPY_FAILED;
+        }
+    }
+
+    
+    const char* copy_strategy_name(int strategy) {
+        switch (strategy) {
+            case COPY_REFLINK: return "reflink";
+            case COPY_FILE_RANGE: return "copy_file_range";
+            case COPY_SENDFILE: return "sendfile";
+            case COPY_BUFFERED: return "buffered";
+            case COPY_FILESYSTEM: return "filesystem";
+            default: return "failed";
+        }
+    }
+
+    
     bool move_file(const char* src, const char* dest) {
         try {
-            std::filesystem::rename(src, dest);
-            return true;
+            return place_file(src, dest, true, true);
         } catch (...) {
             return false;
         }
@@ -63,70 +1716,251 @@ extern "C" {
     }
 
     
-    bool organize_by_date(const char* directory) {
+    CancelToken* create_cancel_token() {
+        return new CancelToken();
+    }
+
+    
+    void cancel_token_cancel(CancelToken* token) {
+        if (token != nullptr) {
+            token->cancelled.store(1);
+        }
+    }
+
+    
+    void free_cancel_token(CancelToken* token) {
+        delete token;
+    }
+
+    
+    // Returns an OrganizeResult. incremental is an OrganizeIncremental mode;
+    // progress (may be null) is called on the calling thread every
+    // interval_ms; token (may be null) cancels the run; journal_path (may be
+    // null) records the run for resume_organize and undo_organize; counts (may
+    // be null) receives how many targets were new, updated or unchanged.
+    int organize_by_date_progress(const char* directory, int workers, int move, int incremental,
+                                  ProgressCallback progress, int interval_ms, CancelToken* token,
+                                  const char* journal_path, OrganizeCounts* counts) {
         try {
-            for (const auto& entry : std::filesystem::directory_iterator(directory)) {
-                if (entry.is_regular_file()) {
-                    auto modified_time = entry.last_write_time();
-                    
-                    auto sctp = std::chrono::time_point_cast<std::chrono::system_clock::duration>(
-                        modified_time - std::filesystem::file_time_type::clock::now() + std::chrono::system_clock::now());
-                    std::time_t cftime = std::chrono::system_clock::to_time_t(sctp);
-                    std::tm* timeinfo = std::localtime(&cftime);
+            std::vector<OrganizeTask> tasks = plan_organize(directory, date_folder);
+            OrganizeCounts local = {};
+            OrganizeCounts& result = counts != nullptr ? *counts : local;
+            result = {};
+            filter_incremental(tasks, incremental, move != 0, result);
+            return run_organize(directory, "date", tasks, workers, move != 0, progress, interval_ms, token,
+                                journal_path);
+        } catch (...) {
+            return ORGANIZE_ERROR;
+        }
+    }
 
-                    char date_folder[11];
-                    std::strftime(date_folder, sizeof(date_folder), "%Y-%m-%d", timeinfo);
+    
+    int organize_by_type_progress(const char* directory, int workers, int move, int incremental,
+                                  ProgressCallback progress, int interval_ms, CancelToken* token,
+                                  const char* journal_path, OrganizeCounts* counts) {
+        try {
+            std::vector<OrganizeTask> tasks = plan_organize(directory, TypeFolder{active_category_rules()});
+            OrganizeCounts local = {};
+            OrganizeCounts& result = counts != nullptr ? *counts : local;
+            result = {};
+            filter_incremental(tasks, incremental, move != 0, result);
+            return run_organize(directory, "type", tasks, workers, move != 0, progress, interval_ms, token,
+                                journal_path);
+        } catch (...) {
+            return ORGANIZE_ERROR;
+        }
+    }
+
+    
+    // Organize the whole tree under directory. max_depth, include and exclude
+    // are as described for WalkOptions (include and exclude are null-terminated
+    // pattern arrays and may be null); the other arguments are as for
+    // organize_by_date_progress. The files total reported to progress grows
+    // while the walk is still running.
+    int organize_by_date_recursive(const char* directory, int max_depth, const char* const* include,
+                                   const char* const* exclude, int workers, int move, int incremental,
+                                   ProgressCallback progress, int interval_ms, CancelToken* token,
+                                   const char* journal_path, OrganizeCounts* counts) {
+        try {
+            OrganizeCounts local = {};
+            OrganizeCounts& result = counts != nullptr ? *counts : local;
+            result = {};
+            return run_organize_recursive(directory, "date", date_folder, active_category_rules(),
+                                          walk_options(max_depth, include, exclude),
+                                          workers, move != 0, incremental, progress, interval_ms, token,
+                                          journal_path, result);
+        } catch (...) {
+            return ORGANIZE_ERROR;
+        }
+    }
+
+    
+    int organize_by_type_recursive(const char* directory, int max_depth, const char* const* include,
+                                   const char* const* exclude, int workers, int move, int incremental,
+                                   ProgressCallback progress, int interval_ms, CancelToken* token,
+                                   const char* journal_path, OrganizeCounts* counts) {
+        try {
+            OrganizeCounts local = {};
+            OrganizeCounts& result = counts != nullptr ? *counts : local;
+            result = {};
+            auto rules = active_category_rules();
+            return run_organize_recursive(directory, "type", TypeFolder{rules}, rules,
+                                          walk_options(max_depth, include, exclude),
+                                          workers, move != 0, incremental, progress, interval_ms, token,
+                                          journal_path, result);
+        } catch (...) {
+            return ORGANIZE_ERROR;
+        }
+    }
 
-                    std::string new_path = std::string(directory) + "/" + date_folder;
-                    std::filesystem::create_directories(new_path);
-                    std::filesystem::copy(entry.path(), new_path + "/" + entry.path().filename().string(),
-                                          std::filesystem::copy_options::overwrite_existing);
+    
+    // Use the rules in the rule file at path for organizing by type from now
+    // on (null or empty: the built-in defaults). Returns 0, -1 if the file
+    // can't be read, or the line number of the first invalid rule; the rules
+    // in use only change on success.
+    int load_category_rules(const char* path) {
+        try {
+            std::string text = DEFAULT_CATEGORY_RULES;
+            if (path != nullptr && path[0] != '\0') {
+                std::ifstream file(path, std::ios::binary);
+                if (!file) {
+                    return -1;
                 }
+                std::ostringstream contents;
+                contents << file.rdbuf();
+                text = contents.str();
             }
-            return true;
+            auto rules = std::make_shared<CategoryRules>();
+            size_t error_line = rules->parse(text);
+            if (error_line != 0) {
+                return (int)error_line;
+            }
+            std::lock_guard<std::mutex> lock(category_rules_mutex);
+            current_category_rules() = rules;
+            return 0;
         } catch (...) {
-            return false;
+            return -1;
         }
     }
 
     
-    bool organize_by_type(const char* directory) {
+    // Finish an interrupted run from its journal: operations already marked
+    // done are skipped, and renames whose source is gone but whose target
+    // exists are recognised as done even if their entry was never synced.
+    int resume_organize(const char* journal_path, int workers, ProgressCallback progress, int interval_ms,
+                        CancelToken* token) {
         try {
-            std::map<std::string, std::vector<std::string>> categories = {
-                {"Images", {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".webp"}},
-                {"Videos", {".mp4", ".avi", ".mov", ".wmv", ".flv", ".mkv", ".webm"}},
-                {"Audio", {".mp3", ".wav", ".ogg", ".flac", ".aac", ".wma"}},
-                {"Documents", {".pdf", ".doc", ".docx", ".rtf", ".tex"}},
-                {"Spreadsheets", {".xls", ".xlsx", ".csv"}},
-                {"Presentations", {".ppt", ".pptx"}},
-                {"Text", {".txt", ".md", ".log"}},
-                {"Archives", {".zip", ".rar", ".7z", ".tar", ".gz", ".iso"}},
-                {"Executables", {".exe", ".msi", ".app"}},
-                {"OneNote", {".one", ".onetoc2"}}
-            };
-
-            for (const auto& entry : std::filesystem::directory_iterator(directory)) {
-                if (entry.is_regular_file()) {
-                    std::string ext = entry.path().extension().string();
-                    std::transform(ext.begin(), ext.end(), ext.begin(), ::tolower);  // Convert to lowercase
-                    std::string category = "Others";
-
-                    for (const auto& [cat_name, extensions] : categories) {
-                        if (std::find(extensions.begin(), extensions.end(), ext) != extensions.end()) {
-                            category = cat_name;
-                            break;
-                        }
-                    }
+            JournalState state;
+            if (!read_journal(journal_path, state)) {
+                return ORGANIZE_ERROR;
+            }
+            if (!state.end.empty()) {
+                return ORGANIZE_OK;
+            }
+            OrganizeJournal journal;
+            if (!journal.open(journal_path, true)) {
+                return ORGANIZE_ERROR;
+            }
 
-                    std::string new_path = std::string(directory) + "/" + category;
-                    std::filesystem::create_directories(new_path);
-                    std::filesystem::copy(entry.path(), new_path + "/" + entry.path().filename().string(),
-                                          std::filesystem::copy_options::overwrite_existing);
+            std::set<size_t> done(state.done.begin(), state.done.end());
+            std::vector<OrganizeTask> tasks;
+            for (const auto& task : state.plan) {
+                if (done.count(task.index)) {
+                    continue;
                 }
+                std::error_code ec;
+                if (task.op != "copy" && !std::filesystem::exists(task.source, ec) &&
+                    std::filesystem::exists(task.target, ec)) {
+                    journal.write("{\"done\": " + std::to_string(task.index) + "}", false);
+                    continue;
+                }
+                std::filesystem::create_directories(task.target.parent_path(), ec);
+                tasks.push_back(task);
             }
-            return true;
+            return execute_tasks(tasks, workers, progress, interval_ms, token, journal);
         } catch (...) {
-            return false;
+            return ORGANIZE_ERROR;
         }
     }
+
+    
+    // Reverse a journaled run, newest operation first: copies are deleted and
+    // moves are moved back. Folders the run created are removed if empty.
+    int undo_organize(const char* journal_path) {
+        try {
+            JournalState state;
+            if (!read_journal(journal_path, state)) {
+                return ORGANIZE_ERROR;
+            }
+            if (state.end == "undone") {
+                return ORGANIZE_OK;
+            }
+            OrganizeJournal journal;
+            if (!journal.open(journal_path, true)) {
+                return ORGANIZE_ERROR;
+            }
+
+            std::map<size_t, const OrganizeTask*> planned;
+            for (const auto& task : state.plan) {
+                planned[task.index] = &task;
+            }
+            size_t failures = 0;
+            for (auto it = state.done.rbegin(); it != state.done.rend(); ++it) {
+                auto found = planned.find(*it);
+                if (state.undone.count(*it) || found == planned.end()) {
+                    continue;
+                }
+                const OrganizeTask& task = *found->second;
+                // A copy that replaced an older target can't bring the old
+                // content back; it is left in place (it matches the source).
+                // A source removed next to an up-to-date target is copied back.
+                std::error_code ec;
+                bool undone = task.unchanged
+                    ? copy_path(task.target.string().c_str(), task.source.string().c_str(), COPY_AUTO) != COPY_FAILED
+                    : task.op == "copy"
+                    ? (task.update || (std::filesystem::remove(task.target, ec), !ec))
+                    : place_file(task.target, task.source, true, true);
+                if (undone) {
+                    journal.write("{\"undone\": " + std::to_string(task.index) + "}", false);
+                } else {
+                    ++failures;
+                }
+            }
+            for (auto it = state.folders.rbegin(); it != state.folders.rend(); ++it) {
+                std::error_code ec;
+                std::filesystem::remove(*it, ec);  // Only succeeds if the folder is empty
+            }
+            if (failures != 0) {
+                return ORGANIZE_PARTIAL;
+            }
+            journal.write("{\"end\": \"undone\"}", true);
+            return ORGANIZE_OK;
+        } catch (...) {
+            return ORGANIZE_ERROR;
+        }
+    }
+
+    
+    // workers <= 0 uses one worker per hardware thread; move != 0 moves the
+    // files into their folders instead of copying them.
+    bool organize_by_date_parallel(const char* directory, int workers, int move) {
+        return organize_by_date_progress(directory, workers, move, INCREMENTAL_OFF, nullptr, 0, nullptr, nullptr,
+                                        nullptr) == ORGANIZE_OK;
+    }
+
+    
+    bool organize_by_type_parallel(const char* directory, int workers, int move) {
+        return organize_by_type_progress(directory, workers, move, INCREMENTAL_OFF, nullptr, 0, nullptr, nullptr,
+                                        nullptr) == ORGANIZE_OK;
+    }
+
+    
+    bool organize_by_date(const char* directory) {
+        return organize_by_date_parallel(directory, 1, 0);
+    }
+
+    
+    bool organize_by_type(const char* directory) {
+        return organize_by_type_parallel(directory, 1, 0);
+    }
 }
@@ -3,9 +3,105 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
 import ctypes  
+import sqlite3
+import sys
+import atexit
 
 import datetime
 
+try:
+    from PIL import Image, ImageTk
+except ImportError:
+    Image = ImageTk = None
+
+# Categorizing, listing, caching and thumbnail code shared with the other
+# organizer GUI lives in organizer_common.py at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from organizer_common import (CATEGORY_ICONS, DEFAULT_CATEGORY_RULES, SORT_OPTIONS, category_rules_path,
+                              CategoryRules, ContentSniffer, DirectoryWatcher, DuplicateFinder, FileListing,
+                              HashCache, journal_path_for, load_category_rules, parse_category_rules,
+                              read_journal, ThumbnailCache, ThumbnailLoader, ThumbnailStore, walk_files)
+
+
+class FileRecord(ctypes.Structure):
+    _fields_ = [
+        ("name", ctypes.c_char_p),
+        ("path", ctypes.c_char_p),
+        ("size", ctypes.c_ulonglong),
+        ("modified", ctypes.c_double),
+        ("modified_ns", ctypes.c_longlong),
+        ("created", ctypes.c_double),
+        ("is_dir", ctypes.c_int),
+        ("sniffed", ctypes.c_char_p),  # Extension found from the content, for files the name doesn't categorize
+        ("category", ctypes.c_char_p),  # Category under the backend's rules, after sniffing
+    ]
+
+
+class DirectoryListing(ctypes.Structure):
+    _fields_ = [
+        ("records", ctypes.POINTER(FileRecord)),
+        ("count", ctypes.c_size_t),
+        ("strings", ctypes.c_void_p),
+    ]
+
+
+# Backend copy strategies (see CopyStrategy in file_organizer_backend.cpp)
+COPY_AUTO = -2
+COPY_FAILED = -1
+
+# Worker threads the backend uses to copy files when organizing
+ORGANIZE_WORKERS = min(8, os.cpu_count() or 1)
+
+# Backend organize results (see OrganizeResult in file_organizer_backend.cpp)
+ORGANIZE_OK = 0
+ORGANIZE_PARTIAL = 1
+ORGANIZE_CANCELLED = 2
+ORGANIZE_ERROR = 3
+ORGANIZE_PROGRESS_INTERVAL_MS = 100  # How often the backend reports organize progress
+
+# Backend incremental modes (see OrganizeIncremental): skip targets that are
+# already up to date, judged by size and date, or by content as well
+INCREMENTAL_METADATA = 1
+INCREMENTAL_CONTENT = 2
+
+# Organizing with subfolders: how deep to walk (-1 for no limit) and glob
+# patterns to leave out; hidden files and folders (.git, .cache, ...) by default
+ORGANIZE_MAX_DEPTH = -1
+ORGANIZE_EXCLUDE = [".*"]
+
+PROGRESS_POLL_MS = 66  # How often a progress window polls its worker, in milliseconds
+
+
+class OrganizeCounts(ctypes.Structure):
+    # Filled in by the backend: files created, updated and left unchanged
+    _fields_ = [("created", ctypes.c_ulonglong),
+                ("updated", ctypes.c_ulonglong),
+                ("unchanged", ctypes.c_ulonglong)]
+
+# Backend progress callback: (files done, files total, bytes done, bytes total)
+ProgressCallback = ctypes.CFUNCTYPE(None, ctypes.c_ulonglong, ctypes.c_ulonglong, ctypes.c_ulonglong,
+                                    ctypes.c_ulonglong)
+
+# File grid geometry. Only the visible rows plus a few rows of overscan above
+# and below get real widgets; those tiles are recycled as the view scrolls.
+TILE_WIDTH = 120
+TILE_HEIGHT = 150
+TILE_PADDING = 16
+OVERSCAN_ROWS = 2
+OFFSCREEN = -10000  # Canvas coordinate used to park unused tiles
+
+
+class FileTile:
+    # A reusable file tile: the widgets are created once and re-pointed at a
+    # different file record whenever the tile is recycled
+    def __init__(self, frame, thumb_frame, icon_label, name_label, window):
+        self.frame = frame
+        self.thumb_frame = thumb_frame
+        self.icon_label = icon_label
+        self.name_label = name_label
+        self.window = window
+        self.file_info = None
+
 
 lib = ctypes.CDLL('./file_organizer_backend.so')
 
@@ -13,6 +109,12 @@ lib = ctypes.CDLL('./file_organizer_backend.so')
 lib.get_directory_contents.argtypes = [ctypes.c_char_p]
 lib.get_directory_contents.restype = ctypes.POINTER(ctypes.c_char_p)
 
+lib.get_directory_records.argtypes = [ctypes.c_char_p]
+lib.get_directory_records.restype = ctypes.POINTER(DirectoryListing)
+
+lib.free_directory_records.argtypes = [ctypes.POINTER(DirectoryListing)]
+lib.free_directory_records.restype = None
+
 lib.copy_file.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
 lib.copy_file.restype = ctypes.c_bool
 
@@ -28,6 +130,40 @@ lib.organize_by_date.restype = ctypes.c_bool
 lib.organize_by_type.argtypes = [ctypes.c_char_p]
 lib.organize_by_type.restype = ctypes.c_bool
 
+lib.copy_file_with.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+lib.copy_file_with.restype = ctypes.c_int
+
+lib.copy_strategy_name.argtypes = [ctypes.c_int]
+lib.copy_strategy_name.restype = ctypes.c_char_p
+
+lib.create_cancel_token.argtypes = []
+lib.create_cancel_token.restype = ctypes.c_void_p
+
+lib.cancel_token_cancel.argtypes = [ctypes.c_void_p]
+lib.cancel_token_cancel.restype = None
+
+lib.free_cancel_token.argtypes = [ctypes.c_void_p]
+lib.free_cancel_token.restype = None
+
+for _kind in ("date", "type"):
+    _organize = getattr(lib, f"organize_by_{_kind}_progress")
+    _organize.argtypes = [ctypes.c_char_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ProgressCallback,
+                          ctypes.c_int, ctypes.c_void_p, ctypes.c_char_p, ctypes.POINTER(OrganizeCounts)]
+    _organize.restype = ctypes.c_int
+    _organize_recursive = getattr(lib, f"organize_by_{_kind}_recursive")
+    _organize_recursive.argtypes = [ctypes.c_char_p, ctypes.c_int, ctypes.POINTER(ctypes.c_char_p),
+                                    ctypes.POINTER(ctypes.c_char_p)] + _organize.argtypes[1:]
+    _organize_recursive.restype = ctypes.c_int
+
+lib.resume_organize.argtypes = [ctypes.c_char_p, ctypes.c_int, ProgressCallback, ctypes.c_int, ctypes.c_void_p]
+lib.resume_organize.restype = ctypes.c_int
+
+lib.undo_organize.argtypes = [ctypes.c_char_p]
+lib.undo_organize.restype = ctypes.c_int
+
+lib.load_category_rules.argtypes = [ctypes.c_char_p]
+lib.load_category_rules.restype = ctypes.c_int
+
 class FileOrganizerApp:
     def __init__(self, root):
         self.root = root
@@ -40,14 +176,14 @@ class FileOrganizerApp:
     
     def _load_directory_thread(self, directory):
         try:
-            result = lib.get_directory_contents(directory.encode('utf-8'))
+            result = lib.get_directory_contents(os.fsencode(directory))
             if not result:
                 raise Exception("Failed to load directory contents")
 
             files = []
             i = 0
             while result[i]:
-                file_path = result[i].decode('utf-8')
+                file_path = os.fsdecode(result[i])
                 stats = os.stat(file_path)
                 is_dir = os.path.isdir(file_path)
                 file_info = {
@@ -78,8 +214,8 @@ class FileOrganizerApp:
         if not destination:
             return
         try:
-            src = file_info["path"].encode('utf-8')
-            dest = os.path.join(destination, file_info["name"]).encode('utf-8')
+            src = os.fsencode(file_info["path"])
+            dest = os.fsencode(os.path.join(destination, file_info["name"]))
             success = lib.copy_file(src, dest)
             if success:
                 self.update_status(f"Copied {file_info['name']} to {destination}")
@@ -98,8 +234,8 @@ class FileOrganizerApp:
         if not destination:
             return
         try:
-            src = file_info["path"].encode('utf-8')
-            dest = os.path.join(destination, file_info["name"]).encode('utf-8')
+            src = os.fsencode(file_info["path"])
+            dest = os.fsencode(os.path.join(destination, file_info["name"]))
             success = lib.move_file(src, dest)
             if success:
                 self.update_status(f"Moved {file_info['name']} to {destination}")
@@ -118,7 +254,7 @@ class FileOrganizerApp:
         if not messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete {file_info['name']}?"):
             return
         try:
-            path = file_info["path"].encode('utf-8')
+            path = os.fsencode(file_info["path"])
             success = lib.delete_file(path)
             if success:
                 self.update_status(f"Deleted {file_info['name']}")
@@ -136,7 +272,7 @@ class FileOrganizerApp:
                                   f"Are you sure you want to organize files by date in {destination}?"):
             return
         try:
-            success = lib.organize_by_date(destination.encode('utf-8'))
+            success = lib.organize_by_date(os.fsencode(destination))
             if success:
                 messagebox.showinfo("Success", f"Files organized by date in {destination}")
                 if destination == self.current_dir:
@@ -155,7 +291,7 @@ class FileOrganizerApp:
                                   f"Are you sure you want to organize files by type in {destination}?"):
             return
         try:
-            success = lib.organize_by_type(destination.encode('utf-8'))
+            success = lib.organize_by_type(os.fsencode(destination))
             if success:
                 messagebox.showinfo("Success", f"Files organized by type in {destination}")
                 if destination == self.current_dir:
@@ -208,27 +344,42 @@ class FileOrganizerApp:
             self.current_theme = "light"
             self.selected_file = None  
             self.cancel_operation = False 
-            self.thumbnail_cache = {}  
-
-            
-            self.file_categories = {
-                "Images": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".webp"],
-                "Videos": [".mp4", ".avi", ".mov", ".wmv", ".flv", ".mkv", ".webm"],
-                "Audio": [".mp3", ".wav", ".ogg", ".flac", ".aac", ".wma"],
-                "Documents": [".pdf", ".doc", ".docx", ".rtf", ".tex"],
-                "Spreadsheets": [".xls", ".xlsx", ".csv"],
-                "Presentations": [".ppt", ".pptx"],
-                "Text": [".txt", ".md", ".log"],
-                "Archives": [".zip", ".rar", ".7z", ".tar", ".gz", ".iso"],
-                "Executables": [".exe", ".msi", ".app"],
-                "OneNote": [".one", ".onetoc2"],
-                "Others": []
-            }
+            self.cancel_token = None  # Backend CancelToken of the organize run in progress
+            self.organize_move = tk.BooleanVar(value=False)  # Move files when organizing instead of copying
+            self.organize_verify = tk.BooleanVar(value=False)  # Compare content, not just size and date, of existing targets
+            self.organize_recursive = tk.BooleanVar(value=False)  # Organize files in subfolders too
+            self.thumbnail_cache = ThumbnailCache()  
+            self.thumbnail_store = self.open_thumbnail_store()
+            self.hash_cache = self.open_hash_cache()
+            self.thumbnail_loader = ThumbnailLoader(self.root, self.on_thumbnails_ready, self.thumbnail_store)
+            self.sniffer = ContentSniffer()  # Categorizes changed files by content when the name doesn't tell
+
+            
+            # File categories, from the user's rule file or the default rules.
+            # The backend lists and organizes with the same rules.
+            rules_path = category_rules_path()
+            try:
+                self.category_rules = load_category_rules(rules_path)
+                error = lib.load_category_rules(os.fsencode(rules_path) if os.path.exists(rules_path) else None)
+                if error > 0:
+                    raise ValueError(f"line {error}: rule rejected by the backend")
+                if error < 0:
+                    raise OSError("the backend could not read it")
+            except (OSError, ValueError) as e:
+                messagebox.showwarning("Category Rules", f"Could not load {rules_path}: {e}\n"
+                                                         f"Using the default categories.")
+                self.category_rules = CategoryRules(parse_category_rules(DEFAULT_CATEGORY_RULES))
+                lib.load_category_rules(None)
+            self.watcher = DirectoryWatcher(self.root, self.on_directory_changes, self.on_watch_overflow,
+                                            self.category_rules, self.sniffer)
 
             
             self.current_dir = os.path.expanduser("~")
             self.files = []
+            self.listing = FileListing(self.files)
             self.filtered_files = []
+            self.load_generation = 0  # Bumped on every load so stale loads can be ignored
+            self.pending_changes = None  # Watcher changes reported while a load is running
             self.current_category = "All"
             self.current_sort = "Name (A-Z)"
 
@@ -312,7 +463,9 @@ class FileOrganizerApp:
 
             
             self.browse_button = ttk.Button(self.top_bar, text="Browse", command=self.browse_directory)
-            self.browse_button.pack(side=tk.LEFT, padx=(0, 16))
+            self.browse_button.pack(side=tk.LEFT, padx=(0, 8))
+            self.duplicates_button = ttk.Button(self.top_bar, text="Find Duplicates...", command=self.find_duplicates)
+            self.duplicates_button.pack(side=tk.LEFT, padx=(0, 16))
 
             
             theme_icon = "🌙" if self.current_theme == "light" else "☀️"
@@ -335,7 +488,7 @@ class FileOrganizerApp:
             self.create_category_button("All", True)
 
             
-            for category in self.file_categories:
+            for category in self.category_rules.categories:
                 self.create_category_button(category)
 
            
@@ -348,7 +501,7 @@ class FileOrganizerApp:
 
            
             ttk.Label(self.controls_bar, text="Sort by:").pack(side=tk.LEFT, padx=(0, 8))
-            self.sort_options = ["Name (A-Z)", "Name (Z-A)", "Date (Newest)", "Date (Oldest)", "Size (Largest)", "Size (Smallest)"]
+            self.sort_options = list(SORT_OPTIONS)
             self.sort_var = tk.StringVar(value=self.sort_options[0])
             self.sort_combo = ttk.Combobox(self.controls_bar, textvariable=self.sort_var, values=self.sort_options, state="readonly", width=15)
             self.sort_combo.pack(side=tk.LEFT, padx=(0, 16))
@@ -361,6 +514,17 @@ class FileOrganizerApp:
             self.organize_by_type_button = ttk.Button(self.controls_bar, text="Organize by Type", 
                                                     command=self.organize_by_type, style="Success.TButton")
             self.organize_by_type_button.pack(side=tk.RIGHT)
+            self.organize_move_check = ttk.Checkbutton(self.controls_bar, text="Move files", variable=self.organize_move)
+            self.organize_move_check.pack(side=tk.RIGHT, padx=(0, 8))
+            self.organize_verify_check = ttk.Checkbutton(self.controls_bar, text="Verify content",
+                                                         variable=self.organize_verify)
+            self.organize_verify_check.pack(side=tk.RIGHT, padx=(0, 8))
+            self.organize_recursive_check = ttk.Checkbutton(self.controls_bar, text="Subfolders",
+                                                            variable=self.organize_recursive)
+            self.organize_recursive_check.pack(side=tk.RIGHT, padx=(0, 8))
+            self.undo_organize_button = ttk.Button(self.controls_bar, text="Undo Organize...",
+                                                   command=self.undo_organization)
+            self.undo_organize_button.pack(side=tk.RIGHT, padx=(0, 8))
 
            
             self.files_canvas = tk.Canvas(self.content_area, bg=self.themes[self.current_theme]["background"], 
@@ -370,12 +534,17 @@ class FileOrganizerApp:
            
             self.scrollbar = ttk.Scrollbar(self.content_area, orient=tk.VERTICAL, command=self.files_canvas.yview)
             self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            self.files_canvas.configure(yscrollcommand=self.scrollbar.set)
+            self.files_canvas.configure(yscrollcommand=self.on_canvas_scroll)
 
             
             self.files_frame = ttk.Frame(self.files_canvas)
             self.files_canvas_window = self.files_canvas.create_window((0, 0), window=self.files_frame, anchor=tk.NW)
 
+            
+            self.visible_tiles = {}
+            self.free_tiles = []
+            self.grid_cols = 1
+
            
             self.files_frame.bind("<Configure>", self.on_frame_configure)
             self.files_canvas.bind("<Configure>", self.on_canvas_configure)
@@ -413,27 +582,10 @@ class FileOrganizerApp:
             frame.bind("<Button-1>", lambda e, cat=category: self.select_category(cat))
 
            
-            icon_text = "📁"  
-            if category == "Images":
-                icon_text = "🖼️"
-            elif category == "Videos":
-                icon_text = "🎬"
-            elif category == "Audio":
-                icon_text = "🎵"
-            elif category == "Documents":
-                icon_text = "📝"
-            elif category == "Spreadsheets":
-                icon_text = "📊"
-            elif category == "Presentations":
-                icon_text = "📊"
-            elif category == "Text":
-                icon_text = "📄"
-            elif category == "Archives":
-                icon_text = "📦"
-            elif category == "Executables":
-                icon_text = "⚙️"
-            elif category == "All":
+            if category == "All":
                 icon_text = "🏠"
+            else:
+                icon_text = CATEGORY_ICONS.get(category, "📁")
             icon_label = tk.Label(frame, text=icon_text, bg=theme["background"], fg=theme["primary"])
             icon_label.pack(side=tk.LEFT, padx=(8, 4))
             icon_label.bind("<Button-1>", lambda e, cat=category: self.select_category(cat))
@@ -468,222 +620,358 @@ class FileOrganizerApp:
             self.update_status(f"Sorted by: {self.current_sort}")
 
         def filter_and_sort_files(self):
-           
-            if self.current_category == "All":
-                self.filtered_files = self.files.copy()
-            else:
-                extensions = self.file_categories.get(self.current_category, [])
-                if extensions:  
-                    self.filtered_files = [f for f in self.files if os.path.splitext(f["name"])[1].lower() in extensions]
-                else:  
-                    all_extensions = []
-                    for exts in self.file_categories.values():
-                        all_extensions.extend(exts)
-                    self.filtered_files = [f for f in self.files if os.path.splitext(f["name"])[1].lower() not in all_extensions]
-
-           
-            if self.current_sort == "Name (A-Z)":
-                self.filtered_files.sort(key=lambda x: x["name"].lower())
-            elif self.current_sort == "Name (Z-A)":
-                self.filtered_files.sort(key=lambda x: x["name"].lower(), reverse=True)
-            elif self.current_sort == "Date (Newest)":
-                self.filtered_files.sort(key=lambda x: x["modified"], reverse=True)
-            elif self.current_sort == "Date (Oldest)":
-                self.filtered_files.sort(key=lambda x: x["modified"])
-            elif self.current_sort == "Size (Largest)":
-                self.filtered_files.sort(key=lambda x: x["size"], reverse=True)
-            elif self.current_sort == "Size (Smallest)":
-                self.filtered_files.sort(key=lambda x: x["size"])
+            self.filtered_files = self.listing.view(self.current_category, self.current_sort)
 
         def load_directory(self, directory):
             
+            if directory != self.current_dir:
+                self.thumbnail_cache.drop_folder(self.current_dir)
+
             self.current_dir = directory
             self.path_label.config(text=directory)
             
             self.files = []
+            self.listing = FileListing(self.files)
+            self.filtered_files = []
+
+            # Invalidate any load still running for the previous directory, and
+            # keep the changes the watcher reports until this one lands
+            self.load_generation += 1
+            self.pending_changes = []
+            self.watcher.watch(directory)
 
             
             self.update_status("Loading files...")
 
             
-            threading.Thread(target=self._load_directory_backend, args=(directory,), daemon=True).start()
+            threading.Thread(target=self._load_directory_backend, args=(directory, self.load_generation),
+                             daemon=True).start()
 
-        def _load_directory_backend(self, directory):
+        def _load_directory_backend(self, directory, generation):
             try:
-                
-                lib = ctypes.CDLL('./file_organizer_backend.so')  
-                lib.get_directory_contents.argtypes = [ctypes.c_char_p]
-                lib.get_directory_contents.restype = ctypes.POINTER(ctypes.c_char_p)
-
-                result = lib.get_directory_contents(directory.encode('utf-8'))
-                if not result:
+                listing = lib.get_directory_records(os.fsencode(directory))
+                if not listing:
                     raise Exception("Failed to load directory contents")
 
                 
-                files = []
-                i = 0
-                while result[i]:
-                    file_path = result[i].decode('utf-8')
-                    files.append(file_path)
-                    i += 1
+                try:
+                    files = self._process_backend_records(listing.contents)
+                finally:
+                    lib.free_directory_records(listing)
 
-                
-                self.files = self._process_backend_files(files)
+                # The listing and its views belong to the Tk thread
+                self.root.after(0, lambda: self._replace_files(generation, files))
+            except Exception as e:
+                self.root.after(0, lambda: self._load_failed(generation, str(e)))
 
-               
-                self.filter_and_sort_files()
+        def _replace_files(self, generation, files):
+            # Swap in a finished listing, unless the user navigated elsewhere
+            if generation != self.load_generation:
+                return
 
-                
-                self.root.after(0, self.display_files)
-                self.root.after(0, lambda: self.update_status(f"Loaded {len(self.files)} items"))
-                self.root.after(0, lambda: self.file_count_label.config(text=f"{len(self.filtered_files)} items"))
-            except Exception as e:
-                self.root.after(0, lambda: self.update_status(f"Error: {str(e)}"))
+            self.files = files
+            self.listing = FileListing(files)
 
-        def _process_backend_files(self, files):
-            
+            # Changes reported during the load may or may not be in it; add()
+            # replaces by path, so applying them again is harmless
+            for path, record in self.pending_changes or ():
+                if record is None:
+                    self.listing.remove(path)
+                else:
+                    self.listing.add(record)
+            self.pending_changes = None
+
+            self.filter_and_sort_files()
+            self.display_files()
+            self.update_status(f"Loaded {len(self.files)} items")
+            self.file_count_label.config(text=f"{len(self.filtered_files)} items")
+
+        def _load_failed(self, generation, message):
+            if generation != self.load_generation:
+                return
+            self.pending_changes = None
+            self.update_status(f"Error: {message}")
+
+        def _process_backend_records(self, listing):
+            # The backend already stat'ed, sniffed and categorized every entry
+            # with the app's rules, so this only copies fields
             processed_files = []
-            for file_path in files:
-                stats = os.stat(file_path)
-                is_dir = os.path.isdir(file_path)
-                file_info = {
-                    "name": os.path.basename(file_path),
-                    "path": file_path,
-                    "size": stats.st_size if not is_dir else 0,
-                    "created": stats.st_ctime,
-                    "modified": stats.st_mtime,
-                    "is_dir": is_dir
-                }
-                processed_files.append(file_info)
+            records = listing.records
+            for i in range(listing.count):
+                record = records[i]
+                name = os.fsdecode(record.name)
+                processed_files.append({
+                    "name": name,
+                    "path": os.fsdecode(record.path),
+                    "size": record.size,
+                    "created": record.created,
+                    "modified": record.modified,
+                    "modified_ns": record.modified_ns,
+                    "is_dir": bool(record.is_dir),
+                    "category": record.category.decode('utf-8'),
+                    "sniffed": record.sniffed.decode('utf-8') if record.sniffed else None
+                })
             return processed_files
 
+        def on_directory_changes(self, directory, changes):
+            if directory != self.current_dir:
+                return
+            if self.pending_changes is not None:
+                for path, _ in changes:
+                    self.thumbnail_cache.discard(path)
+                self.pending_changes.extend(changes)
+                return
+            for path, record in changes:
+                self.thumbnail_cache.discard(path)
+                if record is None:
+                    self.listing.remove(path)
+                else:
+                    self.listing.add(record)
+            self.refresh_view()
+
+        def on_watch_overflow(self, directory):
+            if directory == self.current_dir:
+                self.load_directory(self.current_dir)
+
+        def remove_file_entry(self, file_info):
+            # Without a watcher, reload so other changes are picked up too
+            if not self.watcher.available:
+                self.load_directory(self.current_dir)
+                return
+            if self.pending_changes is not None:
+                self.pending_changes.append((file_info["path"], None))
+                return
+            if self.listing.remove(file_info["path"]) is not None:
+                self.refresh_view()
+
+        def refresh_after_organize(self, destination):
+            # The watcher reports new category folders itself
+            if destination == self.current_dir and not self.watcher.available:
+                self.load_directory(self.current_dir)
+
+        def refresh_view(self):
+            self.filter_and_sort_files()
+            self.display_files()
+            self.file_count_label.config(text=f"{len(self.filtered_files)} items")
+
         def display_files(self):
-            
+            # Clear the empty folder message, if any
             for widget in self.files_frame.winfo_children():
                 widget.destroy()
-
-            
+        
+            # Release all tiles so they get re-pointed at the new listing
+            for tile in self.visible_tiles.values():
+                self._park_tile(tile)
+            self.visible_tiles = {}
+        
+            # Calculate grid layout based on canvas width
             canvas_width = self.files_canvas.winfo_width()
-            tile_width = 120
-            padding = 16
-            cols = max(1, (canvas_width - padding) // (tile_width + padding))
+            self.grid_cols = max(1, (canvas_width - TILE_PADDING) // (TILE_WIDTH + TILE_PADDING))
+        
             theme = self.themes[self.current_theme]
-
-            
+        
+            # Check if directory is empty
             if not self.filtered_files:
-                
+                self.files_canvas.coords(self.files_canvas_window, 0, 0)
+            
+                # Create empty folder message
                 empty_frame = tk.Frame(self.files_frame, bg=theme["background"])
                 empty_frame.pack(expand=True, fill=tk.BOTH, pady=50)
+            
                 empty_icon = tk.Label(empty_frame, text="📂", font=("Segoe UI", 48), 
-                                    bg=theme["background"], fg=theme["text_secondary"])
+                                     bg=theme["background"], fg=theme["text_secondary"])
                 empty_icon.pack(pady=(20, 10))
+            
                 empty_text = tk.Label(empty_frame, text="This folder is empty", font=("Segoe UI", 14),
-                                    bg=theme["background"], fg=theme["text_secondary"])
+                                     bg=theme["background"], fg=theme["text_secondary"])
                 empty_text.pack()
+            
                 empty_subtext = tk.Label(empty_frame, text="Drag and drop files here or use the organize functions",
                                         bg=theme["background"], fg=theme["text_secondary"])
                 empty_subtext.pack(pady=(5, 20))
+            
+                self.files_frame.update_idletasks()
+                self.files_canvas.config(scrollregion=self.files_canvas.bbox(self.files_canvas_window))
                 return
+        
+            # Move the (now empty) message frame out of the way of the tiles
+            self.files_canvas.coords(self.files_canvas_window, OFFSCREEN, OFFSCREEN)
+        
+            # The scroll region covers every row, even though only a few exist as widgets
+            rows = (len(self.filtered_files) + self.grid_cols - 1) // self.grid_cols
+            self.files_canvas.config(scrollregion=(0, 0, canvas_width, rows * (TILE_HEIGHT + TILE_PADDING)))
+        
+            self.render_visible_tiles()
 
-           
-            row, col = 0, 0
-            for file_info in self.filtered_files:
-               
-                tile_frame = tk.Frame(self.files_frame, width=tile_width, height=150, 
-                                    bg=theme["card"], bd=1, relief=tk.SOLID, 
-                                    highlightbackground=theme["border"], highlightthickness=1)
-                tile_frame.grid(row=row, column=col, padx=padding//2, pady=padding//2, sticky="nsew")
-                tile_frame.pack_propagate(False)
-
-               
-                tile_frame.bind("<Button-1>", lambda e, f=file_info: self.select_file(f))
-                tile_frame.bind("<Double-Button-1>", lambda e, f=file_info: self.open_file(f))
-                tile_frame.bind("<Button-3>", lambda e, f=file_info: self.show_context_menu(e, f))
-                tile_frame.bind("<Enter>", lambda e, frame=tile_frame, f=file_info: self.on_tile_hover(frame, f, True))
-                tile_frame.bind("<Leave>", lambda e, frame=tile_frame, f=file_info: self.on_tile_hover(frame, False))
-
-                
-                if file_info["is_dir"]:
-                    icon_label = tk.Label(tile_frame, text="📁", font=("Segoe UI", 32), bg=theme["card"], fg=theme["primary"])
-                    icon_label.pack(pady=(16, 8))
-                else:
-                   
-                    ext = os.path.splitext(file_info["name"])[1].lower()
-                    
-                    if ext in self.file_categories["Images"]:
-                       
-                        thumb_frame = tk.Frame(tile_frame, width=80, height=80, bg=theme["card"])
-                        thumb_frame.pack(pady=(16, 8))
-                        thumb_frame.pack_propagate(False)
-                       
-                        try:
-                        
-                            if file_info["path"] in self.thumbnail_cache:
-                                thumbnail = self.thumbnail_cache[file_info["path"]]
-                            else:
-                               
-                                img = Image.open(file_info["path"])
-                                img.thumbnail((80, 80))
-                                thumbnail = ImageTk.PhotoImage(img)
-                                
-                                self.thumbnail_cache[file_info["path"]] = thumbnail
-                            
-                            thumb_label = tk.Label(thumb_frame, image=thumbnail, bg=theme["card"])
-                            thumb_label.image = thumbnail  
-                            thumb_label.pack(fill=tk.BOTH, expand=True)
-                        except Exception:
-                         
-                            icon_label = tk.Label(thumb_frame, text="🖼️", font=("Segoe UI", 32), 
-                                                bg=theme["card"], fg=theme["text"])
-                            icon_label.pack(fill=tk.BOTH, expand=True)
-                    elif ext in self.file_categories["Videos"]:
-                        
-                        icon_label = tk.Label(tile_frame, text="🎬", font=("Segoe UI", 32), 
-                                            bg=theme["card"], fg=theme["text"])
-                        icon_label.pack(pady=(16, 8))
-                    else:
-                        
-                        icon_text = "📄" 
-                        if ext in self.file_categories["Audio"]:
-                            icon_text = "🎵"
-                        elif ext in self.file_categories["Documents"]:
-                            icon_text = "📝"
-                        elif ext in self.file_categories["Spreadsheets"]:
-                            icon_text = "📊"
-                        elif ext in self.file_categories["Presentations"]:
-                            icon_text = "📊"
-                        elif ext in self.file_categories["Archives"]:
-                            icon_text = "📦"
-                        elif ext in self.file_categories["Executables"]:
-                            icon_text = "⚙️"
-                        icon_label = tk.Label(tile_frame, text=icon_text, font=("Segoe UI", 32), 
-                                            bg=theme["card"], fg=theme["text"])
-                        icon_label.pack(pady=(16, 8))
-
-                
-                name = file_info["name"]
-                display_name = name
-                if len(name) > 15:
-                    display_name = name[:12] + "..."
-                name_label = tk.Label(tile_frame, text=display_name, bg=theme["card"], fg=theme["text"], 
-                                    font=("Segoe UI", 9), wraplength=tile_width-10)
-                name_label.pack(pady=(0, 8))
-
-                
-                for widget in tile_frame.winfo_children():
-                    widget.bind("<Button-1>", lambda e, f=file_info: self.select_file(f))
-                    widget.bind("<Double-Button-1>", lambda e, f=file_info: self.open_file(f))
-                    widget.bind("<Button-3>", lambda e, f=file_info: self.show_context_menu(e, f))
-                    widget.bind("<Enter>", lambda e, frame=tile_frame, f=file_info: self.on_tile_hover(frame, f, True))
-                    widget.bind("<Leave>", lambda e, frame=tile_frame, f=file_info: self.on_tile_hover(frame, False))
-
-                col += 1
-                if col >= cols:
-                    col = 0
-                    row += 1
+        def render_visible_tiles(self):
+            if not self.filtered_files:
+                return
+        
+            # Work out which rows intersect the viewport, plus overscan
+            row_height = TILE_HEIGHT + TILE_PADDING
+            top = self.files_canvas.canvasy(0)
+            bottom = top + self.files_canvas.winfo_height()
+            rows = (len(self.filtered_files) + self.grid_cols - 1) // self.grid_cols
+            first_row = max(0, int(top // row_height) - OVERSCAN_ROWS)
+            last_row = min(rows - 1, int(bottom // row_height) + OVERSCAN_ROWS)
+            first = first_row * self.grid_cols
+            last = min(len(self.filtered_files), (last_row + 1) * self.grid_cols)
+        
+            # Recycle tiles that scrolled out of range
+            for index in list(self.visible_tiles):
+                if index < first or index >= last:
+                    tile = self.visible_tiles.pop(index)
+                    self._park_tile(tile)
+                    self.free_tiles.append(tile)
+        
+            # Fill the rows in range, reusing free tiles before creating new ones
+            for index in range(first, last):
+                if index in self.visible_tiles:
+                    continue
+                tile = self.free_tiles.pop() if self.free_tiles else self._create_tile()
+                self._assign_tile(tile, self.filtered_files[index])
+                row, col = divmod(index, self.grid_cols)
+                self.files_canvas.coords(tile.window,
+                                         TILE_PADDING // 2 + col * (TILE_WIDTH + TILE_PADDING),
+                                         TILE_PADDING // 2 + row * row_height)
+                self.visible_tiles[index] = tile
+        
+            # Queue thumbnails for tiles still showing a placeholder: rows actually
+            # on screen first, then the overscan rows. Anything else is cancelled.
+            visible_first = int(top // row_height) * self.grid_cols
+            visible_last = (int(bottom // row_height) + 1) * self.grid_cols
+            requests = []
+            for index in range(first, last):
+                file_info = self.filtered_files[index]
+                if self.needs_thumbnail(file_info):
+                    priority = 0 if visible_first <= index < visible_last else 1
+                    requests.append((file_info, priority))
+            requests.sort(key=lambda r: r[1])
+            self.thumbnail_loader.request(requests)
+
+        def _create_tile(self):
+            theme = self.themes[self.current_theme]
+        
+            # Create file tile frame with border
+            tile_frame = tk.Frame(self.files_canvas, width=TILE_WIDTH, height=TILE_HEIGHT, 
+                                 bg=theme["card"], bd=1, relief=tk.SOLID, 
+                                 highlightbackground=theme["border"], highlightthickness=1)
+            tile_frame.pack_propagate(False)
+        
+            # Fixed-size holder for either an icon or a thumbnail
+            thumb_frame = tk.Frame(tile_frame, width=80, height=80, bg=theme["card"])
+            thumb_frame.pack(pady=(16, 8))
+            thumb_frame.pack_propagate(False)
+        
+            icon_label = tk.Label(thumb_frame, font=("Segoe UI", 32), bg=theme["card"], fg=theme["text"])
+            icon_label.pack(fill=tk.BOTH, expand=True)
+        
+            name_label = tk.Label(tile_frame, bg=theme["card"], fg=theme["text"], 
+                                 font=("Segoe UI", 9), wraplength=TILE_WIDTH-10)
+            name_label.pack(pady=(0, 8))
+        
+            window = self.files_canvas.create_window(OFFSCREEN, OFFSCREEN, window=tile_frame, anchor=tk.NW)
+            tile = FileTile(tile_frame, thumb_frame, icon_label, name_label, window)
+        
+            # Bind events once; handlers look up whichever file the tile shows now
+            for widget in (tile_frame, thumb_frame, icon_label, name_label):
+                widget.bind("<Button-1>", lambda e, t=tile: self.select_file(t.file_info))
+                widget.bind("<Double-Button-1>", lambda e, t=tile: self.open_file(t.file_info))
+                widget.bind("<Button-3>", lambda e, t=tile: self.show_context_menu(e, t.file_info))
+                widget.bind("<Enter>", lambda e, t=tile: self.on_tile_hover(t.frame, t.file_info, True))
+                widget.bind("<Leave>", lambda e, t=tile: self.on_tile_hover(t.frame, None, False))
+        
+            return tile
 
-            self.files_frame.update_idletasks()
-            self.files_canvas.config(scrollregion=self.files_canvas.bbox("all"))
+        def _assign_tile(self, tile, file_info):
+            theme = self.themes[self.current_theme]
+            tile.file_info = file_info
+        
+            # Reset colors in case the theme changed since the tile was created
+            tile.frame.config(bg=theme["card"], highlightbackground=theme["border"])
+            tile.thumb_frame.config(bg=theme["card"])
+        
+            # File icon or thumbnail
+            thumbnail = None
+            icon_text = self.get_file_icon(file_info)
+            icon_color = theme["primary"]
+            if not file_info["is_dir"]:
+                icon_color = theme["text"]
+            
+                if file_info["category"] == "Images":
+                    thumbnail = self.thumbnail_cache.get(file_info["path"])
+        
+            if thumbnail is not None:
+                tile.icon_label.config(image=thumbnail, text="", bg=theme["card"])
+                tile.icon_label.image = thumbnail  # Keep a reference
+            else:
+                tile.icon_label.config(image="", text=icon_text, bg=theme["card"], fg=icon_color)
+                tile.icon_label.image = None
+        
+            # File name (truncated if too long)
+            name = file_info["name"]
+            display_name = name
+            if len(name) > 15:
+                display_name = name[:12] + "..."
+            tile.name_label.config(text=display_name, bg=theme["card"], fg=theme["text"])
+
+        def open_thumbnail_store(self):
+            # Thumbnails persist across restarts when the cache directory is usable
+            try:
+                store = ThumbnailStore()
+            except (OSError, sqlite3.Error):
+                return None
+            atexit.register(store.close)
+            return store
+
+        def open_hash_cache(self):
+            # Content hashes persist across restarts when the cache directory is usable
+            try:
+                cache = HashCache()
+            except (OSError, sqlite3.Error):
+                return None
+            atexit.register(cache.close)
+            return cache
+
+        def flush_hash_cache(self):
+            # Write hashes out once a search is done, in case the app is killed
+            if self.hash_cache is not None:
+                try:
+                    self.hash_cache.flush()
+                except sqlite3.Error:
+                    pass
+
+        def needs_thumbnail(self, file_info):
+            if Image is None or file_info["is_dir"] or file_info["path"] in self.thumbnail_cache:
+                return False
+            return file_info["category"] == "Images"
+
+        def on_thumbnails_ready(self, results):
+            # PhotoImage objects must be created on the Tk thread
+            ready = {}
+            for path, image in results:
+                # If thumbnail generation failed, cache None so the default icon stays
+                ready[path] = ImageTk.PhotoImage(image) if image is not None else None
+                self.thumbnail_cache.put(path, ready[path])
+        
+            # Swap the thumbnails into whichever tiles currently show those files
+            for tile in self.visible_tiles.values():
+                if tile.file_info is not None and tile.file_info["path"] in ready:
+                    thumbnail = ready[tile.file_info["path"]]
+                    if thumbnail is not None and tile.icon_label.image is not thumbnail:
+                        tile.icon_label.config(image=thumbnail, text="")
+                        tile.icon_label.image = thumbnail  # Keep a reference
+
+        def _park_tile(self, tile):
+            # Move an unused tile outside the scroll region instead of destroying it
+            self.files_canvas.coords(tile.window, OFFSCREEN, OFFSCREEN)
+            tile.file_info = None
+
+        def get_file_icon(self, file_info):
+            # Set icon based on file type
+            if file_info["is_dir"]:
+                return "📁"
+            return CATEGORY_ICONS.get(file_info["category"], "📄")  # Default file icon
 
         def on_tile_hover(self, frame, file_info=None, is_hover=True):
             theme = self.themes[self.current_theme]
@@ -703,7 +991,12 @@ class FileOrganizerApp:
                 self.tooltip.place_forget()
 
         def on_frame_configure(self, event):
-            self.files_canvas.configure(scrollregion=self.files_canvas.bbox("all"))
+            if not self.filtered_files:
+                self.files_canvas.configure(scrollregion=self.files_canvas.bbox(self.files_canvas_window))
+
+        def on_canvas_scroll(self, first, last):
+            self.scrollbar.set(first, last)
+            self.render_visible_tiles()
 
         def on_canvas_configure(self, event):
             self.files_canvas.itemconfig(self.files_canvas_window, width=event.width)
@@ -780,27 +1073,7 @@ class FileOrganizerApp:
             content_frame = tk.Frame(details_window, bg=theme["background"], padx=20, pady=20)
             content_frame.pack(fill=tk.BOTH, expand=True)
 
-            if file_info["is_dir"]:
-                icon_text = "📁"
-            else:
-                ext = os.path.splitext(file_info["name"])[1].lower()
-                icon_text = "📄"  # Default
-                if ext in self.file_categories["Images"]:
-                    icon_text = "🖼️"
-                elif ext in self.file_categories["Videos"]:
-                    icon_text = "🎬"
-                elif ext in self.file_categories["Audio"]:
-                    icon_text = "🎵"
-                elif ext in self.file_categories["Documents"]:
-                    icon_text = "📝"
-                elif ext in self.file_categories["Spreadsheets"]:
-                    icon_text = "📊"
-                elif ext in self.file_categories["Presentations"]:
-                    icon_text = "📊"
-                elif ext in self.file_categories["Archives"]:
-                    icon_text = "📦"
-                elif ext in self.file_categories["Executables"]:
-                    icon_text = "⚙️"
+            icon_text = self.get_file_icon(file_info)
             icon_label = tk.Label(content_frame, text=icon_text, font=("Segoe UI", 48),
                                 bg=theme["background"], fg=theme["primary"])
             icon_label.grid(row=0, column=0, rowspan=3, padx=(0, 20), sticky="n")
@@ -872,17 +1145,15 @@ class FileOrganizerApp:
 
         def _copy_file_backend(self, file_info, destination):
             try:
-                lib = ctypes.CDLL('./file_organizer_backend.so')  
-                lib.copy_file.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
-                lib.copy_file.restype = ctypes.c_bool
+                src = os.fsencode(file_info["path"])
+                dest = os.fsencode(os.path.join(destination, file_info["name"]))
 
-                src = file_info["path"].encode('utf-8')
-                dest = os.path.join(destination, file_info["name"]).encode('utf-8')
-
-                success = lib.copy_file(src, dest)
+                used = lib.copy_file_with(src, dest, COPY_AUTO)
+                success = used != COPY_FAILED
                 if success:
+                    strategy = lib.copy_strategy_name(used).decode('utf-8')
                     self.root.after(0, lambda: messagebox.showinfo("Success", f"File copied successfully to {destination}"))
-                    self.root.after(0, lambda: self.update_status(f"Copied {file_info['name']} to {destination}"))
+                    self.root.after(0, lambda: self.update_status(f"Copied {file_info['name']} to {destination} ({strategy})"))
                 else:
                     self.root.after(0, lambda: messagebox.showerror("Error", "Failed to copy file"))
             except Exception as e:
@@ -900,18 +1171,14 @@ class FileOrganizerApp:
 
         def _move_file_backend(self, file_info, destination):
             try:
-                lib = ctypes.CDLL('./file_organizer_backend.so')  
-                lib.move_file.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
-                lib.move_file.restype = ctypes.c_bool
-
-                src = file_info["path"].encode('utf-8')
-                dest = os.path.join(destination, file_info["name"]).encode('utf-8')
+                src = os.fsencode(file_info["path"])
+                dest = os.fsencode(os.path.join(destination, file_info["name"]))
 
                 success = lib.move_file(src, dest)
                 if success:
                     self.root.after(0, lambda: messagebox.showinfo("Success", f"File moved successfully to {destination}"))
                     self.root.after(0, lambda: self.update_status(f"Moved {file_info['name']} to {destination}"))
-                    self.root.after(0, lambda: self.load_directory(self.current_dir))
+                    self.root.after(0, lambda: self.remove_file_entry(file_info))
                 else:
                     self.root.after(0, lambda: messagebox.showerror("Error", "Failed to move file"))
             except Exception as e:
@@ -928,16 +1195,12 @@ class FileOrganizerApp:
 
         def _delete_file_backend(self, file_info):
             try:
-                lib = ctypes.CDLL('./file_organizer_backend.so')  
-                lib.delete_file.argtypes = [ctypes.c_char_p]
-                lib.delete_file.restype = ctypes.c_bool
-
-                path = file_info["path"].encode('utf-8')
+                path = os.fsencode(file_info["path"])
 
                 success = lib.delete_file(path)
                 if success:
                     self.root.after(0, lambda: self.update_status(f"Deleted {file_info['name']}"))
-                    self.root.after(0, lambda: self.load_directory(self.current_dir))
+                    self.root.after(0, lambda: self.remove_file_entry(file_info))
                 else:
                     self.root.after(0, lambda: messagebox.showerror("Error", "Failed to delete file"))
             except Exception as e:
@@ -956,58 +1219,297 @@ class FileOrganizerApp:
             except Exception as e:
                 messagebox.showerror("Error", f"Could not locate file: {str(e)}")
 
-        def organize_by_date(self):
-            destination = filedialog.askdirectory(title="Select Destination Folder (leave empty to organize in place)")
-            if destination == "":
-                destination = self.current_dir
-            if not messagebox.askyesno("Confirm Organization",
-                                    f"Are you sure you want to organize files by date in {destination}?"):
+        def find_duplicates(self):
+            folder = filedialog.askdirectory(title="Select a Folder to Search for Duplicates", initialdir=self.current_dir)
+            if not folder:
                 return
-            threading.Thread(target=self._organize_by_date_backend, args=(destination,), daemon=True).start()
+            theme = self.themes[self.current_theme]
+            finder = DuplicateFinder(hash_cache=self.hash_cache)
 
-        def _organize_by_date_backend(self, destination):
-            try:
-                lib = ctypes.CDLL('./file_organizer_backend.so') 
-                lib.organize_by_date.argtypes = [ctypes.c_char_p]
-                lib.organize_by_date.restype = ctypes.c_bool
+            # Progress window, polled like the organize progress
+            progress_window = tk.Toplevel(self.root)
+            progress_window.title("Finding Duplicates")
+            progress_window.geometry("400x150")
+            progress_window.resizable(False, False)
+            progress_window.configure(bg=theme["background"])
 
-                success = lib.organize_by_date(destination.encode('utf-8'))
-                if success:
-                    self.root.after(0, lambda: messagebox.showinfo("Success", f"Files organized by date in {destination}"))
-                    if destination == self.current_dir:
-                        self.root.after(0, lambda: self.load_directory(self.current_dir))
-                    self.root.after(0, lambda: self.update_status(f"Organized files by date in {destination}"))
-                else:
-                    self.root.after(0, lambda: messagebox.showerror("Error", "Failed to organize files by date"))
+            progress_label = tk.Label(progress_window, text="Scanning...", font=("Segoe UI", 11),
+                                    bg=theme["background"], fg=theme["text"])
+            progress_label.pack(pady=(20, 10))
+
+            progress_bar = ttk.Progressbar(progress_window, orient=tk.HORIZONTAL, length=350, mode="determinate",
+                                         style="Horizontal.TProgressbar")
+            progress_bar.pack(padx=20)
+
+            def cancel():
+                finder.cancel()
+                progress_window.destroy()
+                self.update_status("Duplicate search cancelled")
+
+            button_frame = tk.Frame(progress_window, bg=theme["background"], pady=15)
+            button_frame.pack(fill=tk.X)
+            tk.Button(button_frame, text="Cancel", font=("Segoe UI", 10), bg=theme["danger"], fg="white",
+                    bd=0, padx=15, pady=5, command=cancel).pack()
+
+            self.update_status(f"Searching {folder} for duplicates...")
+            threading.Thread(target=self._find_duplicates_thread, args=(folder, finder, progress_window),
+                             daemon=True).start()
+            self.poll_duplicate_search(finder, progress_window, progress_label, progress_bar)
+
+        def poll_duplicate_search(self, finder, progress_window, progress_label, progress_bar):
+            if not progress_window.winfo_exists():
+                return
+            stage, files, hashed, to_hash, bytes_read, finished = finder.snapshot()
+            if stage == "Scanning":
+                progress_label.config(text=f"Scanning: {files} files")
+            else:
+                progress_label.config(text=f"{stage}: {hashed}/{to_hash} files\n"
+                                           f"{self.format_size(bytes_read)} read")
+            progress_bar.config(maximum=max(to_hash, 1), value=hashed)
+            if not finished:
+                self.root.after(PROGRESS_POLL_MS, self.poll_duplicate_search, finder, progress_window,
+                                progress_label, progress_bar)
+
+        def _find_duplicates_thread(self, folder, finder, progress_window):
+            try:
+                groups = finder.find(walk_files(folder))
+                self.flush_hash_cache()
+                if finder.cancelled:
+                    return
+                self.root.after(0, progress_window.destroy)
+                self.root.after(0, lambda: self.show_duplicates(folder, finder, groups))
             except Exception as e:
-                self.root.after(0, lambda: messagebox.showerror("Error", f"Could not organize files: {str(e)}"))
+                self.root.after(0, progress_window.destroy)
+                self.root.after(0, lambda: messagebox.showerror("Error", f"Could not search for duplicates: {str(e)}"))
+
+        def show_duplicates(self, folder, finder, groups):
+            theme = self.themes[self.current_theme]
+            wasted = sum(size * (len(paths) - 1) for size, paths in groups)
+            read_share = finder.bytes_read / finder.total_bytes * 100 if finder.total_bytes else 0
+            self.update_status(f"Found {len(groups)} groups of duplicates in {folder}")
+
+            window = tk.Toplevel(self.root)
+            window.title("Duplicate Files")
+            window.geometry("700x500")
+            window.configure(bg=theme["background"])
+
+            summary = (f"{len(groups)} groups of identical files, {self.format_size(wasted)} in extra copies\n"
+                       f"Searched {finder.files} files ({self.format_size(finder.total_bytes)}), "
+                       f"read {self.format_size(finder.bytes_read)} ({read_share:.1f}%)")
+            tk.Label(window, text=summary, font=("Segoe UI", 10), justify=tk.LEFT,
+                   bg=theme["background"], fg=theme["text"]).pack(anchor=tk.W, padx=20, pady=(15, 10))
+
+            # One row per group, its files below it
+            tree_frame = tk.Frame(window, bg=theme["background"])
+            tree_frame.pack(fill=tk.BOTH, expand=True, padx=20)
+            tree = ttk.Treeview(tree_frame, show="tree")
+            scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
+            tree.configure(yscrollcommand=scrollbar.set)
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+            for size, paths in groups:
+                group = tree.insert("", tk.END, text=f"{len(paths)} copies of {self.format_size(size)}", open=True)
+                for path in paths:
+                    tree.insert(group, tk.END, text=path, values=(path,))
+
+            def delete_selected():
+                paths = [tree.item(item, "values")[0] for item in tree.selection() if tree.item(item, "values")]
+                if not paths:
+                    messagebox.showinfo("Info", "Select the copies to delete", parent=window)
+                    return
+                if not messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete {len(paths)} files?",
+                                           parent=window):
+                    return
+                failed = 0
+                for item in tree.selection():
+                    if not tree.item(item, "values"):
+                        continue
+                    try:
+                        os.remove(tree.item(item, "values")[0])
+                        tree.delete(item)
+                    except OSError:
+                        failed += 1
+                if failed:
+                    messagebox.showwarning("Warning", f"{failed} files could not be deleted", parent=window)
+                # The watcher reports the deletions itself; otherwise reload
+                if not self.watcher.available:
+                    self.load_directory(self.current_dir)
+
+            button_frame = tk.Frame(window, bg=theme["background"], pady=15)
+            button_frame.pack(fill=tk.X)
+            tk.Button(button_frame, text="Delete Selected", font=("Segoe UI", 10), bg=theme["danger"], fg="white",
+                    bd=0, padx=15, pady=8, command=delete_selected).pack(side=tk.LEFT, padx=(20, 8))
+            tk.Button(button_frame, text="Close", font=("Segoe UI", 10), bg=theme["primary"], fg="white",
+                    bd=0, padx=15, pady=8, command=window.destroy).pack(side=tk.RIGHT, padx=(0, 20))
+
+        def organize_by_date(self):
+            self._confirm_organization("date")
 
         def organize_by_type(self):
+            self._confirm_organization("type")
+
+        def _confirm_organization(self, kind):
             destination = filedialog.askdirectory(title="Select Destination Folder (leave empty to organize in place)")
             if destination == "":
                 destination = self.current_dir
-            if not messagebox.askyesno("Confirm Organization",
-                                    f"Are you sure you want to organize files by type in {destination}?"):
+            move = self.organize_move.get()
+            incremental = INCREMENTAL_CONTENT if self.organize_verify.get() else INCREMENTAL_METADATA
+            recursive = self.organize_recursive.get()
+            action = "move" if move else "copy"
+            resume = False
+            state = read_journal(journal_path_for(destination))
+            if state and not state["end"] and state["plan"]:
+                resume = messagebox.askyesnocancel(
+                    "Resume Organization",
+                    f"A previous organization into {destination} was interrupted after "
+                    f"{len(state['done'])} of {len(state['plan'])} files.\n"
+                    f"Resume it? Choose No to start a new run instead.")
+                if resume is None:
+                    return
+            if not resume and not messagebox.askyesno("Confirm Organization",
+                                    f"Are you sure you want to organize files by {kind} in {destination}?\n"
+                                    f"Files will be {action}d into the new folders."):
                 return
-            threading.Thread(target=self._organize_by_type_backend, args=(destination,), daemon=True).start()
 
-        def _organize_by_type_backend(self, destination):
+            self.cancel_operation = False
+            self.cancel_token = lib.create_cancel_token()
+            progress_window, progress_label, progress_bar = self._show_organize_progress()
+            threading.Thread(target=self._organize_backend,
+                             args=(kind, destination, move, incremental, recursive, progress_window, progress_label,
+                                   progress_bar, resume),
+                             daemon=True).start()
+
+        def undo_organization(self):
+            destination = filedialog.askdirectory(title="Select the Organized Folder to Undo", initialdir=self.current_dir)
+            if not destination:
+                return
+            path = journal_path_for(destination)
+            state = read_journal(path)
+            if state is None:
+                messagebox.showinfo("Info", f"No organization of {destination} was recorded")
+                return
+            if state["end"] == "undone":
+                messagebox.showinfo("Info", f"The last organization of {destination} was already undone")
+                return
+            count = len([i for i in state["done"] if i not in state["undone"]])
+            action = "moved back" if state["header"]["move"] else "deleted"
+            if not messagebox.askyesno("Confirm Undo",
+                                       f"Undo the last organization of {destination}?\n"
+                                       f"{count} organized files will be {action}."):
+                return
+            self.update_status("Undoing organization...")
+            threading.Thread(target=self._undo_organization_backend, args=(destination, path), daemon=True).start()
+
+        def _undo_organization_backend(self, destination, path):
             try:
-                lib = ctypes.CDLL('./file_organizer_backend.so')  
-                lib.organize_by_type.argtypes = [ctypes.c_char_p]
-                lib.organize_by_type.restype = ctypes.c_bool
+                result = lib.undo_organize(os.fsencode(path))
+                if result == ORGANIZE_OK:
+                    self.root.after(0, lambda: self.update_status(f"Undid organization of {destination}"))
+                elif result == ORGANIZE_PARTIAL:
+                    self.root.after(0, lambda: messagebox.showwarning("Warning", "Some files could not be restored"))
+                else:
+                    self.root.after(0, lambda: messagebox.showerror("Error", "Failed to undo organization"))
+                self.root.after(0, lambda: self.refresh_after_organize(destination))
+            except Exception as e:
+                self.root.after(0, lambda: messagebox.showerror("Error", f"Could not undo organization: {str(e)}"))
 
-                success = lib.organize_by_type(destination.encode('utf-8'))
-                if success:
-                    self.root.after(0, lambda: messagebox.showinfo("Success", f"Files organized by type in {destination}"))
-                    if destination == self.current_dir:
-                        self.root.after(0, lambda: self.load_directory(self.current_dir))
-                    self.root.after(0, lambda: self.update_status(f"Organized files by type in {destination}"))
+        def _show_organize_progress(self):
+            theme = self.themes[self.current_theme]
+            progress_window = tk.Toplevel(self.root)
+            progress_window.title("Organizing Files")
+            progress_window.geometry("400x150")
+            progress_window.resizable(False, False)
+            progress_window.configure(bg=theme["background"])
+
+            progress_label = tk.Label(progress_window, text="Organizing files...", font=("Segoe UI", 11),
+                                      bg=theme["background"], fg=theme["text"])
+            progress_label.pack(pady=(20, 10))
+
+            progress_frame = tk.Frame(progress_window, bg=theme["background"])
+            progress_frame.pack(fill=tk.X, padx=20)
+            progress_bar = ttk.Progressbar(progress_frame, orient=tk.HORIZONTAL, length=350, mode="determinate",
+                                           style="Horizontal.TProgressbar")
+            progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+            button_frame = tk.Frame(progress_window, bg=theme["background"], pady=15)
+            button_frame.pack(fill=tk.X)
+            cancel_button = tk.Button(button_frame, text="Cancel", font=("Segoe UI", 10),
+                                      bg=theme["danger"], fg="white", bd=0, padx=15, pady=5,
+                                      command=self.cancel_organization)
+            cancel_button.pack()
+            return progress_window, progress_label, progress_bar
+
+        def cancel_organization(self):
+            # The backend stops after the files it is currently working on
+            self.cancel_operation = True
+            if self.cancel_token:
+                lib.cancel_token_cancel(self.cancel_token)
+            self.update_status("Cancelling organization...")
+
+        def _finish_organize(self, token, progress_window):
+            # Runs on the Tk thread, like cancel_organization, so the token is never used after free
+            if self.cancel_token == token:
+                self.cancel_token = None
+            lib.free_cancel_token(token)
+            progress_window.destroy()
+
+        def _organize_backend(self, kind, destination, move, incremental, recursive, progress_window, progress_label,
+                              progress_bar, resume=False):
+            token = self.cancel_token
+            try:
+                organize = getattr(lib, f"organize_by_{kind}_progress")
+                organize_recursive = getattr(lib, f"organize_by_{kind}_recursive")
+
+                # The backend journals the run so it can be resumed or undone
+                journal = journal_path_for(destination)
+                os.makedirs(os.path.dirname(journal), exist_ok=True)
+
+                def report(done, total, done_bytes, total_bytes):
+                    text = (f"Organizing {done}/{total} files\n"
+                            f"{self.format_size(done_bytes)} of {self.format_size(total_bytes)}")
+
+                    def show():  # One Tk callback per report updates label and bar together
+                        progress_label.config(text=text)
+                        progress_bar.config(maximum=max(total, 1), value=done)
+                    self.root.after(0, show)
+
+                callback = ProgressCallback(report)  # Must stay referenced until the call returns
+                counts = OrganizeCounts()
+                if resume:
+                    result = lib.resume_organize(os.fsencode(journal), ORGANIZE_WORKERS, callback,
+                                                 ORGANIZE_PROGRESS_INTERVAL_MS, token)
+                elif recursive:
+                    # Null-terminated pattern array; no include patterns means every file
+                    exclude = (ctypes.c_char_p * (len(ORGANIZE_EXCLUDE) + 1))(
+                        *[os.fsencode(pattern) for pattern in ORGANIZE_EXCLUDE], None)
+                    result = organize_recursive(os.fsencode(destination), ORGANIZE_MAX_DEPTH, None, exclude,
+                                                ORGANIZE_WORKERS, int(move), incremental, callback,
+                                                ORGANIZE_PROGRESS_INTERVAL_MS, token, os.fsencode(journal),
+                                                ctypes.byref(counts))
                 else:
-                    self.root.after(0, lambda: messagebox.showerror("Error", "Failed to organize files by type"))
+                    result = organize(os.fsencode(destination), ORGANIZE_WORKERS, int(move), incremental, callback,
+                                      ORGANIZE_PROGRESS_INTERVAL_MS, token, os.fsencode(journal),
+                                      ctypes.byref(counts))
+
+                if result in (ORGANIZE_OK, ORGANIZE_PARTIAL, ORGANIZE_CANCELLED):
+                    self.root.after(0, lambda: self.refresh_after_organize(destination))
+                if result == ORGANIZE_OK:
+                    message = f"Files organized by {kind} in {destination}"
+                    if not resume:
+                        message += (f"\n{counts.created} new, {counts.updated} updated, "
+                                    f"{counts.unchanged} unchanged")
+                    self.root.after(0, lambda: messagebox.showinfo("Success", message))
+                    self.root.after(0, lambda: self.update_status(f"Organized files by {kind} in {destination}"))
+                elif result == ORGANIZE_CANCELLED:
+                    self.root.after(0, lambda: self.update_status("Organization cancelled"))
+                elif result == ORGANIZE_PARTIAL:
+                    self.root.after(0, lambda: messagebox.showwarning("Warning", f"Some files could not be organized by {kind}"))
+                else:
+                    self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to organize files by {kind}"))
             except Exception as e:
                 self.root.after(0, lambda: messagebox.showerror("Error", f"Could not organize files: {str(e)}"))
-
+            finally:
+                self.root.after(0, lambda: self._finish_organize(token, progress_window))
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,83 @@
+import os
+import sys
+import time
+import ctypes
+import shutil
+import tempfile
+import argparse
+
+
+# Measures files/sec of the backend's parallel organize for 1..N worker threads.
+# Build the backend first (see "read me"), then run from this folder:
+#   python organize_benchmark.py --files 5000 --size 65536 --threads 1 2 4 8
+# Use --dir to benchmark on a specific disk (NVMe, NAS mount, ...).
+
+EXTENSIONS = [".jpg", ".png", ".mp4", ".mp3", ".pdf", ".docx", ".csv", ".txt", ".zip", ".bin"]
+
+
+def load_backend(path):
+    lib = ctypes.CDLL(path)
+    for kind in ("type", "date"):
+        function = getattr(lib, f"organize_by_{kind}_parallel")
+        function.argtypes = [ctypes.c_char_p, ctypes.c_int, ctypes.c_int]
+        function.restype = ctypes.c_bool
+    return lib
+
+
+def create_files(directory, count, size):
+    payload = os.urandom(size)
+    for i in range(count):
+        name = f"file_{i:06d}{EXTENSIONS[i % len(EXTENSIONS)]}"
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(payload)
+
+
+def remove_outputs(directory):
+    # Drop the category/date folders from the previous run, keep the sources
+    for entry in os.scandir(directory):
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path)
+
+
+def run(lib, directory, mode, threads, count, repeat):
+    organize = getattr(lib, f"organize_by_{mode}_parallel")
+    best = None
+    for _ in range(repeat):
+        remove_outputs(directory)
+        start = time.perf_counter()
+        if not organize(directory.encode('utf-8'), threads, 0):
+            raise RuntimeError(f"organize_by_{mode}_parallel failed with {threads} threads")
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return count / best, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the parallel organize engine")
+    parser.add_argument("--lib", default="./file_organizer_backend.so")
+    parser.add_argument("--dir", default=None, help="parent folder for the test files (default: system temp)")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=64 * 1024, help="bytes per file")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--mode", choices=["type", "date"], default="type")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per thread count; the best is reported")
+    args = parser.parse_args()
+
+    lib = load_backend(args.lib)
+    directory = tempfile.mkdtemp(prefix="organize_bench_", dir=args.dir)
+    try:
+        create_files(directory, args.files, args.size)
+        print(f"{args.files} files of {args.size} bytes in {directory}, organize by {args.mode}")
+        print(f"{'threads':>8} {'seconds':>10} {'files/sec':>12} {'speedup':>8}")
+        baseline = None
+        for threads in args.threads:
+            rate, seconds = run(lib, directory, args.mode, threads, args.files, args.repeat)
+            baseline = baseline or rate
+            print(f"{threads:>8} {seconds:>10.3f} {rate:>12.0f} {rate / baseline:>7.2f}x")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
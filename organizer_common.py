@@ -0,0 +1,1317 @@
+# Code shared by both organizer GUIs: category rules and content sniffing,
+# duplicate finding, sorted listings, directory watching, organize journals and
+# the hash and thumbnail caches. Nothing here imports Tk; the classes that hand
+# results to the UI take its root window and post them with root.after.
+import os
+import sys
+import io
+import re
+import json
+import time
+import stat
+import queue
+import select
+import struct
+import fnmatch
+import hashlib
+import sqlite3
+import itertools
+import threading
+import ctypes
+import ctypes.util
+from collections import OrderedDict
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+# Icons per category. Categories without an entry use the default file icon
+# in the grid and the folder icon in the sidebar.
+CATEGORY_ICONS = {
+    "Images": "🖼️",
+    "Videos": "🎬",
+    "Audio": "🎵",
+    "Documents": "📝",
+    "Spreadsheets": "📊",
+    "Presentations": "📊",
+    "Text": "📄",
+    "Archives": "📦",
+    "Executables": "⚙️"
+}
+
+# Sort options: option -> (record field used as the sort key, descending)
+SORT_OPTIONS = {
+    "Name (A-Z)": ("name", False),
+    "Name (Z-A)": ("name", True),
+    "Date (Newest)": ("modified", True),
+    "Date (Oldest)": ("modified", False),
+    "Size (Largest)": ("size", True),
+    "Size (Smallest)": ("size", False)
+}
+
+# Duplicate finder: bytes hashed from each end of a file before reading all of
+# it, read size when hashing whole files, and hashing threads (hashing mostly
+# waits on reads, so more than CPUs)
+DUPLICATE_PARTIAL_BYTES = 4096
+HASH_BUFFER_SIZE = 1024 * 1024
+DUPLICATE_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+
+# Persistent content-hash cache, kept in the metadata database
+HASH_CACHE_BATCH = 256  # Pending writes are committed in batches of this size...
+HASH_CACHE_COMMIT_INTERVAL = 2.0  # ...or after this many seconds
+HASH_CACHE_MAX_AGE_DAYS = 90  # Rows unused for this long are dropped when the cache opens
+
+# Directory watching (Linux inotify)
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE |
+              IN_DELETE_SELF | IN_MOVE_SELF)
+WATCH_COALESCE_SECONDS = 0.1  # Wait this long for more events before reporting a batch...
+WATCH_MAX_DELAY_SECONDS = 0.5  # ...but never hold events back longer than this
+
+# Thumbnail decoding
+THUMBNAIL_SIZE = (80, 80)
+THUMBNAIL_WORKERS = min(4, os.cpu_count() or 1)
+THUMBNAIL_FLUSH_MS = 50  # Finished thumbnails are handed to the UI in batches this often
+
+# In-memory thumbnail cache budget, estimated as width x height x 4 bytes per image
+THUMBNAIL_CACHE_MAX_BYTES = 64 * 1024 * 1024
+THUMBNAIL_FAILED_BYTES = 64  # Nominal cost of remembering a file that failed to decode
+
+# Persistent thumbnail store
+THUMBNAIL_STORE_MAX_BYTES = 256 * 1024 * 1024
+THUMBNAIL_STORE_BATCH = 64  # Pending writes are committed in batches of this size...
+THUMBNAIL_STORE_COMMIT_INTERVAL = 2.0  # ...or after this many seconds
+
+
+# Category rules, one per line: "Category: condition ...". A file goes to the
+# category of the first rule whose conditions all hold; files no rule matches
+# go to Others. Conditions (at most one of each, except a lower and an upper
+# size or age bound):
+#   ext=.jpg,.jpeg   extension, any of the list (case-insensitive)
+#   name=IMG_*       glob on the file name (*, ? and [...])
+#   regex=^IMG_\d+   regular expression searched for in the file name; stick to
+#                    syntax Python and ECMAScript share, the backend uses the latter
+#   size>10M         size bound in bytes, K, M, G or T (powers of 1024)
+#   age<2w           time since last modification in s, m, h, d or w
+# The same format is read by the backend (load_category_rules).
+DEFAULT_CATEGORY_RULES = """
+Images: ext=.jpg,.jpeg,.png,.gif,.bmp,.tiff,.webp
+Videos: ext=.mp4,.avi,.mov,.wmv,.flv,.mkv,.webm
+Audio: ext=.mp3,.wav,.ogg,.flac,.aac,.wma
+Documents: ext=.pdf,.doc,.docx,.rtf,.tex
+Spreadsheets: ext=.xls,.xlsx,.csv
+Presentations: ext=.ppt,.pptx
+Text: ext=.txt,.md,.log
+Archives: ext=.zip,.rar,.7z,.tar,.gz,.iso
+Executables: ext=.exe,.msi,.app
+OneNote: ext=.one,.onetoc2
+"""
+CATEGORY_RULES_FILE = "categories.rules"
+OTHERS_CATEGORY = "Others"
+RULE_CONDITION = re.compile(r"(ext|name|regex)=(\S+)$|(size|age)([<>])(\d+(?:\.\d+)?)([a-zA-Z]?)$")
+SIZE_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4}
+AGE_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+# Content sniffing: files whose name gives no category are categorized by the
+# signature ("magic bytes") at the start of their content instead. A matching
+# file counts as if its name ended with the extension. Signatures are tried in
+# order, the same as in the backend: longer ones before shorter ones they
+# start with, and the ones that don't start at offset 0 last.
+SNIFF_BYTES = 64
+SNIFF_WORKERS = 8  # Header reads mostly wait on the disk
+SNIFF_CACHE_MAX_ENTRIES = 100000
+FILE_SIGNATURES = [
+    (rb"\xff\xd8\xff", ".jpg"),
+    (rb"\x89PNG\r\n\x1a\n", ".png"),
+    (rb"GIF8[79]a", ".gif"),
+    (rb"BM.{4}\x00\x00\x00\x00", ".bmp"),
+    (rb"II\*\x00|MM\x00\*", ".tiff"),
+    (rb"RIFF.{4}WEBP", ".webp"),
+    (rb"RIFF.{4}WAVE", ".wav"),
+    (rb"RIFF.{4}AVI ", ".avi"),
+    (rb"\x1a\x45\xdf\xa3", ".mkv"),
+    (rb"FLV\x01", ".flv"),
+    (rb"ID3|\xff[\xfb\xf3\xf2]", ".mp3"),
+    (rb"OggS", ".ogg"),
+    (rb"fLaC", ".flac"),
+    (rb"%PDF-", ".pdf"),
+    (rb"\{\\rtf", ".rtf"),
+    (rb"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", ".doc"),  # OLE2: legacy Office files
+    (rb"PK\x03\x04.{26}\[Content_Types\]\.xml", ".docx"),  # Office Open XML
+    (rb"PK\x03\x04", ".zip"),
+    (rb"Rar!\x1a\x07", ".rar"),
+    (rb"7z\xbc\xaf\x27\x1c", ".7z"),
+    (rb"\x1f\x8b\x08", ".gz"),
+    (rb"MZ|\x7fELF|\xcf\xfa\xed\xfe|\xfe\xed\xfa\xcf", ".exe"),  # PE, ELF and Mach-O executables
+    (rb".{4}ftypqt  ", ".mov"),
+    (rb".{4}ftyp", ".mp4")
+]
+# All signatures as one anchored pattern; group i + 1 is FILE_SIGNATURES[i]
+SIGNATURE_PATTERN = re.compile(b"|".join(b"(" + pattern + b")" for pattern, _ in FILE_SIGNATURES), re.DOTALL)
+
+
+def parse_category_rules(text):
+    # Parse rule text into a list of (category, conditions) in file order.
+    # Raises ValueError naming the line of the first invalid rule.
+    rules = []
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        category, colon, rest = line.partition(":")
+        category = category.strip()
+        if not colon or not category:
+            raise ValueError(f"line {number}: expected 'Category: condition ...'")
+        conditions = {}
+        for token in rest.split():
+            match = RULE_CONDITION.match(token)
+            if match is None:
+                raise ValueError(f"line {number}: unknown condition '{token}'")
+            kind, value, bound, op, number_text, unit = match.groups()
+            if kind is not None:
+                key = kind
+            else:
+                units = SIZE_UNITS if bound == "size" else AGE_UNITS
+                if unit.lower() not in units:
+                    raise ValueError(f"line {number}: unknown unit '{unit}' in '{token}'")
+                key = bound + op
+                value = float(number_text) * units[unit.lower()]
+            if key in conditions:
+                raise ValueError(f"line {number}: '{key}' given twice")
+            if key == "ext":
+                value = {ext.lower() if ext.startswith(".") else "." + ext.lower()
+                         for ext in value.split(",") if ext}
+            conditions[key] = value
+        if "regex" in conditions:
+            # Check the regex as CategoryRules embeds it, so e.g. global flags
+            # that are only valid at the start of a pattern are caught here
+            try:
+                re.compile(CategoryRules._pattern(conditions), re.DOTALL)
+            except re.error as e:
+                raise ValueError(f"line {number}: invalid regex '{conditions['regex']}': {e.msg}")
+        rules.append((category, conditions))
+    return rules
+
+
+class CategoryRules:
+    # Category rules compiled for matching millions of names. Each extension
+    # maps to the rules that can apply to it, in file order: the rules listing
+    # it plus every rule without an extension condition. With extension-only
+    # rules that is a single dict lookup per name. Name patterns of rules
+    # without an extension are combined into one regex, so however many there
+    # are, a name is scanned once to find the first pattern it matches.
+    def __init__(self, rules):
+        self.rules = rules
+        self.categories = list(dict.fromkeys([category for category, _ in rules] + [OTHERS_CATEGORY]))
+        
+        generic = [i for i, (_, conditions) in enumerate(rules) if "ext" not in conditions]
+        by_extension = {}
+        for i, (_, conditions) in enumerate(rules):
+            for ext in conditions.get("ext", ()):
+                by_extension.setdefault(ext, set()).add(i)
+        self.generic = tuple(generic)
+        self.by_extension = {ext: tuple(sorted(indexes | set(generic))) for ext, indexes in by_extension.items()}
+        
+        sources = [self._pattern(conditions) for _, conditions in rules]
+        self.patterns = [re.compile(source, re.DOTALL) if source is not None else None for source in sources]
+        self.bounds = [[(key, conditions[key]) for key in ("size>", "size<", "age>", "age<") if key in conditions]
+                       for _, conditions in rules]
+        self.unconditional = [pattern is None and not bounds for pattern, bounds in zip(self.patterns, self.bounds)]
+        # Extensions whose first candidate rule always applies: one lookup decides
+        self.direct = {ext: rules[candidates[0]][0] for ext, candidates in self.by_extension.items()
+                       if self.unconditional[candidates[0]]}
+        
+        # Pattern rules without an extension, as alternatives tried in file order
+        covered = [i for i in generic if sources[i] is not None]
+        try:
+            self.combined = re.compile("|".join(f"(?P<r{i}>{sources[i]})" for i in covered), re.DOTALL)
+            self.combined_rules = frozenset(covered)
+        except re.error:
+            # Patterns that can't be combined (backreferences, ...) are tried one by one
+            self.combined = None
+            self.combined_rules = frozenset()
+    
+    @staticmethod
+    def _pattern(conditions):
+        # Regex that matches at the start of a name exactly when the rule's
+        # name and regex conditions hold
+        parts = []
+        if "name" in conditions:
+            parts.append(fnmatch.translate(conditions["name"]))
+        if "regex" in conditions:
+            parts.append(f".*?(?:{conditions['regex']})")
+        if len(parts) == 2:
+            return "".join(f"(?={part})" for part in parts)
+        return parts[0] if parts else None
+    
+    def _holds(self, i, name, size, modified, first_pattern):
+        pattern = self.patterns[i]
+        if pattern is not None:
+            if i in self.combined_rules and (first_pattern is None or i <= first_pattern):
+                # Settled by the combined regex, which found the first match
+                if i != first_pattern:
+                    return False
+            elif pattern.match(name) is None:
+                return False
+        for key, limit in self.bounds[i]:
+            value = size if key[0] == "s" else time.time() - modified
+            if (value <= limit) if key[-1] == ">" else (value >= limit):
+                return False
+        return True
+    
+    def match(self, name, size=0, modified=0.0):
+        # Same extension as os.path.splitext, without its cost in the common case
+        dot = name.rfind(".")
+        ext = name[dot:].lower() if dot > 0 and name[0] != "." else os.path.splitext(name)[1].lower()
+        category = self.direct.get(ext)
+        if category is not None:
+            return category
+        candidates = self.by_extension.get(ext, self.generic)
+        first_pattern = -1  # Combined regex not searched yet
+        for i in candidates:
+            if self.unconditional[i]:
+                return self.rules[i][0]
+            if first_pattern == -1 and i in self.combined_rules:
+                found = self.combined.match(name)
+                first_pattern = int(found.lastgroup[1:]) if found is not None else None
+            if self._holds(i, name, size, modified, first_pattern):
+                return self.rules[i][0]
+        return OTHERS_CATEGORY
+
+
+def user_config_dir():
+    # Per-user configuration directory for this app, following each platform's convention
+    if os.name == "nt":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~\\AppData\\Roaming")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support")
+    else:
+        base = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.path.join(base, "file_organizer")
+
+
+def category_rules_path():
+    return os.path.join(user_config_dir(), CATEGORY_RULES_FILE)
+
+
+def load_category_rules(path=None):
+    # Compile the user's rule file if there is one, else the default rules.
+    # Raises ValueError (or OSError) for a rule file that can't be used.
+    path = path or category_rules_path()
+    if not os.path.exists(path):
+        return CategoryRules(parse_category_rules(DEFAULT_CATEGORY_RULES))
+    with open(path, encoding="utf-8") as f:
+        return CategoryRules(parse_category_rules(f.read()))
+
+
+def categorize(name, category_rules, size=0, modified=0.0, sniffed=None):
+    # sniffed is an extension found from the file's content (see
+    # ContentSniffer); it only counts when the name alone gives no category
+    category = category_rules.match(name, size, modified)
+    if sniffed is not None and category == OTHERS_CATEGORY:
+        category = category_rules.match(name + sniffed, size, modified)
+    return category
+
+
+def sniff_extension(path):
+    # Extension shown by the first SNIFF_BYTES bytes of path, or None
+    with open(path, "rb", buffering=0) as f:
+        header = f.read(SNIFF_BYTES)
+    match = SIGNATURE_PATTERN.match(header)
+    return FILE_SIGNATURES[match.lastindex - 1][1] if match else None
+
+
+class ContentSniffer:
+    # Sniffs the files a batch of records leaves in the Others category.
+    # Their headers are read on a pool of threads, and results are cached by
+    # (st_dev, st_ino, mtime_ns), so a file is only read again after it
+    # changes. Without inode numbers (os.scandir on Windows) the path is used.
+    def __init__(self, workers=SNIFF_WORKERS, max_entries=SNIFF_CACHE_MAX_ENTRIES):
+        self.workers = workers
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.cache = OrderedDict()  # key -> extension or None
+
+    def refine(self, pairs, category_rules):
+        # pairs is a list of (record, stats). Records the name leaves in Others
+        # get the extension their content shows as "sniffed", and its category.
+        unknown = []
+        for record, stats in pairs:
+            if record["is_dir"] or not record["size"] or record["category"] != OTHERS_CATEGORY:
+                continue
+            key = (stats.st_dev, stats.st_ino or record["path"], stats.st_mtime_ns)
+            with self.lock:
+                if key in self.cache:
+                    self.cache.move_to_end(key)
+                    self._apply(record, self.cache[key], category_rules)
+                    continue
+            unknown.append((record, key))
+        
+        pending = iter(unknown)
+        
+        def worker():
+            while True:
+                with self.lock:
+                    item = next(pending, None)
+                if item is None:
+                    return
+                record, key = item
+                try:
+                    extension = sniff_extension(record["path"])
+                except OSError:
+                    continue
+                with self.lock:
+                    self.cache[key] = extension
+                    if len(self.cache) > self.max_entries:
+                        self.cache.popitem(last=False)
+                    self._apply(record, extension, category_rules)
+        
+        # The calling thread works too
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(min(self.workers, len(unknown)) - 1)]
+        for thread in threads:
+            thread.start()
+        worker()
+        for thread in threads:
+            thread.join()
+
+    @staticmethod
+    def _apply(record, extension, category_rules):
+        if extension is not None:
+            record["sniffed"] = extension
+            record["category"] = categorize(record["name"], category_rules, record["size"], record["modified"],
+                                            extension)
+
+
+def file_digest(path):
+    # Content hash used to tell whether two files of the same size really differ
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_BUFFER_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def walk_files(root):
+    # Yield (path, size) for every regular file under root, without following
+    # symlinks. Memory is bounded by the folders still waiting to be read.
+    pending = [root]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            yield entry.path, entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+def partial_digest(path, size, chunk=DUPLICATE_PARTIAL_BYTES):
+    # Hash of the first and last chunk bytes, which covers the whole file when
+    # it is no longer than two chunks
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        digest.update(f.read(chunk))
+        if size > chunk:
+            f.seek(max(chunk, size - chunk))
+            digest.update(f.read(chunk))
+    return digest.hexdigest()
+
+
+class DuplicateFinder:
+    # Finds files with identical content in passes that each read more of
+    # fewer files: files are grouped by size, same-size files by a hash of
+    # their ends, and only files still sharing a group are hashed in full.
+    # Hashing runs on a pool of threads, and hashes known to the hash cache
+    # are not read again. The Tk thread polls snapshot() while a search runs;
+    # cancel() stops it after the files being hashed.
+    def __init__(self, workers=DUPLICATE_WORKERS, hash_cache=None):
+        self.workers = workers
+        self.hash_cache = hash_cache
+        self.lock = threading.Lock()
+        self.stage = "Scanning"
+        self.files = 0
+        self.total_bytes = 0
+        self.hashed = 0
+        self.to_hash = 0
+        self.bytes_read = 0
+        self.cancelled = False
+        self.finished = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def snapshot(self):
+        # (stage, files seen, files hashed in this stage, files to hash, bytes read, finished)
+        with self.lock:
+            return self.stage, self.files, self.hashed, self.to_hash, self.bytes_read, self.finished
+
+    def find(self, files):
+        # files is an iterable of (path, size). Returns (size, paths) groups of
+        # identical files, the most space wasted first
+        try:
+            by_size = {}
+            for path, size in files:
+                if self.cancelled:
+                    return []
+                with self.lock:
+                    self.files += 1
+                    self.total_bytes += size
+                if size > 0:
+                    by_size.setdefault(size, []).append(path)
+            
+            candidates = [(path, size) for size, paths in by_size.items() if len(paths) > 1 for path in paths]
+            by_ends = self._group(self._hash_all("Comparing file ends", candidates, self._ends_digest))
+            
+            # Files no longer than both ends were hashed whole already
+            groups = [(size, paths) for (size, _), paths in by_ends.items()
+                      if size <= 2 * DUPLICATE_PARTIAL_BYTES]
+            survivors = [(path, size) for (size, _), paths in by_ends.items()
+                         if size > 2 * DUPLICATE_PARTIAL_BYTES for path in paths]
+            by_content = self._group(self._hash_all("Comparing contents", survivors, self._full_digest))
+            groups.extend((size, paths) for (size, _), paths in by_content.items())
+            
+            if self.cancelled:
+                return []
+            groups = [(size, sorted(paths)) for size, paths in groups]
+            groups.sort(key=lambda group: group[0] * (len(group[1]) - 1), reverse=True)
+            return groups
+        finally:
+            with self.lock:
+                self.finished = True
+
+    def _ends_digest(self, path, size):
+        return self._cached(path, "ends", lambda: partial_digest(path, size),
+                            min(size, 2 * DUPLICATE_PARTIAL_BYTES))
+
+    def _full_digest(self, path, size):
+        return self._cached(path, "full", lambda: file_digest(path), size)
+
+    def _cached(self, path, kind, compute, nbytes):
+        # (digest, bytes read to get it)
+        if self.hash_cache is None:
+            return compute(), nbytes
+        value, was_read = self.hash_cache.digest(path, kind, compute)
+        return value, nbytes if was_read else 0
+
+    @staticmethod
+    def _group(hashes):
+        # {(path, size): digest} -> {(size, digest): paths} for digests shared by several files
+        groups = {}
+        for (path, size), digest in hashes.items():
+            groups.setdefault((size, digest), []).append(path)
+        return {key: paths for key, paths in groups.items() if len(paths) > 1}
+
+    def _hash_all(self, stage, items, digest):
+        # Hash every (path, size) item on the worker threads with digest, which
+        # returns (digest, bytes read); files that can't be read are left out
+        # of the result
+        with self.lock:
+            self.stage = stage
+            self.hashed = 0
+            self.to_hash = len(items)
+        results = {}
+        pending = iter(items)
+        
+        def worker():
+            while not self.cancelled:
+                with self.lock:
+                    item = next(pending, None)
+                if item is None:
+                    return
+                try:
+                    value, nbytes = digest(*item)
+                except OSError:
+                    value, nbytes = None, 0
+                with self.lock:
+                    self.hashed += 1
+                    if value is not None:
+                        results[item] = value
+                        self.bytes_read += nbytes
+        
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(min(self.workers, len(items)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+
+def make_file_record(name, path, stats, is_dir, category_rules):
+    return {
+        "name": name,
+        "path": path,
+        "size": 0 if is_dir else stats.st_size,  # Directories show as 0 size
+        "created": stats.st_ctime,
+        "modified": stats.st_mtime,
+        "modified_ns": stats.st_mtime_ns,
+        "is_dir": is_dir,
+        "category": categorize(name, category_rules, 0 if is_dir else stats.st_size, stats.st_mtime),
+        "sniffed": None  # Set by ContentSniffer.refine
+    }
+
+
+def sort_key(file_info, sort_option):
+    field = SORT_OPTIONS[sort_option][0]
+    if field == "name":
+        return file_info["name"].lower()
+    return file_info[field]
+
+
+def _insert_position(keys, key, descending):
+    # Position after any equal keys, like bisect_right, for either direction
+    lo, hi = 0, len(keys)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if (key > keys[mid]) if descending else (key < keys[mid]):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def _first_position(keys, key, descending):
+    # Position of the first key equal to (or after) key, like bisect_left
+    lo, hi = 0, len(keys)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if (keys[mid] > key) if descending else (keys[mid] < key):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+class FileListing:
+    # Cached views over a directory listing. Sort keys, one permutation per
+    # sort option, per-category index buckets and the resulting filtered and
+    # sorted views are built on first use, so switching category or sort order
+    # is mostly a dict lookup. Views that were already built are kept sorted
+    # through add() and remove() by binary search, so a single changed file
+    # does not throw them away.
+    def __init__(self, files):
+        self.files = files
+        self.invalidate()
+
+    def invalidate(self):
+        # Call whenever self.files is changed in bulk
+        self.positions = {f["path"]: i for i, f in enumerate(self.files)}  # path -> index in files
+        self.views = {}  # (category, sort option) -> list of file records
+        self.view_keys = {}  # (category, sort option) -> sort keys parallel to the view
+        self._reset_indexes()
+
+    def _reset_indexes(self):
+        # Index-based helpers used to build new views; cheap to drop
+        self.sort_keys = {}  # field -> list of keys, parallel to files
+        self.orders = {}  # sort option -> list of file indices in sorted order
+        self.ranks = {}  # sort option -> position of each file index in that order
+        self.buckets = None  # category -> list of file indices
+
+    def extend(self, records):
+        # Append a batch of records (e.g. from a streaming scan)
+        for record in records:
+            if record["path"] in self.positions:
+                continue
+            self.positions[record["path"]] = len(self.files)
+            self.files.append(record)
+        self.views = {}
+        self.view_keys = {}
+        self._reset_indexes()
+
+    def get(self, path):
+        index = self.positions.get(path)
+        return None if index is None else self.files[index]
+
+    def add(self, record):
+        # Insert a record, or replace the one with the same path
+        self.remove(record["path"])
+        self.positions[record["path"]] = len(self.files)
+        self.files.append(record)
+        self._reset_indexes()
+        
+        for (category, sort_option), view in self.views.items():
+            if category != "All" and category != record["category"]:
+                continue
+            keys = self._view_keys(category, sort_option)
+            key = sort_key(record, sort_option)
+            position = _insert_position(keys, key, SORT_OPTIONS[sort_option][1])
+            keys.insert(position, key)
+            view.insert(position, record)
+
+    def remove(self, path):
+        # Remove the record for path, if any, and return it
+        index = self.positions.pop(path, None)
+        if index is None:
+            return None
+        
+        # Fill the gap with the last record; the order of self.files is irrelevant
+        record = self.files[index]
+        last = self.files.pop()
+        if last is not record:
+            self.files[index] = last
+            self.positions[last["path"]] = index
+        self._reset_indexes()
+        
+        for (category, sort_option), view in self.views.items():
+            if category != "All" and category != record["category"]:
+                continue
+            keys = self._view_keys(category, sort_option)
+            key = sort_key(record, sort_option)
+            position = _first_position(keys, key, SORT_OPTIONS[sort_option][1])
+            while position < len(view) and view[position] is not record:
+                position += 1
+            if position < len(view):
+                del keys[position]
+                del view[position]
+        return record
+
+    def _view_keys(self, category, sort_option):
+        # Sort keys of a built view, only computed once the view starts changing
+        key = (category, sort_option)
+        keys = self.view_keys.get(key)
+        if keys is None:
+            keys = [sort_key(f, sort_option) for f in self.views[key]]
+            self.view_keys[key] = keys
+        return keys
+
+    def view(self, category, sort_option):
+        key = (category, sort_option)
+        view = self.views.get(key)
+        if view is None:
+            files = self.files
+            if category == "All":
+                view = [files[i] for i in self.order(sort_option)]
+            else:
+                # Sort just the bucket by each file's position in the full order
+                bucket = self.bucket(category)
+                rank = self.rank(sort_option)
+                view = [files[i] for i in sorted(bucket, key=rank.__getitem__)]
+            self.views[key] = view
+        return view
+
+    def order(self, sort_option):
+        order = self.orders.get(sort_option)
+        if order is None:
+            field, descending = SORT_OPTIONS[sort_option]
+            keys = self.keys(field)
+            order = sorted(range(len(keys)), key=keys.__getitem__, reverse=descending)
+            self.orders[sort_option] = order
+        return order
+
+    def rank(self, sort_option):
+        rank = self.ranks.get(sort_option)
+        if rank is None:
+            rank = [0] * len(self.files)
+            for position, index in enumerate(self.order(sort_option)):
+                rank[index] = position
+            self.ranks[sort_option] = rank
+        return rank
+
+    def keys(self, field):
+        keys = self.sort_keys.get(field)
+        if keys is None:
+            if field == "name":
+                # Lowercase once per file instead of once per sort
+                keys = [f["name"].lower() for f in self.files]
+            else:
+                keys = [f[field] for f in self.files]
+            self.sort_keys[field] = keys
+        return keys
+
+    def bucket(self, category):
+        if self.buckets is None:
+            self.buckets = {}
+            for index, f in enumerate(self.files):
+                self.buckets.setdefault(f["category"], []).append(index)
+        return self.buckets.get(category, [])
+
+
+class DirectoryWatcher:
+    # Watches one directory at a time with Linux inotify (through ctypes) and
+    # reports changed entries to the Tk thread in coalesced batches, as a list
+    # of (path, record) pairs where record is None for entries that are gone.
+    # On other platforms, or when inotify cannot be set up, available is False
+    # and callers should fall back to reloading the directory.
+    def __init__(self, root, on_changes, on_overflow, category_rules, sniffer=None):
+        self.root = root
+        self.on_changes = on_changes
+        self.on_overflow = on_overflow
+        self.category_rules = category_rules
+        self.sniffer = sniffer
+        self.lock = threading.Lock()
+        self.directory = None
+        self.wd = -1
+        self.available = False
+        
+        if not sys.platform.startswith("linux"):
+            return
+        try:
+            self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return
+        if self.fd < 0:
+            return
+        self.available = True
+        threading.Thread(target=self._reader, daemon=True).start()
+
+    def watch(self, directory):
+        # Replace the current watch; returns False if the directory can't be watched
+        if not self.available:
+            return False
+        with self.lock:
+            if self.wd >= 0:
+                self.libc.inotify_rm_watch(self.fd, self.wd)
+            self.wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            self.directory = directory if self.wd >= 0 else None
+            return self.wd >= 0
+
+    def _reader(self):
+        pending = {}  # name -> directory it was reported for
+        first_event = 0.0
+        while True:
+            timeout = WATCH_COALESCE_SECONDS if pending else None
+            ready, _, _ = select.select([self.fd], [], [], timeout)
+            if ready:
+                data = os.read(self.fd, 65536)
+                with self.lock:
+                    wd, directory = self.wd, self.directory
+                
+                offset = 0
+                while offset < len(data):
+                    event_wd, mask, _, length = struct.unpack_from("iIII", data, offset)
+                    name = data[offset + 16:offset + 16 + length].rstrip(b"\0")
+                    offset += 16 + length
+                    
+                    if mask & IN_Q_OVERFLOW or (event_wd == wd and mask & (IN_DELETE_SELF | IN_MOVE_SELF)):
+                        # Lost track of the directory; let the app reload it
+                        pending = {}
+                        self.root.after(0, lambda d=directory: self.on_overflow(d))
+                        continue
+                    if event_wd != wd or not name:
+                        continue
+                    name = os.fsdecode(name)
+                    if name.startswith('.'):
+                        continue
+                    if not pending:
+                        first_event = time.monotonic()
+                    pending[name] = directory
+                
+                # Keep collecting while events are still arriving, up to a limit
+                if pending and time.monotonic() - first_event < WATCH_MAX_DELAY_SECONDS:
+                    continue
+            
+            if pending:
+                self._report(pending)
+                pending = {}
+
+    def _report(self, pending):
+        # Stat the changed names here rather than on the Tk thread
+        changes = {}
+        found = []
+        for name, directory in pending.items():
+            path = os.path.join(directory, name)
+            try:
+                stats = os.stat(path)
+                record = make_file_record(name, path, stats, not stat.S_ISREG(stats.st_mode), self.category_rules)
+                found.append((record, stats))
+            except OSError:
+                record = None
+            changes.setdefault(directory, []).append((path, record))
+        if self.sniffer is not None:
+            self.sniffer.refine(found, self.category_rules)
+        for directory, batch in changes.items():
+            self.root.after(0, lambda d=directory, b=batch: self.on_changes(d, b))
+
+
+def user_cache_dir():
+    # Per-user cache directory for this app, following each platform's convention
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    path = os.path.join(base, "file_organizer")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+# Organize journals are written by organizer_v1_05 and by the backend (see
+# OrganizeJournal in file_organizer_backend.cpp), one JSON object per line.
+def journal_path_for(destination):
+    # One journal per organize destination; it is kept after the run so the
+    # run can be undone later
+    key = os.path.abspath(destination).encode("utf-8", "surrogateescape")
+    return os.path.join(user_cache_dir(), "journals", hashlib.sha1(key).hexdigest()[:16] + ".journal")
+
+
+def read_journal(path):
+    # Load a journal; returns None if there is none. A torn last line from a
+    # crash is ignored.
+    try:
+        f = open(path, encoding="utf-8", errors="surrogateescape")
+    except OSError:
+        return None
+    state = {"header": None, "plan": [], "folders": [], "done": [], "undone": set(), "end": None}
+    seen = set()
+    with f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if "journal" in entry:
+                state["header"] = entry
+            elif "plan" in entry:
+                entry["index"] = entry.pop("plan")
+                state["plan"].append(entry)
+            elif "folder" in entry:
+                state["folders"].append(entry["folder"])
+            elif "done" in entry and entry["done"] not in seen:
+                seen.add(entry["done"])
+                state["done"].append(entry["done"])
+            elif "undone" in entry:
+                state["undone"].add(entry["undone"])
+            elif "end" in entry:
+                state["end"] = entry["end"]
+    return state if state["header"] else None
+
+
+class ThumbnailStore:
+    # Thumbnails persisted as PNG blobs in a SQLite table. Rows are keyed by
+    # path and only match while the file's size and mtime_ns are unchanged, so
+    # edited files are re-decoded and their stale row overwritten. Total size
+    # is capped, evicting the least recently used rows first.
+    def __init__(self, db_path=None, max_bytes=THUMBNAIL_STORE_MAX_BYTES):
+        if db_path is None:
+            db_path = os.path.join(user_cache_dir(), "thumbnails.db")
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS thumbnails (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                bytes INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                data BLOB NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS thumbnails_last_used ON thumbnails(last_used)")
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM thumbnails").fetchone()[0]
+        self.pending = []  # Rows waiting to be written
+        self.touched = {}  # path -> last use time, for hits not yet written back
+        self.last_commit = time.monotonic()
+
+    def get(self, path, size, mtime_ns):
+        with self.lock:
+            row = self.conn.execute("SELECT data FROM thumbnails WHERE path = ? AND size = ? AND mtime_ns = ?",
+                                    (path, size, mtime_ns)).fetchone()
+            if row is None:
+                return None
+            self.touched[path] = time.time()
+            self._maybe_commit()
+            return row[0]
+
+    def put(self, path, size, mtime_ns, data):
+        with self.lock:
+            self.pending.append((path, size, mtime_ns, len(data), time.time(), data))
+            self._maybe_commit()
+
+    def flush(self):
+        with self.lock:
+            self._commit()
+
+    def close(self):
+        with self.lock:
+            self._commit()
+            self.conn.close()
+
+    def _maybe_commit(self):
+        if (len(self.pending) + len(self.touched) >= THUMBNAIL_STORE_BATCH
+                or time.monotonic() - self.last_commit >= THUMBNAIL_STORE_COMMIT_INTERVAL):
+            self._commit()
+
+    def _commit(self):
+        self.last_commit = time.monotonic()
+        if not self.pending and not self.touched:
+            return
+        
+        # Account for rows being replaced before overwriting them
+        for row in self.pending:
+            old = self.conn.execute("SELECT bytes FROM thumbnails WHERE path = ?", (row[0],)).fetchone()
+            if old is not None:
+                self.total_bytes -= old[0]
+            self.total_bytes += row[3]
+        
+        self.conn.executemany("INSERT OR REPLACE INTO thumbnails (path, size, mtime_ns, bytes, last_used, data) "
+                              "VALUES (?, ?, ?, ?, ?, ?)", self.pending)
+        self.conn.executemany("UPDATE thumbnails SET last_used = ? WHERE path = ?",
+                              [(used, path) for path, used in self.touched.items()])
+        self.pending = []
+        self.touched = {}
+        
+        # Evict least recently used rows until we are back under 90% of the cap
+        if self.total_bytes > self.max_bytes:
+            target = self.max_bytes * 0.9
+            cursor = self.conn.execute("SELECT path, bytes FROM thumbnails ORDER BY last_used")
+            evicted = []
+            for path, nbytes in cursor:
+                if self.total_bytes <= target:
+                    break
+                evicted.append((path,))
+                self.total_bytes -= nbytes
+            self.conn.executemany("DELETE FROM thumbnails WHERE path = ?", evicted)
+        
+        self.conn.commit()
+
+
+class HashCache:
+    # Content hashes remembered across runs, in a table of the metadata
+    # database. Rows are keyed by (st_dev, st_ino, size, mtime_ns) rather than
+    # path, so a file renamed or moved within its filesystem keeps its hashes,
+    # while any write to it changes the key. Each row holds the file's "ends"
+    # hash (see partial_digest) and "full" hash once known, as raw bytes.
+    def __init__(self, db_path=None, max_age_days=HASH_CACHE_MAX_AGE_DAYS):
+        if db_path is None:
+            db_path = os.path.join(user_cache_dir(), "metadata.db")
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS hashes (
+                dev INTEGER NOT NULL,
+                ino INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                ends BLOB,
+                full BLOB,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (dev, ino, size, mtime_ns)
+            ) WITHOUT ROWID""")
+        
+        # Files that changed or were deleted leave their old rows behind
+        self.conn.execute("DELETE FROM hashes WHERE last_used < ?", (time.time() - max_age_days * 86400,))
+        self.conn.commit()
+        self.pending = {}  # key -> {"ends": digest, "full": digest} waiting to be written
+        self.touched = set()  # keys of hits whose last use is not written back yet
+        self.last_commit = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(stats):
+        # None when the stat result has no inode (os.scandir on Windows), as
+        # such keys would collide
+        if not stats.st_ino:
+            return None
+        return stats.st_dev, stats.st_ino, stats.st_size, stats.st_mtime_ns
+
+    def get(self, key, kind):
+        # Cached hex digest of kind "ends" or "full", or None
+        with self.lock:
+            value = self.pending.get(key, {}).get(kind)
+            if value is None:
+                row = self.conn.execute(f"SELECT {kind} FROM hashes WHERE dev = ? AND ino = ? AND size = ? "
+                                        "AND mtime_ns = ?", key).fetchone()
+                if row is None or row[0] is None:
+                    self.misses += 1
+                    return None
+                value = row[0].hex()
+                self.touched.add(key)
+            self.hits += 1
+            self._maybe_commit()
+            return value
+
+    def put(self, key, kind, digest):
+        with self.lock:
+            self.pending.setdefault(key, {})[kind] = digest
+            self._maybe_commit()
+
+    def digest(self, path, kind, compute):
+        # Returns (digest, was_read): the cached digest for the file as it is
+        # now, or compute()'s result. A computed digest is kept only if the
+        # file did not change while it was being read. Database errors count
+        # as misses rather than failing the caller.
+        key = self.key(os.stat(path))
+        if key is not None:
+            try:
+                value = self.get(key, kind)
+            except sqlite3.Error:
+                value = None
+            if value is not None:
+                return value, False
+        value = compute()
+        if key is not None and self.key(os.stat(path)) == key:
+            try:
+                self.put(key, kind, value)
+            except sqlite3.Error:
+                pass
+        return value, True
+
+    def flush(self):
+        with self.lock:
+            self._commit()
+
+    def close(self):
+        with self.lock:
+            self._commit()
+            self.conn.close()
+
+    def _maybe_commit(self):
+        if (len(self.pending) + len(self.touched) >= HASH_CACHE_BATCH
+                or time.monotonic() - self.last_commit >= HASH_CACHE_COMMIT_INTERVAL):
+            self._commit()
+
+    def _commit(self):
+        self.last_commit = time.monotonic()
+        if not self.pending and not self.touched:
+            return
+        now = time.time()
+        
+        # Keep the other kind's digest when a row already exists
+        rows = []
+        for key, digests in self.pending.items():
+            ends, full = digests.get("ends"), digests.get("full")
+            rows.append(key + (ends and bytes.fromhex(ends), full and bytes.fromhex(full), now))
+        self.conn.executemany("INSERT INTO hashes (dev, ino, size, mtime_ns, ends, full, last_used) "
+                              "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                              "ON CONFLICT (dev, ino, size, mtime_ns) DO UPDATE SET "
+                              "ends = COALESCE(excluded.ends, ends), full = COALESCE(excluded.full, full), "
+                              "last_used = excluded.last_used", rows)
+        self.conn.executemany("UPDATE hashes SET last_used = ? WHERE dev = ? AND ino = ? AND size = ? "
+                              "AND mtime_ns = ?", [(now,) + key for key in self.touched])
+        self.pending = {}
+        self.touched = set()
+        self.conn.commit()
+
+
+class ThumbnailCache:
+    # LRU of PhotoImages bounded by estimated pixel memory rather than entry
+    # count. None is stored for files that failed to decode. Entries are also
+    # indexed by folder so a folder's thumbnails can be dropped after leaving it.
+    def __init__(self, max_bytes=THUMBNAIL_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # path -> (photo, estimated bytes)
+        self.folders = {}  # folder -> set of cached paths in it
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, path):
+        return path in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, path):
+        entry = self.entries.get(path)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(path)
+        return entry[0]
+
+    def put(self, path, photo):
+        self._remove(path)
+        if photo is None:
+            nbytes = THUMBNAIL_FAILED_BYTES
+        else:
+            nbytes = photo.width() * photo.height() * 4
+        self.entries[path] = (photo, nbytes)
+        self.folders.setdefault(os.path.dirname(path), set()).add(path)
+        self.total_bytes += nbytes
+        
+        # Evict least recently used entries, but never the one just added
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            oldest = next(iter(self.entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def discard(self, path):
+        # Forget one thumbnail, e.g. because the file changed or went away
+        self._remove(path)
+
+    def drop_folder(self, folder):
+        # Forget every thumbnail of a folder; returns how many were dropped
+        paths = self.folders.pop(folder, ())
+        for path in list(paths):
+            self._remove(path)
+        return len(paths)
+
+    def clear(self):
+        self.entries.clear()
+        self.folders.clear()
+        self.total_bytes = 0
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+    def _remove(self, path):
+        entry = self.entries.pop(path, None)
+        if entry is None:
+            return
+        self.total_bytes -= entry[1]
+        folder = os.path.dirname(path)
+        paths = self.folders.get(folder)
+        if paths is not None:
+            paths.discard(path)
+            if not paths:
+                del self.folders[folder]
+
+
+def encode_thumbnail(image):
+    if image.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+        image = image.convert("RGBA")
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def decode_thumbnail(data):
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+        return image
+    except Exception:
+        return None
+
+
+def load_thumbnail_image(path, size=THUMBNAIL_SIZE):
+    # Decode a reduced-size image. For JPEGs, draft() makes libjpeg decode
+    # directly at 1/2, 1/4 or 1/8 scale, and for other formats thumbnail()
+    # uses reduce() before resampling, so a 24MP photo never gets decoded at
+    # full resolution. Returns None if the file cannot be decoded.
+    try:
+        with Image.open(path) as img:
+            img.draft("RGB", size)
+            img.thumbnail(size, reducing_gap=2.0)
+            img.load()
+            return img
+    except Exception:
+        return None
+
+
+class ThumbnailLoader:
+    # Decodes thumbnails on a small pool of worker threads. Only the paths given
+    # to the latest request() call are wanted; anything else still queued is
+    # dropped when a worker reaches it. Results are handed back to the Tk thread
+    # in batches through a single pending root.after callback. If a store is
+    # given, it is checked before decoding and fed with every new thumbnail.
+    def __init__(self, root, on_ready, store=None, size=THUMBNAIL_SIZE, workers=THUMBNAIL_WORKERS):
+        self.root = root
+        self.on_ready = on_ready
+        self.store = store
+        self.size = size
+        self.tasks = queue.PriorityQueue()
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+        self.wanted = set()
+        self.queued = {}  # path -> priority of its live queue entry
+        self.keys = {}  # path -> (size, mtime_ns) used as the store key
+        self.in_progress = set()
+        self.results = []
+        self.flush_scheduled = False
+        
+        for _ in range(workers):
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    def request(self, items):
+        # items is a list of (file_info, priority) pairs, lower priority first.
+        # Replaces the previous request, cancelling paths no longer listed.
+        with self.lock:
+            self.wanted = {file_info["path"] for file_info, _ in items}
+            for file_info, priority in items:
+                path = file_info["path"]
+                self.keys[path] = (file_info["size"], file_info["modified_ns"])
+                if path in self.in_progress:
+                    continue
+                if path in self.queued and self.queued[path] <= priority:
+                    continue
+                self.queued[path] = priority
+                self.tasks.put((priority, next(self.counter), path))
+
+    def cancel_all(self):
+        with self.lock:
+            self.wanted = set()
+
+    def _worker(self):
+        while True:
+            priority, _, path = self.tasks.get()
+            with self.lock:
+                # Skip entries superseded by a higher-priority one
+                if self.queued.get(path) != priority:
+                    continue
+                del self.queued[path]
+                size, mtime_ns = self.keys.pop(path)
+                # Skip tiles that scrolled out of view while queued
+                if path not in self.wanted:
+                    continue
+                self.in_progress.add(path)
+            
+            image = self._load(path, size, mtime_ns)
+            
+            with self.lock:
+                self.in_progress.discard(path)
+                self.results.append((path, image))
+                schedule = not self.flush_scheduled
+                self.flush_scheduled = True
+            if schedule:
+                self.root.after(THUMBNAIL_FLUSH_MS, self._flush)
+
+    def _load(self, path, size, mtime_ns):
+        if self.store is not None:
+            try:
+                data = self.store.get(path, size, mtime_ns)
+            except sqlite3.Error:
+                data = None
+            if data is not None:
+                image = decode_thumbnail(data)
+                if image is not None:
+                    return image
+        
+        image = load_thumbnail_image(path, self.size)
+        
+        if image is not None and self.store is not None:
+            try:
+                self.store.put(path, size, mtime_ns, encode_thumbnail(image))
+            except Exception:
+                pass  # The on-disk cache is best effort
+        return image
+
+    def _flush(self):
+        # Runs on the Tk thread
+        with self.lock:
+            results = self.results
+            self.results = []
+            self.flush_scheduled = False
+        if results:
+            self.on_ready(results)
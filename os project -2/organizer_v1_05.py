@@ -5,13 +5,1107 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
 from pathlib import Path
-from PIL import Image, ImageTk, ImageFile
-import io
+from PIL import ImageTk, ImageFile
 import time
+import queue
+import sqlite3
+import sys
+import atexit
+import errno
+import json
+import re
+import zipfile
+import html
+import codecs
+
+try:
+    import fcntl  # For reflink copies; not available on Windows
+except ImportError:
+    fcntl = None
+
+# Categorizing, listing, caching and thumbnail code shared with the other
+# organizer GUI lives in organizer_common.py at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from organizer_common import (CATEGORY_ICONS, DEFAULT_CATEGORY_RULES, SORT_OPTIONS, categorize,
+                              category_rules_path, CategoryRules, ContentSniffer, DirectoryWatcher,
+                              DuplicateFinder, file_digest, FileListing, HashCache, journal_path_for,
+                              load_category_rules, make_file_record, parse_category_rules, read_journal,
+                              ThumbnailCache, ThumbnailLoader, ThumbnailStore, user_cache_dir, walk_files)
 
 # Enable loading truncated images
 ImageFile.LOAD_TRUNCATED_IMAGES = True
 
+# Directory scanning batch sizes: a small first batch so the first tiles show up
+# almost immediately, then larger batches to keep the per-batch UI overhead low
+SCAN_FIRST_BATCH = 256
+SCAN_BATCH_SIZE = 4096
+# Minimum time in seconds between grid refreshes while a scan is streaming in
+BATCH_DISPLAY_INTERVAL = 0.25
+
+# Filename search over every directory in the metadata index
+SEARCH_BATCH_SIZE = 256  # Matches are handed to the grid in batches of this size
+SEARCH_MAX_RESULTS = 20000  # Stop after this many matches
+SEARCH_DEBOUNCE_MS = 250  # Search this long after the last keystroke
+
+# File copying
+FICLONE = 0x40049409  # ioctl that clones a file's extents on btrfs/XFS (reflink)
+COPY_BUFFER_SIZE = 1024 * 1024
+# errno values meaning "this copy mechanism is not supported here"
+COPY_UNSUPPORTED_ERRORS = {errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTTY,
+                           errno.EBADF, errno.EPERM}
+
+# Organize plans saved to disk carry this format version
+ORGANIZE_PLAN_VERSION = 1
+# How often the progress window polls a running organize, in milliseconds (~15 Hz)
+PROGRESS_POLL_MS = 66
+# Completed operations are fsynced to the organize journal in batches of this
+# size, or at least this often
+JOURNAL_SYNC_ENTRIES = 256
+JOURNAL_SYNC_SECONDS = 1.0
+
+# Full-text content index
+CONTENT_MAX_BYTES = 8 * 1024 * 1024  # Only the start of larger files is indexed
+CONTENT_INDEX_BATCH = 256  # Extracted files are committed in batches of this many...
+CONTENT_INDEX_BATCH_BYTES = 32 * 1024 * 1024  # ...or this much text...
+CONTENT_INDEX_COMMIT_INTERVAL = 2.0  # ...or after this many seconds
+CONTENT_SEARCH_LIMIT = 200  # Best-ranked matches shown per query
+# XML parts of Office Open XML and OpenDocument files that hold their text
+OFFICE_TEXT_PARTS = re.compile(r"word/document\.xml|xl/sharedStrings\.xml|ppt/slides/slide\d+\.xml|content\.xml")
+# Tags that end a paragraph, cell or line in those parts
+OFFICE_TEXT_BREAKS = re.compile(r"</(?:w:p|a:p|text:p|text:h|si)>|<(?:w:tab|w:br|text:tab|text:line-break)\b[^>]*>")
+
+# File grid geometry. Only the visible rows plus a few rows of overscan above
+# and below get real widgets; those tiles are recycled as the view scrolls.
+TILE_WIDTH = 120
+TILE_HEIGHT = 150
+TILE_PADDING = 16
+OVERSCAN_ROWS = 2
+OFFSCREEN = -10000  # Canvas coordinate used to park unused tiles
+
+
+def _copy_reflink(fin, fout, size):
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(fout, FICLONE, fin)
+    except OSError as e:
+        if e.errno in COPY_UNSUPPORTED_ERRORS:
+            return False
+        raise
+    return True
+
+
+def _copy_kernel(fin, fout, size, copy_chunk):
+    # Shared loop for copy_file_range and sendfile. A size of 0 may be a
+    # pseudo file whose size is unknown, so leave those to the buffered copy.
+    if size == 0:
+        return False
+    copied = 0
+    while copied < size:
+        try:
+            n = copy_chunk(fin, fout, copied, min(size - copied, 0x7ffff000))
+        except OSError as e:
+            if copied == 0 and e.errno in COPY_UNSUPPORTED_ERRORS:
+                return False
+            raise
+        if n == 0:
+            return copied > 0
+        copied += n
+    return True
+
+
+def _copy_range(fin, fout, size):
+    if not hasattr(os, "copy_file_range"):
+        return False
+    return _copy_kernel(fin, fout, size,
+                        lambda fin, fout, offset, count: os.copy_file_range(fin, fout, count, offset, offset))
+
+
+def _copy_sendfile(fin, fout, size):
+    if not hasattr(os, "sendfile") or not sys.platform.startswith("linux"):
+        return False
+    return _copy_kernel(fin, fout, size, lambda fin, fout, offset, count: os.sendfile(fout, fin, offset, count))
+
+
+def _copy_buffered(fin, fout, size):
+    buffer = bytearray(COPY_BUFFER_SIZE)
+    view = memoryview(buffer)
+    while True:
+        n = os.readv(fin, [buffer])
+        if n == 0:
+            return True
+        written = 0
+        while written < n:
+            written += os.write(fout, view[written:n])
+
+
+# Copy strategies, fastest first
+COPY_STRATEGIES = [
+    ("reflink", _copy_reflink),
+    ("copy_file_range", _copy_range),
+    ("sendfile", _copy_sendfile),
+    ("buffered", _copy_buffered)
+]
+
+
+def fast_copy(source, dest_path, strategy=None):
+    # Copy a file like shutil.copy2, but try a reflink, copy_file_range and
+    # sendfile before falling back to a large-buffer loop. Returns the name of
+    # the strategy used; strategy forces a single one (for benchmarking).
+    if not os.path.isfile(source) or not hasattr(os, "readv"):
+        shutil.copy2(source, dest_path)
+        return "shutil"
+    
+    fin = os.open(source, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+    try:
+        stats = os.fstat(fin)
+        try:
+            dest_stats = os.stat(dest_path)
+            if (dest_stats.st_dev, dest_stats.st_ino) == (stats.st_dev, stats.st_ino):
+                raise shutil.SameFileError(f"{source} and {dest_path} are the same file")
+        except FileNotFoundError:
+            pass
+        
+        fout = os.open(dest_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0),
+                       stats.st_mode & 0o777)
+        try:
+            used = None
+            for name, copier in COPY_STRATEGIES:
+                if strategy is not None and name != strategy:
+                    continue
+                if copier(fin, fout, stats.st_size):
+                    used = name
+                    break
+            if used is None:
+                raise OSError(errno.ENOTSUP, f"Copy strategy not supported: {strategy}", source)
+        except BaseException:
+            os.close(fout)
+            os.remove(dest_path)
+            raise
+        os.close(fout)
+    finally:
+        os.close(fin)
+    
+    shutil.copystat(source, dest_path)
+    return used
+
+
+def place_file(source, dest_path, move=False, same_device=None):
+    # Copy source to dest_path, or move it. A move within one filesystem is a
+    # rename (metadata only); across filesystems it is a copy plus unlink.
+    # same_device may be passed in when the caller already compared st_dev.
+    if not move:
+        return fast_copy(source, dest_path)
+    
+    if same_device is None:
+        same_device = os.stat(source).st_dev == os.stat(os.path.dirname(dest_path)).st_dev
+    if same_device:
+        try:
+            os.replace(source, dest_path)
+            return "rename"
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+    strategy = fast_copy(source, dest_path)
+    os.remove(source)
+    return strategy + "+unlink"
+
+
+def organize_folder(file_info, mode):
+    # Target folder for a file when organizing by "date" or by "type"
+    if mode == "date":
+        return datetime.datetime.fromtimestamp(file_info["modified"]).strftime("%Y-%m-%d")
+    return file_info["category"]
+
+
+def cached_file_digest(path, hash_cache=None):
+    # file_digest, served from the hash cache when one is given and knows the file
+    if hash_cache is None:
+        return file_digest(path)
+    return hash_cache.digest(path, "full", lambda: file_digest(path))[0]
+
+
+def target_status(source_path, source_size, source_mtime_ns, target_path, verify_content=False, hash_cache=None):
+    # "new" if the target is missing, "unchanged" if it already matches the
+    # source (same size and mtime, or same content when verifying), else "update"
+    try:
+        target = os.stat(target_path)
+    except FileNotFoundError:
+        return "new"
+    if target.st_size == source_size:
+        if target.st_mtime_ns == source_mtime_ns:
+            return "unchanged"
+        if verify_content and (cached_file_digest(source_path, hash_cache) ==
+                               cached_file_digest(target_path, hash_cache)):
+            return "unchanged"
+    return "update"
+
+
+def plan_organize(files, source_dir, destination, mode, move=False, verify_content=False, hash_cache=None):
+    # Work out every operation an organize run would perform without changing
+    # anything on disk. Each operation records its source, target, kind
+    # ("copy", "rename" or "move" across filesystems), the bytes it has to
+    # write and its status: "new", or "update" when an existing target differs
+    # from the source. Targets that are already up to date get the conflict
+    # "unchanged" and are skipped, like "duplicate" targets; when moving they
+    # get the status "unchanged" instead, and running them removes the source.
+    same_device = os.stat(source_dir).st_dev == os.stat(destination).st_dev
+    op = "copy" if not move else ("rename" if same_device else "move")
+    
+    operations = []
+    existing = {}  # folder -> names already in it, listed once per folder
+    targets = set()
+    for file_info in files:
+        if file_info["is_dir"]:
+            continue
+        folder = organize_folder(file_info, mode)
+        if folder not in existing:
+            try:
+                existing[folder] = set(os.listdir(os.path.join(destination, folder)))
+            except OSError:
+                existing[folder] = set()
+        
+        # The listing may be painted from the metadata index, so take the
+        # source's size and mtime from a fresh stat; only targets that exist
+        # need one
+        try:
+            source = os.stat(file_info["path"])
+            size, mtime_ns = source.st_size, source.st_mtime_ns
+        except OSError:
+            size, mtime_ns = file_info["size"], file_info["modified_ns"]
+        target = os.path.join(destination, folder, file_info["name"])
+        status = "new"
+        conflict = None
+        if target in targets:
+            conflict = "duplicate"
+        elif file_info["name"] in existing[folder]:
+            status = target_status(file_info["path"], size, mtime_ns, target, verify_content, hash_cache)
+            if status == "unchanged" and not move:
+                conflict = "unchanged"
+        targets.add(target)
+        
+        operations.append({
+            "source": file_info["path"],
+            "target": target,
+            "folder": folder,
+            "op": op,
+            "bytes": 0 if op == "rename" or status == "unchanged" else size,
+            "modified_ns": mtime_ns,
+            "status": status,
+            "conflict": conflict
+        })
+    
+    return {
+        "version": ORGANIZE_PLAN_VERSION,
+        "created": time.time(),
+        "mode": mode,
+        "move": move,
+        "verify_content": verify_content,
+        "source_dir": source_dir,
+        "destination": destination,
+        "operations": operations
+    }
+
+
+def refresh_plan_conflicts(plan, hash_cache=None):
+    # Re-check targets of a saved plan against the disk as it is now
+    for operation in plan["operations"]:
+        if operation["conflict"] == "duplicate":
+            continue
+        try:
+            source = os.stat(operation["source"])
+            size, mtime_ns = source.st_size, source.st_mtime_ns
+        except OSError:
+            size, mtime_ns = operation["bytes"], operation["modified_ns"]
+        status = target_status(operation["source"], size, mtime_ns, operation["target"],
+                               plan.get("verify_content", False), hash_cache)
+        if status == "unchanged" and not plan["move"]:
+            operation["status"], operation["conflict"] = "update", "unchanged"
+        else:
+            operation["status"], operation["conflict"] = status, None
+    return plan
+
+
+def plan_summary(plan):
+    runnable = [o for o in plan["operations"] if o["conflict"] is None]
+    unchanged = sum(1 for o in plan["operations"] if "unchanged" in (o["conflict"], o["status"]))
+    return {
+        "files": len(runnable),
+        "bytes": sum(o["bytes"] for o in runnable),
+        "renames": sum(1 for o in runnable if o["op"] == "rename" and o["status"] != "unchanged"),
+        "folders": len({o["folder"] for o in runnable}),
+        "new": sum(1 for o in runnable if o["status"] == "new"),
+        "updates": sum(1 for o in runnable if o["status"] == "update"),
+        "unchanged": unchanged,
+        "conflicts": sum(1 for o in plan["operations"] if o["conflict"] == "duplicate")
+    }
+
+
+def execution_order(plan):
+    # Cheap renames first, then data copies grouped by target folder so writes
+    # to one directory stay together
+    runnable = [o for o in plan["operations"] if o["conflict"] is None]
+    return sorted(runnable, key=lambda o: (o["op"] != "rename", o["folder"], o["source"]))
+
+
+class OrganizeProgress:
+    # Counters shared by an organize worker and the Tk thread. The worker
+    # updates them per file; the progress window reads a snapshot a few times
+    # per second, so the Tk event queue sees no per-file traffic.
+    def __init__(self, total_files, total_units):
+        self.lock = threading.Lock()
+        self.total_files = total_files
+        self.total_units = total_units
+        self.done_files = 0
+        self.done_units = 0
+        self.done_bytes = 0
+        self.current = ""
+        self.start = time.monotonic()
+        self.finished = False
+
+    def advance(self, name, units, nbytes):
+        with self.lock:
+            self.done_files += 1
+            self.done_units += units
+            self.done_bytes += nbytes
+            self.current = name
+
+    def finish(self):
+        with self.lock:
+            self.finished = True
+
+    def snapshot(self):
+        # (files done, name of the last file, units done, bytes/sec, seconds left, finished)
+        with self.lock:
+            elapsed = max(time.monotonic() - self.start, 1e-6)
+            rate = self.done_bytes / elapsed
+            units_per_second = self.done_units / elapsed
+            remaining = self.total_units - self.done_units
+            eta = remaining / units_per_second if units_per_second else 0.0
+            return self.done_files, self.current, self.done_units, rate, eta, self.finished
+
+
+class OrganizeJournal:
+    # Append-only log of an organize run, one JSON object per line (the C++
+    # backend writes the same format):
+    #   {"journal": 1, "mode": ..., "move": ..., "source_dir": ..., "destination": ...}
+    #   {"folder": path}                     folder created by this run
+    #   {"plan": i, "op": ..., "source": ..., "target": ..., "bytes": n}
+    #   {"done": i} / {"undone": i}
+    #   {"end": "completed"} / {"end": "undone"}
+    # The header, folders and plan are synced before any file is touched;
+    # completed entries are synced in batches.
+    def __init__(self, path, append=False):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.file = open(path, "a" if append else "w", encoding="utf-8", errors="surrogateescape")
+        self.lock = threading.Lock()
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def write(self, entry, sync=False):
+        with self.lock:
+            self.file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.unsynced += 1
+            if (sync or self.unsynced >= JOURNAL_SYNC_ENTRIES or
+                    time.monotonic() - self.last_sync >= JOURNAL_SYNC_SECONDS):
+                self._sync()
+
+    def sync(self):
+        with self.lock:
+            self._sync()
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self._sync()
+                self.file.close()
+
+    def _sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+
+def start_journal(path, plan, operations):
+    # Journal a fresh run: header and folders to create, then the operations,
+    # each tagged with its index in the journal
+    journal = OrganizeJournal(path)
+    journal.write({
+        "journal": 1,
+        "mode": plan["mode"],
+        "move": plan["move"],
+        "source_dir": plan["source_dir"],
+        "destination": plan["destination"]
+    })
+    for folder in sorted({os.path.dirname(o["target"]) for o in operations}):
+        if not os.path.isdir(folder):
+            journal.write({"folder": folder})
+    for index, operation in enumerate(operations):
+        operation["index"] = index
+        journal.write({"plan": index, "op": operation["op"], "source": operation["source"],
+                       "target": operation["target"], "bytes": operation["bytes"], "status": operation["status"]})
+    journal.sync()
+    return journal
+
+
+def resume_operations(state):
+    # Operations of an interrupted run that still have to be done
+    done = set(state["done"])
+    return [o for o in state["plan"] if o["index"] not in done]
+
+
+def undo_journal(path, state):
+    # Reverse a journaled run, newest operation first: copies are deleted and
+    # moves are moved back. Folders the run created are removed if empty.
+    # Returns the number of operations that could not be undone.
+    planned = {o["index"]: o for o in state["plan"]}
+    journal = OrganizeJournal(path, append=True)
+    failed = 0
+    try:
+        for index in reversed(state["done"]):
+            operation = planned.get(index)
+            if operation is None or index in state["undone"]:
+                continue
+            try:
+                if operation.get("status") == "unchanged":
+                    # The source was removed next to an up-to-date target
+                    fast_copy(operation["target"], operation["source"])
+                elif operation["op"] == "copy":
+                    # A copy that replaced an older target can't bring the old
+                    # content back; it is left in place (it matches the source)
+                    if operation.get("status") != "update" and os.path.lexists(operation["target"]):
+                        os.remove(operation["target"])
+                else:
+                    place_file(operation["target"], operation["source"], move=True)
+                journal.write({"undone": index})
+            except OSError:
+                failed += 1
+        for folder in reversed(state["folders"]):
+            try:
+                os.rmdir(folder)  # Only succeeds if the folder is empty
+            except OSError:
+                pass
+        if not failed:
+            journal.write({"end": "undone"}, sync=True)
+    finally:
+        journal.close()
+    return failed
+
+
+def save_plan(plan, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(plan, f, indent=1)
+
+
+def load_plan(path):
+    with open(path, encoding="utf-8") as f:
+        plan = json.load(f)
+    if plan.get("version") != ORGANIZE_PLAN_VERSION:
+        raise ValueError(f"Unsupported plan version: {plan.get('version')}")
+    return plan
+
+
+def scan_directory(directory, category_rules, first_batch=SCAN_FIRST_BATCH, batch_size=SCAN_BATCH_SIZE,
+                   sniffer=None):
+    # Stream the directory with os.scandir and yield lists of file records.
+    # DirEntry already knows the entry type from the directory read, and its
+    # stat() result is cached (free on Windows), so each entry costs at most
+    # one stat call instead of isfile + stat. Each record's category is
+    # resolved here once, so later filtering and organizing never re-derive it;
+    # with a sniffer, files the name leaves in Others are sniffed per batch.
+    batch = []
+    limit = first_batch
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            # Skip hidden files
+            if entry.name.startswith('.'):
+                continue
+
+            try:
+                is_dir = not entry.is_file()
+                stats = entry.stat()
+            except OSError:
+                # Entry vanished or is unreadable (e.g. a broken symlink)
+                continue
+
+            batch.append((make_file_record(entry.name, entry.path, stats, is_dir, category_rules), stats))
+
+            if len(batch) >= limit:
+                yield _finish_batch(batch, category_rules, sniffer)
+                batch = []
+                limit = batch_size
+
+    if batch:
+        yield _finish_batch(batch, category_rules, sniffer)
+
+
+def _finish_batch(pairs, category_rules, sniffer):
+    # Records of a scan batch of (record, stats) pairs, sniffed if possible
+    if sniffer is not None:
+        sniffer.refine(pairs, category_rules)
+    return [record for record, _ in pairs]
+
+
+# SQLite text must be valid UTF-8, but os.fsdecode turns bytes of file names
+# that aren't into lone surrogates. The indexes store each one as NUL and its
+# code point in hex instead; NUL never occurs in a path, so this is lossless,
+# and since it maps characters one by one, path prefixes stay prefixes.
+SURROGATE = re.compile("[\ud800-\udfff]")
+ESCAPED_SURROGATE = re.compile("\0([0-9a-f]{4})")
+
+
+def db_text(text):
+    try:
+        text.encode("utf-8")
+        return text
+    except UnicodeEncodeError:
+        return SURROGATE.sub(lambda m: f"\0{ord(m.group()):04x}", text)
+
+
+def from_db_text(text):
+    if "\0" not in text:
+        return text
+    return ESCAPED_SURROGATE.sub(lambda m: chr(int(m.group(1), 16)), text)
+
+
+class MetadataIndex:
+    # Persistent index of scanned directories, stored in SQLite (WAL mode).
+    # Each directory row keeps the directory's own mtime_ns from when it was
+    # scanned. Creating, deleting or renaming an entry bumps that mtime, so a
+    # tree refresh only rescans the changed folders. Editing a file in place
+    # doesn't, so an opened folder is painted from the index and then always
+    # rescanned in the background.
+    #
+    # Entry names are also kept in an FTS5 trigram table for filename search.
+    # Its rowids are the directory's id in name_dirs shifted left 32 bits plus
+    # a position, so a directory's names can be replaced by rowid range. When
+    # SQLite lacks FTS5 or the trigram tokenizer, searchable is False and
+    # search() scans the entries table instead.
+    def __init__(self, db_path=None):
+        if db_path is None:
+            db_path = os.path.join(user_cache_dir(), "metadata.db")
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS directories (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                scanned_at REAL NOT NULL
+            )""")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                directory TEXT NOT NULL,
+                name TEXT NOT NULL,
+                is_dir INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                modified REAL NOT NULL,
+                modified_ns INTEGER NOT NULL,
+                sniffed TEXT,
+                PRIMARY KEY (directory, name)
+            ) WITHOUT ROWID""")
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(entries)")]
+        if "sniffed" not in columns:
+            # Indexes from before content sniffing: rescan every directory on
+            # its next load, so its records get sniffed
+            self.conn.execute("ALTER TABLE entries ADD COLUMN sniffed TEXT")
+            self.conn.execute("UPDATE directories SET mtime_ns = -1")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS name_dirs (
+                id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL UNIQUE
+            )""")
+        self.conn.commit()
+        self.searchable = self._create_name_index()
+
+    def _create_name_index(self):
+        # Returns False if this SQLite can't build the trigram index
+        if self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'names'").fetchone() is not None:
+            return True
+        try:
+            with self.conn:
+                self.conn.execute("CREATE VIRTUAL TABLE names USING fts5(name, tokenize = 'trigram')")
+                
+                # Index the names of directories scanned before search existed
+                for (directory,) in self.conn.execute("SELECT path FROM directories").fetchall():
+                    names = self.conn.execute("SELECT name FROM entries WHERE directory = ?", (directory,))
+                    self._replace_names(directory, [name for (name,) in names])
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    # The private helpers take directories and names as stored, through db_text()
+
+    def _name_rowids(self, directory, create=True):
+        # (first, last) rowid of a directory's range in the names table, or None
+        row = self.conn.execute("SELECT id FROM name_dirs WHERE path = ?", (directory,)).fetchone()
+        if row is not None:
+            directory_id = row[0]
+        elif create:
+            directory_id = self.conn.execute("INSERT INTO name_dirs (path) VALUES (?)", (directory,)).lastrowid
+        else:
+            return None
+        return directory_id << 32, (directory_id << 32) | 0xFFFFFFFF
+
+    def _replace_names(self, directory, names):
+        first, last = self._name_rowids(directory)
+        self.conn.execute("DELETE FROM names WHERE rowid BETWEEN ? AND ?", (first, last))
+        self.conn.executemany("INSERT INTO names (rowid, name) VALUES (?, ?)",
+                              [(first + i, name) for i, name in enumerate(names)])
+
+    def load(self, directory, category_rules):
+        # Returns (mtime_ns, records) for an indexed directory, or None
+        key = db_text(directory)
+        with self.lock:
+            row = self.conn.execute("SELECT mtime_ns FROM directories WHERE path = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            rows = self.conn.execute("SELECT name, is_dir, size, created, modified, modified_ns, sniffed "
+                                     "FROM entries WHERE directory = ?", (key,)).fetchall()
+        
+        records = []
+        for name, is_dir, size, created, modified, modified_ns, sniffed in rows:
+            name = from_db_text(name)
+            records.append({
+                "name": name,
+                "path": os.path.join(directory, name),
+                "size": size,
+                "created": created,
+                "modified": modified,
+                "modified_ns": modified_ns,
+                "is_dir": bool(is_dir),
+                "category": categorize(name, category_rules, size, modified, sniffed),
+                "sniffed": sniffed
+            })
+        return row[0], records
+
+    def store(self, directory, mtime_ns, records):
+        # Replace everything indexed for a directory in one transaction
+        key = db_text(directory)
+        names = [db_text(f["name"]) for f in records]
+        rows = [(key, name, int(f["is_dir"]), f["size"], f["created"], f["modified"], f["modified_ns"], f["sniffed"])
+                for name, f in zip(names, records)]
+        with self.lock:
+            with self.conn:
+                self.conn.execute("DELETE FROM entries WHERE directory = ?", (key,))
+                self.conn.executemany("INSERT INTO entries (directory, name, is_dir, size, created, modified, modified_ns, "
+                                      "sniffed) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                self.conn.execute("INSERT OR REPLACE INTO directories (path, mtime_ns, scanned_at) VALUES (?, ?, ?)",
+                                  (key, mtime_ns, time.time()))
+                if self.searchable:
+                    self._replace_names(key, names)
+
+    def update(self, directory, changes):
+        # Apply (path, record) changes reported by the watcher, record being
+        # None for entries that are gone. The directory's stored mtime is left
+        # alone, so its next load still rescans it to catch anything missed.
+        directory = db_text(directory)
+        with self.lock:
+            if self.conn.execute("SELECT 1 FROM directories WHERE path = ?", (directory,)).fetchone() is None:
+                return
+            with self.conn:
+                rowids = self._name_rowids(directory) if self.searchable else None
+                for path, record in changes:
+                    name = db_text(os.path.basename(path))
+                    self.conn.execute("DELETE FROM entries WHERE directory = ? AND name = ?", (directory, name))
+                    if rowids is not None:
+                        self.conn.execute("DELETE FROM names WHERE rowid BETWEEN ? AND ? AND name = ?",
+                                          rowids + (name,))
+                    if record is None:
+                        continue
+                    
+                    self.conn.execute("INSERT INTO entries (directory, name, is_dir, size, created, modified, "
+                                      "modified_ns, sniffed) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                      (directory, name, int(record["is_dir"]), record["size"], record["created"],
+                                       record["modified"], record["modified_ns"], record["sniffed"]))
+                    if rowids is not None:
+                        last = self.conn.execute("SELECT MAX(rowid) FROM names WHERE rowid BETWEEN ? AND ?",
+                                                 rowids).fetchone()[0]
+                        self.conn.execute("INSERT INTO names (rowid, name) VALUES (?, ?)",
+                                          (rowids[0] if last is None else last + 1, name))
+
+    def forget(self, directory):
+        directory = db_text(directory)
+        with self.lock:
+            with self.conn:
+                self.conn.execute("DELETE FROM entries WHERE directory = ?", (directory,))
+                self.conn.execute("DELETE FROM directories WHERE path = ?", (directory,))
+                rowids = self._name_rowids(directory, create=False) if self.searchable else None
+                if rowids is not None:
+                    self.conn.execute("DELETE FROM names WHERE rowid BETWEEN ? AND ?", rowids)
+                    self.conn.execute("DELETE FROM name_dirs WHERE path = ?", (directory,))
+
+    def search(self, query, category_rules, prefix=False, should_stop=None,
+               batch_size=SEARCH_BATCH_SIZE, limit=SEARCH_MAX_RESULTS):
+        # Yield lists of file records for indexed entries whose name contains
+        # query, or starts with it when prefix is set, ignoring case. Queries
+        # of three or more characters go through the trigram index; shorter
+        # ones scan the entries table. Reads use their own connection, so a
+        # search never waits for a scan being stored.
+        folded = query.casefold()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            if self.searchable and len(query) >= 3:
+                cursor = conn.execute("SELECT d.path, e.name, e.is_dir, e.size, e.created, e.modified, e.modified_ns, "
+                                      "e.sniffed FROM names JOIN name_dirs d ON d.id = names.rowid >> 32 "
+                                      "JOIN entries e ON e.directory = d.path AND e.name = names.name "
+                                      "WHERE names MATCH ?", ('"' + query.replace('"', '""') + '"',))
+            else:
+                pattern = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                cursor = conn.execute("SELECT directory, name, is_dir, size, created, modified, modified_ns, sniffed "
+                                      "FROM entries WHERE name LIKE ? ESCAPE '\\'",
+                                      (("" if prefix else "%") + pattern + "%",))
+            
+            found = 0
+            while found < limit:
+                if should_stop is not None and should_stop():
+                    return
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                
+                # SQLite folds case differently (LIKE only for ASCII), and the
+                # trigram index can't anchor a prefix, so settle matches here
+                batch = []
+                for directory, name, is_dir, size, created, modified, modified_ns, sniffed in rows:
+                    directory, name = from_db_text(directory), from_db_text(name)
+                    folded_name = name.casefold()
+                    if not (folded_name.startswith(folded) if prefix else folded in folded_name):
+                        continue
+                    batch.append({
+                        "name": name,
+                        "path": os.path.join(directory, name),
+                        "size": size,
+                        "created": created,
+                        "modified": modified,
+                        "modified_ns": modified_ns,
+                        "is_dir": bool(is_dir),
+                        "category": categorize(name, category_rules, size, modified, sniffed),
+                        "sniffed": sniffed
+                    })
+                batch = batch[:limit - found]
+                found += len(batch)
+                if batch:
+                    yield batch
+        finally:
+            conn.close()
+
+    def known_directories(self, root):
+        # Indexed directories at or below root, with their stored mtime_ns.
+        # Paths below root sort between root + sep and root + the next character.
+        prefix = db_text(root.rstrip(os.sep) + os.sep)
+        upper = prefix[:-1] + chr(ord(os.sep) + 1)
+        with self.lock:
+            rows = self.conn.execute("SELECT path, mtime_ns FROM directories "
+                                     "WHERE path = ? OR (path >= ? AND path < ?)",
+                                     (db_text(root), prefix, upper)).fetchall()
+        return [(from_db_text(path), mtime_ns) for path, mtime_ns in rows]
+
+    def refresh_tree(self, root, category_rules, should_stop=None, sniffer=None):
+        # Rescan only the indexed directories under root whose mtime changed.
+        # Returns the number of directories that were rescanned.
+        refreshed = 0
+        for directory, mtime_ns in self.known_directories(root):
+            if should_stop is not None and should_stop():
+                break
+            try:
+                current = os.stat(directory).st_mtime_ns
+            except OSError:
+                self.forget(directory)
+                continue
+            if current == mtime_ns:
+                continue
+            try:
+                records = [f for batch in scan_directory(directory, category_rules, sniffer=sniffer) for f in batch]
+            except OSError:
+                continue
+            self.store(directory, current, records)
+            refreshed += 1
+        return refreshed
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def listing_signature(files):
+    # What a listing looks like on disk, to tell whether a rescan changed it
+    return {(f["name"], f["is_dir"], f["size"], f["created"], f["modified_ns"], f["sniffed"]) for f in files}
+
+
+class FileTile:
+    # A reusable file tile: the widgets are created once and re-pointed at a
+    # different file record whenever the tile is recycled
+    def __init__(self, frame, thumb_frame, icon_label, name_label, window):
+        self.frame = frame
+        self.thumb_frame = thumb_frame
+        self.icon_label = icon_label
+        self.name_label = name_label
+        self.window = window
+        self.file_info = None
+
+
+def extract_text_file(path):
+    # Plain text: UTF-16 when the file starts with its byte order mark,
+    # otherwise UTF-8. Returns None for files that look binary.
+    with open(path, "rb") as f:
+        data = f.read(CONTENT_MAX_BYTES)
+    if data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return data.decode("utf-16", errors="replace")
+    if b"\0" in data[:8192]:
+        return None
+    return data.decode("utf-8", errors="replace")
+
+
+def extract_office_text(path):
+    # Text of .docx/.xlsx/.pptx and OpenDocument files, which are zip archives
+    # of XML. Paragraph and cell ends become line breaks; other tags are
+    # dropped so words split across formatting runs stay whole.
+    parts = []
+    remaining = CONTENT_MAX_BYTES
+    with zipfile.ZipFile(path) as archive:
+        for name in archive.namelist():
+            if remaining <= 0:
+                break
+            if not OFFICE_TEXT_PARTS.fullmatch(name):
+                continue
+            with archive.open(name) as member:
+                xml = member.read(remaining).decode("utf-8", errors="replace")
+            remaining -= len(xml)
+            parts.append(html.unescape(re.sub(r"<[^>]*>", "", OFFICE_TEXT_BREAKS.sub("\n", xml))))
+    return "\n".join(parts)
+
+
+# Content extractors by file extension. Each returns the text of a file, or
+# None to leave it out of the index; add entries here to index more types.
+CONTENT_EXTRACTORS = {
+    ".txt": extract_text_file,
+    ".md": extract_text_file,
+    ".log": extract_text_file,
+    ".csv": extract_text_file,
+    ".tsv": extract_text_file,
+    ".docx": extract_office_text,
+    ".xlsx": extract_office_text,
+    ".pptx": extract_office_text,
+    ".odt": extract_office_text,
+    ".ods": extract_office_text,
+    ".odp": extract_office_text
+}
+
+
+class ContentIndex:
+    # Full-text index over file contents, in an FTS5 table of its own database
+    # since it can grow large. FTS5 turns each file's text into postings
+    # (porter-stemmed, case and accent folded) and search() ranks matches with
+    # BM25. Folders are indexed in the order they are queued on a background
+    # thread: files whose size and mtime_ns match the indexed copy are
+    # skipped, files that are gone are dropped, and writes are committed in
+    # batches.
+    def __init__(self, db_path=None):
+        if db_path is None:
+            db_path = os.path.join(user_cache_dir(), "content.db")
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL UNIQUE,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL
+            )""")
+        self.conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS contents "
+                          "USING fts5(body, tokenize = 'porter unicode61 remove_diacritics 2')")
+        self.conn.commit()
+        self.pending = []  # (path, size, mtime_ns, text) waiting to be written; size None removes path
+        self.pending_bytes = 0
+        self.last_commit = time.monotonic()
+        self.jobs = queue.Queue()
+        self.folder = None  # Folder being indexed
+        self.indexed = 0  # Files indexed since the index was opened
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def enqueue(self, folder, recursive=False):
+        # Index folder (and its subfolders when recursive) in the background
+        self.jobs.put((folder, recursive))
+
+    def status(self):
+        # (folder being indexed or None, files indexed so far, folders waiting)
+        return self.folder, self.indexed, self.jobs.qsize()
+
+    def _worker(self):
+        while True:
+            folder, recursive = self.jobs.get()
+            self.folder = folder
+            try:
+                self.index_folder(folder, recursive)
+            except Exception:
+                # A folder that can't be indexed must not stop the worker
+                pass
+            self.folder = None
+
+    def index_folder(self, folder, recursive=False, should_stop=None):
+        # Bring the index up to date for the files in folder, and below it
+        # when recursive. Returns the number of files (re)indexed. A stopped
+        # run keeps what it indexed but drops nothing.
+        known = self._known(folder, recursive)
+        seen = set()
+        indexed = 0
+        pending = [folder]
+        while pending:
+            if should_stop is not None and should_stop():
+                return indexed
+            try:
+                with os.scandir(pending.pop()) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if recursive:
+                                    pending.append(entry.path)
+                                continue
+                            extractor = CONTENT_EXTRACTORS.get(os.path.splitext(entry.name)[1].lower())
+                            if extractor is None or not entry.is_file(follow_symlinks=False):
+                                continue
+                            stats = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        seen.add(entry.path)
+                        if known.get(entry.path) == (stats.st_size, stats.st_mtime_ns):
+                            continue
+                        
+                        # A failing extractor only leaves that file's text out
+                        try:
+                            text = extractor(entry.path)
+                        except Exception:
+                            text = None
+                        try:
+                            self._put(entry.path, stats.st_size, stats.st_mtime_ns, text)
+                        except sqlite3.Error:
+                            # The batch is dropped; its files are indexed again next time
+                            continue
+                        indexed += 1
+            except OSError:
+                continue
+        
+        for path in known.keys() - seen:
+            self._put(path, None, None, None)
+        self.flush()
+        return indexed
+
+    def _known(self, folder, recursive):
+        # path -> (size, mtime_ns) of indexed files in folder (or below it)
+        folder = folder.rstrip(os.sep)
+        prefix = db_text(folder + os.sep)
+        upper = db_text(folder) + chr(ord(os.sep) + 1)
+        with self.lock:
+            rows = self.conn.execute("SELECT path, size, mtime_ns FROM documents WHERE path >= ? AND path < ?",
+                                     (prefix, upper)).fetchall()
+        known = {from_db_text(path): (size, mtime_ns) for path, size, mtime_ns in rows}
+        return {path: value for path, value in known.items()
+                if recursive or os.path.dirname(path).rstrip(os.sep) == folder}
+
+    def _put(self, path, size, mtime_ns, text):
+        with self.lock:
+            self.pending.append((path, size, mtime_ns, text))
+            if text:
+                self.pending_bytes += len(text)
+            if size is not None:
+                self.indexed += 1
+            if (len(self.pending) >= CONTENT_INDEX_BATCH or self.pending_bytes >= CONTENT_INDEX_BATCH_BYTES
+                    or time.monotonic() - self.last_commit >= CONTENT_INDEX_COMMIT_INTERVAL):
+                self._commit()
+
+    @staticmethod
+    def match_expression(query):
+        # FTS5 query for files containing every word of query. The last word
+        # also matches as a prefix, so results keep up with a word being typed.
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return None
+        return " ".join(f'"{term}"' for term in terms) + "*"
+
+    def search(self, query, limit=CONTENT_SEARCH_LIMIT):
+        # Returns [(path, score)] best BM25 score (lowest) first. Snippets are
+        # left to snippet(): building one re-tokenizes the whole file, which
+        # costs far more than ranking.
+        match = self.match_expression(query)
+        if match is None:
+            return []
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute("SELECT d.path, m.rank FROM (SELECT rowid, rank FROM contents WHERE contents MATCH ? "
+                                "ORDER BY rank LIMIT ?) m JOIN documents d ON d.id = m.rowid ORDER BY m.rank",
+                                (match, limit)).fetchall()
+        finally:
+            conn.close()
+        return [(from_db_text(path), score) for path, score in rows]
+
+    def snippet(self, path, query):
+        # The passage of path's text that best matches query, matches in
+        # [brackets], or None
+        match = self.match_expression(query)
+        if match is None:
+            return None
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute("SELECT snippet(contents, 0, '[', ']', '...', 24) FROM contents "
+                               "WHERE contents MATCH ? AND rowid = (SELECT id FROM documents WHERE path = ?)",
+                               (match, db_text(path))).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def flush(self):
+        with self.lock:
+            self._commit()
+
+    def close(self):
+        with self.lock:
+            self._commit()
+            self.conn.close()
+
+    def _commit(self):
+        self.last_commit = time.monotonic()
+        if not self.pending:
+            return
+        pending = self.pending
+        self.pending = []
+        self.pending_bytes = 0
+        
+        # A batch that fails is dropped rather than retried on every commit
+        try:
+            for path, size, mtime_ns, text in pending:
+                path = db_text(path)
+                row = self.conn.execute("SELECT id FROM documents WHERE path = ?", (path,)).fetchone()
+                if row is not None:
+                    self.conn.execute("DELETE FROM contents WHERE rowid = ?", row)
+                    if size is None:
+                        self.conn.execute("DELETE FROM documents WHERE id = ?", row)
+                        continue
+                    document_id = row[0]
+                    self.conn.execute("UPDATE documents SET size = ?, mtime_ns = ? WHERE id = ?",
+                                      (size, mtime_ns, document_id))
+                elif size is None:
+                    continue
+                else:
+                    document_id = self.conn.execute("INSERT INTO documents (path, size, mtime_ns) VALUES (?, ?, ?)",
+                                                    (path, size, mtime_ns)).lastrowid
+                
+                # Files without text are still recorded, so they aren't read again until they change
+                if text:
+                    self.conn.execute("INSERT INTO contents (rowid, body) VALUES (?, ?)", (document_id, text))
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+
+
 class FileOrganizerApp:
     def __init__(self, root):
         self.root = root
@@ -54,29 +1148,38 @@ class FileOrganizerApp:
         self.current_theme = "light"
         self.selected_file = None  # Initialize selected_file
         self.cancel_operation = False  # Flag for cancelling operations
-        self.thumbnail_cache = {}  # Cache for thumbnails
-        
-        # File categories with extensions
-        self.file_categories = {
-            "Images": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".webp"],
-            "Videos": [".mp4", ".avi", ".mov", ".wmv", ".flv", ".mkv", ".webm"],
-            "Audio": [".mp3", ".wav", ".ogg", ".flac", ".aac", ".wma"],
-            "Documents": [".pdf", ".doc", ".docx", ".rtf", ".tex"],
-            "Spreadsheets": [".xls", ".xlsx", ".csv"],
-            "Presentations": [".ppt", ".pptx"],
-            "Text": [".txt", ".md", ".log"],
-            "Archives": [".zip", ".rar", ".7z", ".tar", ".gz", ".iso"],
-            "Executables": [".exe", ".msi", ".app"],
-            "OneNote": [".one", ".onetoc2"],
-            "Others": []
-        }
+        self.organize_move = tk.BooleanVar(value=False)  # Move files when organizing instead of copying
+        self.organize_verify = tk.BooleanVar(value=False)  # Compare content, not just size and date, of existing targets
+        self.search_prefix = tk.BooleanVar(value=False)  # Match names starting with the query instead of containing it
+        self.thumbnail_cache = ThumbnailCache()  # Memory-bounded LRU of thumbnails
+        self.thumbnail_store = self.open_thumbnail_store()
+        self.hash_cache = self.open_hash_cache()
+        self.metadata_index = self.open_metadata_index()
+        self.content_index = self.open_content_index()
+        self.thumbnail_loader = ThumbnailLoader(self.root, self.on_thumbnails_ready, self.thumbnail_store)
+        self.sniffer = ContentSniffer()  # Categorizes files by content when the name doesn't tell
+        
+        # File categories, from the user's rule file or the default rules
+        try:
+            self.category_rules = load_category_rules()
+        except (OSError, ValueError) as e:
+            messagebox.showwarning("Category Rules", f"Could not load {category_rules_path()}: {e}\n"
+                                                     f"Using the default categories.")
+            self.category_rules = CategoryRules(parse_category_rules(DEFAULT_CATEGORY_RULES))
+        self.watcher = DirectoryWatcher(self.root, self.on_directory_changes, self.on_watch_overflow,
+                                        self.category_rules, self.sniffer)
         
         # Current directory and files
         self.current_dir = os.path.expanduser("~")
         self.files = []
+        self.listing = FileListing(self.files)
         self.filtered_files = []
         self.current_category = "All"
         self.current_sort = "Name (A-Z)"
+        self.load_generation = 0  # Incremented on every load to drop stale scans
+        self.search_query = None  # Set while the grid shows search results instead of current_dir
+        self._search_after = None
+        self._last_batch_display = 0.0
         
         # Apply theme
         self.apply_theme()
@@ -167,9 +1270,29 @@ class FileOrganizerApp:
         self.path_label = ttk.Label(self.top_bar, text=self.current_dir, style="Path.TLabel")
         self.path_label.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 16))
         
+        # Filename search across every indexed folder
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(self.top_bar, textvariable=self.search_var, width=24)
+        self.search_entry.pack(side=tk.LEFT, padx=(0, 8))
+        self.search_entry.bind("<KeyRelease>", self.on_search_key)
+        self.search_entry.bind("<Return>", self.run_search)
+        self.search_entry.bind("<Escape>", self.clear_search)
+        self.search_prefix_check = ttk.Checkbutton(self.top_bar, text="Starts with", variable=self.search_prefix,
+                                                   command=self.run_search)
+        self.search_prefix_check.pack(side=tk.LEFT, padx=(0, 16))
+        
         # Browse button
         self.browse_button = ttk.Button(self.top_bar, text="Browse", command=self.browse_directory)
-        self.browse_button.pack(side=tk.LEFT, padx=(0, 16))
+        self.browse_button.pack(side=tk.LEFT, padx=(0, 8))
+        
+        # Search a folder tree for files with identical content
+        self.duplicates_button = ttk.Button(self.top_bar, text="Find Duplicates...", command=self.find_duplicates)
+        self.duplicates_button.pack(side=tk.LEFT, padx=(0, 8))
+        
+        # Search inside files indexed by the content index
+        self.content_search_button = ttk.Button(self.top_bar, text="Search Contents...",
+                                                command=self.show_content_search)
+        self.content_search_button.pack(side=tk.LEFT, padx=(0, 16))
         
         # Theme toggle - Modern icon-only button
         theme_icon = "🌙" if self.current_theme == "light" else "☀️"
@@ -192,7 +1315,7 @@ class FileOrganizerApp:
         self.create_category_button("All", True)
         
         # Add file categories
-        for category in self.file_categories:
+        for category in self.category_rules.categories:
             self.create_category_button(category)
         
         # Main content area
@@ -206,7 +1329,7 @@ class FileOrganizerApp:
         # Sort options
         ttk.Label(self.controls_bar, text="Sort by:").pack(side=tk.LEFT, padx=(0, 8))
         
-        self.sort_options = ["Name (A-Z)", "Name (Z-A)", "Date (Newest)", "Date (Oldest)", "Size (Largest)", "Size (Smallest)"]
+        self.sort_options = list(SORT_OPTIONS)
         self.sort_var = tk.StringVar(value=self.sort_options[0])
         self.sort_combo = ttk.Combobox(self.controls_bar, textvariable=self.sort_var, values=self.sort_options, state="readonly", width=15)
         self.sort_combo.pack(side=tk.LEFT, padx=(0, 16))
@@ -221,6 +1344,24 @@ class FileOrganizerApp:
                                                  command=self.organize_by_type, style="Success.TButton")
         self.organize_by_type_button.pack(side=tk.RIGHT)
         
+        # Undo the last organize run into a folder
+        self.undo_organize_button = ttk.Button(self.controls_bar, text="Undo Organize...",
+                                               command=self.undo_organization)
+        self.undo_organize_button.pack(side=tk.RIGHT, padx=(0, 8))
+        
+        # Run a previously saved organize plan
+        self.open_plan_button = ttk.Button(self.controls_bar, text="Run Plan...", command=self.open_saved_plan)
+        self.open_plan_button.pack(side=tk.RIGHT, padx=(0, 8))
+        
+        # Move instead of copy when organizing
+        self.organize_move_check = ttk.Checkbutton(self.controls_bar, text="Move files", variable=self.organize_move)
+        self.organize_move_check.pack(side=tk.RIGHT, padx=(0, 8))
+        
+        # Check file contents when deciding whether an existing target is up to date
+        self.organize_verify_check = ttk.Checkbutton(self.controls_bar, text="Verify content",
+                                                     variable=self.organize_verify)
+        self.organize_verify_check.pack(side=tk.RIGHT, padx=(0, 8))
+        
         # Files display area (scrollable)
         self.files_canvas = tk.Canvas(self.content_area, bg=self.themes[self.current_theme]["background"], 
                                      highlightthickness=0)
@@ -229,12 +1370,17 @@ class FileOrganizerApp:
         # Scrollbar
         self.scrollbar = ttk.Scrollbar(self.content_area, orient=tk.VERTICAL, command=self.files_canvas.yview)
         self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.files_canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.files_canvas.configure(yscrollcommand=self.on_canvas_scroll)
         
-        # Frame for files inside canvas
+        # Frame inside the canvas, used for the empty folder message
         self.files_frame = ttk.Frame(self.files_canvas)
         self.files_canvas_window = self.files_canvas.create_window((0, 0), window=self.files_frame, anchor=tk.NW)
         
+        # Recycled file tiles: index in filtered_files -> tile, plus unused tiles
+        self.visible_tiles = {}
+        self.free_tiles = []
+        self.grid_cols = 1
+        
         # Configure canvas scrolling
         self.files_frame.bind("<Configure>", self.on_frame_configure)
         self.files_canvas.bind("<Configure>", self.on_canvas_configure)
@@ -275,27 +1421,10 @@ class FileOrganizerApp:
         frame.bind("<Button-1>", lambda e, cat=category: self.select_category(cat))
         
         # Add category icon based on category name
-        icon_text = "📁"  # Default folder icon
-        if category == "Images":
-            icon_text = "🖼️"
-        elif category == "Videos":
-            icon_text = "🎬"
-        elif category == "Audio":
-            icon_text = "🎵"
-        elif category == "Documents":
-            icon_text = "📝"
-        elif category == "Spreadsheets":
-            icon_text = "📊"
-        elif category == "Presentations":
-            icon_text = "📊"
-        elif category == "Text":
-            icon_text = "📄"
-        elif category == "Archives":
-            icon_text = "📦"
-        elif category == "Executables":
-            icon_text = "⚙️"
-        elif category == "All":
+        if category == "All":
             icon_text = "🏠"
+        else:
+            icon_text = CATEGORY_ICONS.get(category, "📁")  # Default folder icon
         
         icon_label = tk.Label(frame, text=icon_text, bg=theme["background"], fg=theme["primary"])
         icon_label.pack(side=tk.LEFT, padx=(8, 4))
@@ -337,107 +1466,278 @@ class FileOrganizerApp:
         self.update_status(f"Sorted by: {self.current_sort}")
 
     def filter_and_sort_files(self):
-        # Filter files by category
-        if self.current_category == "All":
-            self.filtered_files = self.files.copy()
-        else:
-            extensions = self.file_categories.get(self.current_category, [])
-            if extensions:  # If specific extensions are defined
-                self.filtered_files = [f for f in self.files if os.path.splitext(f["name"])[1].lower() in extensions]
-            else:  # For "Others" category or any without specific extensions
-                all_extensions = []
-                for exts in self.file_categories.values():
-                    all_extensions.extend(exts)
-                self.filtered_files = [f for f in self.files if os.path.splitext(f["name"])[1].lower() not in all_extensions]
-        
-        # Sort files
-        if self.current_sort == "Name (A-Z)":
-            self.filtered_files.sort(key=lambda x: x["name"].lower())
-        elif self.current_sort == "Name (Z-A)":
-            self.filtered_files.sort(key=lambda x: x["name"].lower(), reverse=True)
-        elif self.current_sort == "Date (Newest)":
-            self.filtered_files.sort(key=lambda x: x["modified"], reverse=True)
-        elif self.current_sort == "Date (Oldest)":
-            self.filtered_files.sort(key=lambda x: x["modified"])
-        elif self.current_sort == "Size (Largest)":
-            self.filtered_files.sort(key=lambda x: x["size"], reverse=True)
-        elif self.current_sort == "Size (Smallest)":
-            self.filtered_files.sort(key=lambda x: x["size"])
+        # Filtered and sorted views are cached by the listing until it changes
+        self.filtered_files = self.listing.view(self.current_category, self.current_sort)
 
     def load_directory(self, directory):
-        # Update current directory
+        # Release the thumbnails of the folder we are leaving; they can be
+        # reloaded cheaply from the on-disk store if we come back
+        if directory != self.current_dir:
+            self.thumbnail_cache.drop_folder(self.current_dir)
+        
+        # Update current directory, leaving search results if they are shown
         self.current_dir = directory
         self.path_label.config(text=directory)
+        self.search_query = None
+        self.search_var.set("")
         
         # Clear existing files
         self.files = []
+        self.listing = FileListing(self.files)
+        self.filtered_files = []
+        
+        # Invalidate any scan that is still running for the previous directory
+        self.load_generation += 1
+        
+        # Watch the new directory so later changes are applied incrementally
+        self.watcher.watch(directory)
+        self._last_batch_display = 0.0
         
         # Show loading status
         self.update_status("Loading files...")
         
         # Use threading to prevent UI freeze during loading
-        threading.Thread(target=self._load_directory_thread, args=(directory,), daemon=True).start()
+        threading.Thread(target=self._load_directory_thread, args=(directory, self.load_generation), daemon=True).start()
 
-    def _load_directory_thread(self, directory):
+    def _load_directory_thread(self, directory, generation):
         try:
-            # Get all files in directory
-            for item in os.listdir(directory):
-                item_path = os.path.join(directory, item)
+            # Stat the directory before listing it, so changes made while we
+            # scan leave the index looking stale rather than fresh
+            mtime_ns = os.stat(directory).st_mtime_ns
+            
+            # Paint straight from the index if we have seen this folder before
+            cached = None
+            if self.metadata_index is not None:
+                try:
+                    cached = self.metadata_index.load(directory, self.category_rules)
+                except sqlite3.Error:
+                    pass  # Scan the directory as if it had never been indexed
+            
+            if cached is not None:
+                indexed_mtime_ns, cached_files = cached
+                self.root.after(0, lambda: self._replace_files(generation, cached_files, False))
                 
-                # Skip hidden files
-                if item.startswith('.'):
-                    continue
+                # Reconcile with the directory on disk. Even with an unchanged
+                # folder mtime, files edited in place have new sizes and mtimes.
+                files = [f for batch in scan_directory(directory, self.category_rules, sniffer=self.sniffer)
+                         for f in batch]
+                if generation != self.load_generation:
+                    return
+                if listing_signature(files) != listing_signature(cached_files):
+                    self.root.after(0, lambda: self._replace_files(generation, files, True))
+                    self._store_index(directory, mtime_ns, files)
+                else:
+                    self.root.after(0, lambda: self._replace_files(generation, None, True))
+                    if indexed_mtime_ns != mtime_ns:
+                        self._store_index(directory, mtime_ns, files)
+            else:
+                # Stream the directory and hand each batch to the UI thread
+                files = []
+                for batch in scan_directory(directory, self.category_rules, sniffer=self.sniffer):
+                    # Stop early if the user navigated somewhere else
+                    if generation != self.load_generation:
+                        return
+                    files.extend(batch)
+                    self.root.after(0, lambda b=batch: self._add_file_batch(generation, b, False))
                 
-                # Get file info
-                if os.path.isfile(item_path):
-                    stats = os.stat(item_path)
-                    file_info = {
-                        "name": item,
-                        "path": item_path,
-                        "size": stats.st_size,
-                        "created": stats.st_ctime,
-                        "modified": stats.st_mtime,
-                        "is_dir": False
-                    }
-                    self.files.append(file_info)
-                else:  # Directory
-                    stats = os.stat(item_path)
-                    dir_info = {
-                        "name": item,
-                        "path": item_path,
-                        "size": 0,  # Directories show as 0 size
-                        "created": stats.st_ctime,
-                        "modified": stats.st_mtime,
-                        "is_dir": True
-                    }
-                    self.files.append(dir_info)
+                # Final update once the whole directory has been read
+                self.root.after(0, lambda: self._add_file_batch(generation, [], True))
+                if self.metadata_index is not None:
+                    self._store_index(directory, mtime_ns, files)
             
-            # Filter and sort files
-            self.filter_and_sort_files()
+            # Index the text of the folder's files in the background
+            if self.content_index is not None:
+                self.content_index.enqueue(directory)
             
-            # Update UI in main thread
-            self.root.after(0, self.display_files)
-            self.root.after(0, lambda: self.update_status(f"Loaded {len(self.files)} items"))
-            self.root.after(0, lambda: self.file_count_label.config(text=f"{len(self.filtered_files)} items"))
+            # Bring already indexed subfolders up to date so navigating into
+            # them paints current data
+            if self.metadata_index is not None:
+                try:
+                    self.metadata_index.refresh_tree(directory, self.category_rules,
+                                                     lambda: generation != self.load_generation, self.sniffer)
+                except sqlite3.Error:
+                    pass
             
         except Exception as e:
             self.root.after(0, lambda: self.update_status(f"Error: {str(e)}"))
 
+    def _store_index(self, directory, mtime_ns, files):
+        # The listing is already shown; failing to cache it only costs a
+        # full scan next time
+        try:
+            self.metadata_index.store(directory, mtime_ns, files)
+        except sqlite3.Error:
+            pass
+
+    def _replace_files(self, generation, files, done):
+        # Swap in a complete listing (from the index or a background rescan).
+        # files is None when a rescan found the painted listing up to date.
+        if generation != self.load_generation:
+            return
+        
+        if files is not None:
+            self.files = files
+            self.listing = FileListing(files)
+            self.filter_and_sort_files()
+            self.display_files()
+            self.file_count_label.config(text=f"{len(self.filtered_files)} items")
+        
+        if done:
+            self.update_status(f"Loaded {len(self.files)} items")
+        else:
+            self.update_status(f"Loaded {len(self.files)} items from index, checking for changes...")
+
+    def _add_file_batch(self, generation, batch, done):
+        # Ignore batches from a scan that has been superseded
+        if generation != self.load_generation:
+            return
+        
+        self.listing.extend(batch)
+        
+        # Redraw on the first batch, then at most a few times per second while
+        # the scan is running, and once more when it is finished
+        now = time.monotonic()
+        first = len(self.files) == len(batch)
+        if done or first or now - self._last_batch_display >= BATCH_DISPLAY_INTERVAL:
+            self._last_batch_display = now
+            self.filter_and_sort_files()
+            self.display_files()
+            self.file_count_label.config(text=f"{len(self.filtered_files)} items")
+        
+        if self.search_query is not None:
+            if not done:
+                self.update_status(f"Searching... {len(self.files)} matches")
+            elif len(self.files) >= SEARCH_MAX_RESULTS:
+                self.update_status(f"Showing the first {len(self.files)} matches for \"{self.search_query}\"")
+            else:
+                self.update_status(f"{len(self.files)} matches for \"{self.search_query}\"")
+        elif done:
+            self.update_status(f"Loaded {len(self.files)} items")
+        else:
+            self.update_status(f"Loading files... {len(self.files)} items")
+
+    def on_search_key(self, event):
+        # Search once typing pauses rather than on every keystroke
+        if event.keysym in ("Return", "Escape"):
+            return
+        if self._search_after is not None:
+            self.root.after_cancel(self._search_after)
+            self._search_after = None
+        if self.search_var.get().strip() != (self.search_query or ""):
+            self._search_after = self.root.after(SEARCH_DEBOUNCE_MS, self.run_search)
+
+    def clear_search(self, event=None):
+        if self.search_query is not None:
+            self.load_directory(self.current_dir)
+        else:
+            self.search_var.set("")
+
+    def run_search(self, event=None):
+        if self._search_after is not None:
+            self.root.after_cancel(self._search_after)
+            self._search_after = None
+        query = self.search_var.get().strip()
+        if not query:
+            if self.search_query is not None:
+                self.load_directory(self.current_dir)
+            return
+        if self.metadata_index is None:
+            self.update_status("Search is unavailable: the metadata index could not be opened")
+            return
+        
+        # Results replace the grid like a directory listing, streamed in batches
+        self.search_query = query
+        self.path_label.config(text=f"Search: \"{query}\" in indexed folders")
+        self.files = []
+        self.listing = FileListing(self.files)
+        self.filtered_files = []
+        self.load_generation += 1
+        self._last_batch_display = 0.0
+        self.update_status("Searching...")
+        threading.Thread(target=self._search_thread, args=(query, self.search_prefix.get(), self.load_generation),
+                         daemon=True).start()
+
+    def _search_thread(self, query, prefix, generation):
+        try:
+            for batch in self.metadata_index.search(query, self.category_rules, prefix,
+                                                    lambda: generation != self.load_generation):
+                self.root.after(0, lambda b=batch: self._add_file_batch(generation, b, False))
+            self.root.after(0, lambda: self._add_file_batch(generation, [], True))
+        except Exception as e:
+            self.root.after(0, lambda: self.update_status(f"Search failed: {str(e)}"))
+
+    def _update_index(self, directory, changes):
+        try:
+            self.metadata_index.update(directory, changes)
+        except sqlite3.Error:
+            pass  # The directory is rescanned on its next load anyway
+
+    def on_directory_changes(self, directory, changes):
+        # Apply created, deleted, renamed or modified entries reported by the
+        # watcher, to the index (off the Tk thread) and to the grid
+        if self.metadata_index is not None:
+            threading.Thread(target=self._update_index, args=(directory, changes), daemon=True).start()
+        if directory != self.current_dir or self.search_query is not None:
+            return
+        for path, record in changes:
+            self.thumbnail_cache.discard(path)
+            if record is None:
+                self.listing.remove(path)
+            else:
+                self.listing.add(record)
+        self.refresh_view()
+
+    def on_watch_overflow(self, directory):
+        # Too many events or the directory itself went away: fall back to a reload
+        if directory == self.current_dir and self.search_query is None:
+            self.load_directory(self.current_dir)
+
+    def remove_file_entry(self, file_info):
+        # Drop a file we just moved or deleted without rescanning the directory.
+        # Without a watcher, reload so other changes are picked up too. The
+        # file may be a search result from a folder nobody watches, so drop
+        # it from the index here as well.
+        if self.metadata_index is not None:
+            threading.Thread(target=self._update_index, args=(os.path.dirname(file_info["path"]),
+                                                              [(file_info["path"], None)]), daemon=True).start()
+        if not self.watcher.available and self.search_query is None:
+            self.load_directory(self.current_dir)
+            return
+        if self.listing.remove(file_info["path"]) is not None:
+            self.refresh_view()
+
+    def refresh_after_organize(self, destination, moved=False):
+        # The watcher reports new category folders and moved files itself;
+        # otherwise reload
+        if (destination == self.current_dir or moved) and not self.watcher.available:
+            self.load_directory(self.current_dir)
+
+    def refresh_view(self):
+        # Re-render after incremental listing edits; views are already up to date
+        self.filter_and_sort_files()
+        self.display_files()
+        self.file_count_label.config(text=f"{len(self.filtered_files)} items")
+
     def display_files(self):
-        # Clear existing files display
+        # Clear the empty folder message, if any
         for widget in self.files_frame.winfo_children():
             widget.destroy()
         
+        # Release all tiles so they get re-pointed at the new listing
+        for tile in self.visible_tiles.values():
+            self._park_tile(tile)
+        self.visible_tiles = {}
+        
         # Calculate grid layout based on canvas width
         canvas_width = self.files_canvas.winfo_width()
-        tile_width = 120
-        padding = 16
-        cols = max(1, (canvas_width - padding) // (tile_width + padding))
+        self.grid_cols = max(1, (canvas_width - TILE_PADDING) // (TILE_WIDTH + TILE_PADDING))
         
         theme = self.themes[self.current_theme]
         
         # Check if directory is empty
         if not self.filtered_files:
+            self.files_canvas.coords(self.files_canvas_window, 0, 0)
+            
             # Create empty folder message
             empty_frame = tk.Frame(self.files_frame, bg=theme["background"])
             empty_frame.pack(expand=True, fill=tk.BOTH, pady=50)
@@ -454,122 +1754,209 @@ class FileOrganizerApp:
                                     bg=theme["background"], fg=theme["text_secondary"])
             empty_subtext.pack(pady=(5, 20))
             
+            self.files_frame.update_idletasks()
+            self.files_canvas.config(scrollregion=self.files_canvas.bbox(self.files_canvas_window))
             return
         
-        # Create file tiles
-        row, col = 0, 0
+        # Move the (now empty) message frame out of the way of the tiles
+        self.files_canvas.coords(self.files_canvas_window, OFFSCREEN, OFFSCREEN)
         
-        for file_info in self.filtered_files:
-            # Create file tile frame with border
-            tile_frame = tk.Frame(self.files_frame, width=tile_width, height=150, 
-                                 bg=theme["card"], bd=1, relief=tk.SOLID, 
-                                 highlightbackground=theme["border"], highlightthickness=1)
-            tile_frame.grid(row=row, column=col, padx=padding//2, pady=padding//2, sticky="nsew")
-            tile_frame.pack_propagate(False)
-            
-            # Bind events
-            tile_frame.bind("<Button-1>", lambda e, f=file_info: self.select_file(f))
-            tile_frame.bind("<Double-Button-1>", lambda e, f=file_info: self.open_file(f))
-            tile_frame.bind("<Button-3>", lambda e, f=file_info: self.show_context_menu(e, f))
-            
-            # Add hover effect
-            tile_frame.bind("<Enter>", lambda e, frame=tile_frame, f=file_info: self.on_tile_hover(frame, f, True))
-            tile_frame.bind("<Leave>", lambda e, frame=tile_frame, f=file_info: self.on_tile_hover(frame, False))
-            
-            # File icon or thumbnail
-            if file_info["is_dir"]:
-                icon_label = tk.Label(tile_frame, text="📁", font=("Segoe UI", 32), bg=theme["card"], fg=theme["primary"])
-                icon_label.pack(pady=(16, 8))
-            else:
-                # Determine file type
-                ext = os.path.splitext(file_info["name"])[1].lower()
-                
-                # Check if it's an image or video for thumbnail
-                if ext in self.file_categories["Images"]:
-                    # Create a frame for the thumbnail
-                    thumb_frame = tk.Frame(tile_frame, width=80, height=80, bg=theme["card"])
-                    thumb_frame.pack(pady=(16, 8))
-                    thumb_frame.pack_propagate(False)
-                    
-                    # Try to load thumbnail
-                    try:
-                        # Check if thumbnail is in cache
-                        if file_info["path"] in self.thumbnail_cache:
-                            thumbnail = self.thumbnail_cache[file_info["path"]]
-                        else:
-                            # Generate thumbnail
-                            img = Image.open(file_info["path"])
-                            img.thumbnail((80, 80))
-                            thumbnail = ImageTk.PhotoImage(img)
-                            # Cache the thumbnail
-                            self.thumbnail_cache[file_info["path"]] = thumbnail
-                        
-                        # Display thumbnail
-                        thumb_label = tk.Label(thumb_frame, image=thumbnail, bg=theme["card"])
-                        thumb_label.image = thumbnail  # Keep a reference
-                        thumb_label.pack(fill=tk.BOTH, expand=True)
-                        
-                    except Exception:
-                        # If thumbnail generation fails, show default icon
-                        icon_label = tk.Label(thumb_frame, text="🖼️", font=("Segoe UI", 32), 
-                                             bg=theme["card"], fg=theme["text"])
-                        icon_label.pack(fill=tk.BOTH, expand=True)
-                
-                elif ext in self.file_categories["Videos"]:
-                    # For videos, just show a video icon for now
-                    # In a more advanced version, we could generate video thumbnails
-                    icon_label = tk.Label(tile_frame, text="🎬", font=("Segoe UI", 32), 
-                                         bg=theme["card"], fg=theme["text"])
-                    icon_label.pack(pady=(16, 8))
-                
-                else:
-                    # Set icon based on file type
-                    icon_text = "📄"  # Default file icon
-                    
-                    if ext in self.file_categories["Audio"]:
-                        icon_text = "🎵"
-                    elif ext in self.file_categories["Documents"]:
-                        icon_text = "📝"
-                    elif ext in self.file_categories["Spreadsheets"]:
-                        icon_text = "📊"
-                    elif ext in self.file_categories["Presentations"]:
-                        icon_text = "📊"
-                    elif ext in self.file_categories["Archives"]:
-                        icon_text = "📦"
-                    elif ext in self.file_categories["Executables"]:
-                        icon_text = "⚙️"
-                    
-                    icon_label = tk.Label(tile_frame, text=icon_text, font=("Segoe UI", 32), 
-                                         bg=theme["card"], fg=theme["text"])
-                    icon_label.pack(pady=(16, 8))
-            
-            # File name (truncated if too long)
-            name = file_info["name"]
-            display_name = name
-            if len(name) > 15:
-                display_name = name[:12] + "..."
-            
-            name_label = tk.Label(tile_frame, text=display_name, bg=theme["card"], fg=theme["text"], 
-                                 font=("Segoe UI", 9), wraplength=tile_width-10)
-            name_label.pack(pady=(0, 8))
-            
-            # Bind events to all elements
-            for widget in tile_frame.winfo_children():
-                widget.bind("<Button-1>", lambda e, f=file_info: self.select_file(f))
-                widget.bind("<Double-Button-1>", lambda e, f=file_info: self.open_file(f))
-                widget.bind("<Button-3>", lambda e, f=file_info: self.show_context_menu(e, f))
-                widget.bind("<Enter>", lambda e, frame=tile_frame, f=file_info: self.on_tile_hover(frame, f, True))
-                widget.bind("<Leave>", lambda e, frame=tile_frame, f=file_info: self.on_tile_hover(frame, False))
-            
-            # Update grid position
-            col += 1
-            if col >= cols:
-                col = 0
-                row += 1
+        # The scroll region covers every row, even though only a few exist as widgets
+        rows = (len(self.filtered_files) + self.grid_cols - 1) // self.grid_cols
+        self.files_canvas.config(scrollregion=(0, 0, canvas_width, rows * (TILE_HEIGHT + TILE_PADDING)))
         
-        # Update canvas scroll region
-        self.files_frame.update_idletasks()
-        self.files_canvas.config(scrollregion=self.files_canvas.bbox("all"))
+        self.render_visible_tiles()
+
+    def render_visible_tiles(self):
+        if not self.filtered_files:
+            return
+        
+        # Work out which rows intersect the viewport, plus overscan
+        row_height = TILE_HEIGHT + TILE_PADDING
+        top = self.files_canvas.canvasy(0)
+        bottom = top + self.files_canvas.winfo_height()
+        rows = (len(self.filtered_files) + self.grid_cols - 1) // self.grid_cols
+        first_row = max(0, int(top // row_height) - OVERSCAN_ROWS)
+        last_row = min(rows - 1, int(bottom // row_height) + OVERSCAN_ROWS)
+        first = first_row * self.grid_cols
+        last = min(len(self.filtered_files), (last_row + 1) * self.grid_cols)
+        
+        # Recycle tiles that scrolled out of range
+        for index in list(self.visible_tiles):
+            if index < first or index >= last:
+                tile = self.visible_tiles.pop(index)
+                self._park_tile(tile)
+                self.free_tiles.append(tile)
+        
+        # Fill the rows in range, reusing free tiles before creating new ones
+        for index in range(first, last):
+            if index in self.visible_tiles:
+                continue
+            tile = self.free_tiles.pop() if self.free_tiles else self._create_tile()
+            self._assign_tile(tile, self.filtered_files[index])
+            row, col = divmod(index, self.grid_cols)
+            self.files_canvas.coords(tile.window,
+                                     TILE_PADDING // 2 + col * (TILE_WIDTH + TILE_PADDING),
+                                     TILE_PADDING // 2 + row * row_height)
+            self.visible_tiles[index] = tile
+        
+        # Queue thumbnails for tiles still showing a placeholder: rows actually
+        # on screen first, then the overscan rows. Anything else is cancelled.
+        visible_first = int(top // row_height) * self.grid_cols
+        visible_last = (int(bottom // row_height) + 1) * self.grid_cols
+        requests = []
+        for index in range(first, last):
+            file_info = self.filtered_files[index]
+            if self.needs_thumbnail(file_info):
+                priority = 0 if visible_first <= index < visible_last else 1
+                requests.append((file_info, priority))
+        requests.sort(key=lambda r: r[1])
+        self.thumbnail_loader.request(requests)
+
+    def _create_tile(self):
+        theme = self.themes[self.current_theme]
+        
+        # Create file tile frame with border
+        tile_frame = tk.Frame(self.files_canvas, width=TILE_WIDTH, height=TILE_HEIGHT, 
+                             bg=theme["card"], bd=1, relief=tk.SOLID, 
+                             highlightbackground=theme["border"], highlightthickness=1)
+        tile_frame.pack_propagate(False)
+        
+        # Fixed-size holder for either an icon or a thumbnail
+        thumb_frame = tk.Frame(tile_frame, width=80, height=80, bg=theme["card"])
+        thumb_frame.pack(pady=(16, 8))
+        thumb_frame.pack_propagate(False)
+        
+        icon_label = tk.Label(thumb_frame, font=("Segoe UI", 32), bg=theme["card"], fg=theme["text"])
+        icon_label.pack(fill=tk.BOTH, expand=True)
+        
+        name_label = tk.Label(tile_frame, bg=theme["card"], fg=theme["text"], 
+                             font=("Segoe UI", 9), wraplength=TILE_WIDTH-10)
+        name_label.pack(pady=(0, 8))
+        
+        window = self.files_canvas.create_window(OFFSCREEN, OFFSCREEN, window=tile_frame, anchor=tk.NW)
+        tile = FileTile(tile_frame, thumb_frame, icon_label, name_label, window)
+        
+        # Bind events once; handlers look up whichever file the tile shows now
+        for widget in (tile_frame, thumb_frame, icon_label, name_label):
+            widget.bind("<Button-1>", lambda e, t=tile: self.select_file(t.file_info))
+            widget.bind("<Double-Button-1>", lambda e, t=tile: self.open_file(t.file_info))
+            widget.bind("<Button-3>", lambda e, t=tile: self.show_context_menu(e, t.file_info))
+            widget.bind("<Enter>", lambda e, t=tile: self.on_tile_hover(t.frame, t.file_info, True))
+            widget.bind("<Leave>", lambda e, t=tile: self.on_tile_hover(t.frame, None, False))
+        
+        return tile
+
+    def _assign_tile(self, tile, file_info):
+        theme = self.themes[self.current_theme]
+        tile.file_info = file_info
+        
+        # Reset colors in case the theme changed since the tile was created
+        tile.frame.config(bg=theme["card"], highlightbackground=theme["border"])
+        tile.thumb_frame.config(bg=theme["card"])
+        
+        # File icon or thumbnail
+        thumbnail = None
+        icon_text = self.get_file_icon(file_info)
+        icon_color = theme["primary"]
+        if not file_info["is_dir"]:
+            icon_color = theme["text"]
+            
+            # Use a cached thumbnail if there is one; otherwise the icon doubles
+            # as a placeholder until the background loader delivers it
+            if file_info["category"] == "Images":
+                thumbnail = self.thumbnail_cache.get(file_info["path"])
+        
+        if thumbnail is not None:
+            tile.icon_label.config(image=thumbnail, text="", bg=theme["card"])
+            tile.icon_label.image = thumbnail  # Keep a reference
+        else:
+            tile.icon_label.config(image="", text=icon_text, bg=theme["card"], fg=icon_color)
+            tile.icon_label.image = None
+        
+        # File name (truncated if too long)
+        name = file_info["name"]
+        display_name = name
+        if len(name) > 15:
+            display_name = name[:12] + "..."
+        tile.name_label.config(text=display_name, bg=theme["card"], fg=theme["text"])
+
+    def open_metadata_index(self):
+        # Directory listings persist across restarts when the cache directory is usable
+        try:
+            index = MetadataIndex()
+        except (OSError, sqlite3.Error):
+            return None
+        atexit.register(index.close)
+        return index
+
+    def open_thumbnail_store(self):
+        # Thumbnails persist across restarts when the cache directory is usable
+        try:
+            store = ThumbnailStore()
+        except (OSError, sqlite3.Error):
+            return None
+        atexit.register(store.close)
+        return store
+
+    def open_content_index(self):
+        # File contents are searchable when the cache directory is usable and
+        # SQLite has FTS5
+        try:
+            index = ContentIndex()
+        except (OSError, sqlite3.Error):
+            return None
+        atexit.register(index.close)
+        return index
+
+    def open_hash_cache(self):
+        # Content hashes persist across restarts when the cache directory is usable
+        try:
+            cache = HashCache()
+        except (OSError, sqlite3.Error):
+            return None
+        atexit.register(cache.close)
+        return cache
+
+    def flush_hash_cache(self):
+        # Write hashes out once a search or plan is done, in case the app is killed
+        if self.hash_cache is not None:
+            try:
+                self.hash_cache.flush()
+            except sqlite3.Error:
+                pass
+
+    def needs_thumbnail(self, file_info):
+        if file_info["is_dir"] or file_info["path"] in self.thumbnail_cache:
+            return False
+        return file_info["category"] == "Images"
+
+    def on_thumbnails_ready(self, results):
+        # PhotoImage objects must be created on the Tk thread
+        ready = {}
+        for path, image in results:
+            # If thumbnail generation failed, cache None so the default icon stays
+            ready[path] = ImageTk.PhotoImage(image) if image is not None else None
+            self.thumbnail_cache.put(path, ready[path])
+        
+        # Swap the thumbnails into whichever tiles currently show those files
+        for tile in self.visible_tiles.values():
+            if tile.file_info is not None and tile.file_info["path"] in ready:
+                thumbnail = ready[tile.file_info["path"]]
+                if thumbnail is not None and tile.icon_label.image is not thumbnail:
+                    tile.icon_label.config(image=thumbnail, text="")
+                    tile.icon_label.image = thumbnail  # Keep a reference
+
+    def _park_tile(self, tile):
+        # Move an unused tile outside the scroll region instead of destroying it
+        self.files_canvas.coords(tile.window, OFFSCREEN, OFFSCREEN)
+        tile.file_info = None
+
+    def get_file_icon(self, file_info):
+        # Set icon based on file type
+        if file_info["is_dir"]:
+            return "📁"
+        return CATEGORY_ICONS.get(file_info["category"], "📄")  # Default file icon
 
     def on_tile_hover(self, frame, file_info=None, is_hover=True):
         theme = self.themes[self.current_theme]
@@ -600,8 +1987,15 @@ class FileOrganizerApp:
             self.tooltip.place_forget()
 
     def on_frame_configure(self, event):
-        # Update the scrollregion to encompass the inner frame
-        self.files_canvas.configure(scrollregion=self.files_canvas.bbox("all"))
+        # Only the empty folder message lives in the inner frame; tile rows set
+        # their own scroll region in display_files
+        if not self.filtered_files:
+            self.files_canvas.configure(scrollregion=self.files_canvas.bbox(self.files_canvas_window))
+
+    def on_canvas_scroll(self, first, last):
+        # Called by the canvas whenever its view moves, whatever the cause
+        self.scrollbar.set(first, last)
+        self.render_visible_tiles()
 
     def on_canvas_configure(self, event):
         # Update the width of the window to fill the canvas
@@ -623,6 +2017,10 @@ class FileOrganizerApp:
             self.load_directory(directory)
 
     def go_back(self):
+        # From search results, back returns to the folder being browsed
+        if self.search_query is not None:
+            self.load_directory(self.current_dir)
+            return
         parent_dir = os.path.dirname(self.current_dir)
         if parent_dir != self.current_dir:  # Avoid going back from root
             self.load_directory(parent_dir)
@@ -704,28 +2102,7 @@ class FileOrganizerApp:
         content_frame.pack(fill=tk.BOTH, expand=True)
         
         # File icon
-        if file_info["is_dir"]:
-            icon_text = "📁"
-        else:
-            ext = os.path.splitext(file_info["name"])[1].lower()
-            icon_text = "📄"  # Default
-            
-            if ext in self.file_categories["Images"]:
-                icon_text = "🖼️"
-            elif ext in self.file_categories["Videos"]:
-                icon_text = "🎬"
-            elif ext in self.file_categories["Audio"]:
-                icon_text = "🎵"
-            elif ext in self.file_categories["Documents"]:
-                icon_text = "📝"
-            elif ext in self.file_categories["Spreadsheets"]:
-                icon_text = "📊"
-            elif ext in self.file_categories["Presentations"]:
-                icon_text = "📊"
-            elif ext in self.file_categories["Archives"]:
-                icon_text = "📦"
-            elif ext in self.file_categories["Executables"]:
-                icon_text = "⚙️"
+        icon_text = self.get_file_icon(file_info)
         
         icon_label = tk.Label(content_frame, text=icon_text, font=("Segoe UI", 48),
                             bg=theme["background"], fg=theme["primary"])
@@ -815,11 +2192,12 @@ class FileOrganizerApp:
                     return
             
             if file_info["is_dir"]:
-                shutil.copytree(file_info["path"], dest_path)
+                shutil.copytree(file_info["path"], dest_path, copy_function=fast_copy)
+                strategy = "tree"
             else:
-                shutil.copy2(file_info["path"], dest_path)
+                strategy = fast_copy(file_info["path"], dest_path)
             
-            self.update_status(f"Copied {file_info['name']} to {destination}")
+            self.update_status(f"Copied {file_info['name']} to {destination} ({strategy})")
             messagebox.showinfo("Success", f"File copied successfully to {destination}")
         except Exception as e:
             messagebox.showerror("Error", f"Could not copy file: {str(e)}")
@@ -853,8 +2231,8 @@ class FileOrganizerApp:
             self.update_status(f"Moved {file_info['name']} to {destination}")
             messagebox.showinfo("Success", f"File moved successfully to {destination}")
             
-            # Refresh current directory
-            self.load_directory(self.current_dir)
+            # Drop the moved file from the current listing
+            self.remove_file_entry(file_info)
         except Exception as e:
             messagebox.showerror("Error", f"Could not move file: {str(e)}")
 
@@ -878,8 +2256,8 @@ class FileOrganizerApp:
             
             self.update_status(f"Deleted {file_info['name']}")
             
-            # Refresh current directory
-            self.load_directory(self.current_dir)
+            # Drop the deleted file from the current listing
+            self.remove_file_entry(file_info)
         except Exception as e:
             messagebox.showerror("Error", f"Could not delete file: {str(e)}")
 
@@ -899,140 +2277,401 @@ class FileOrganizerApp:
         except Exception as e:
             messagebox.showerror("Error", f"Could not locate file: {str(e)}")
 
-    def organize_by_date(self):
-        # Ask for destination
-        destination = filedialog.askdirectory(title="Select Destination Folder (leave empty to organize in place)")
-        if destination == "":
-            destination = self.current_dir
-        
-        # Confirm organization
-        if not messagebox.askyesno("Confirm Organization", 
-                                  f"Are you sure you want to organize files by date in {destination}?"):
+    def find_duplicates(self):
+        folder = filedialog.askdirectory(title="Select a Folder to Search for Duplicates", initialdir=self.current_dir)
+        if not folder:
             return
+        theme = self.themes[self.current_theme]
+        finder = DuplicateFinder(hash_cache=self.hash_cache)
         
-        # Organize files
-        try:
-            self.update_status("Organizing files by date...")
-            self.cancel_operation = False
-            
-            # Create progress window
-            progress_window = tk.Toplevel(self.root)
-            progress_window.title("Organizing Files")
-            progress_window.geometry("400x150")
-            progress_window.resizable(False, False)
-            
-            # Apply theme
-            theme = self.themes[self.current_theme]
-            progress_window.configure(bg=theme["background"])
-            
-            # Progress label
-            progress_label = tk.Label(progress_window, text="Organizing files...", font=("Segoe UI", 11),
-                                    bg=theme["background"], fg=theme["text"])
-            progress_label.pack(pady=(20, 10))
-            
-            # Progress bar
-            progress_frame = tk.Frame(progress_window, bg=theme["background"])
-            progress_frame.pack(fill=tk.X, padx=20)
-            
-            progress_bar = ttk.Progressbar(progress_frame, orient=tk.HORIZONTAL, length=350, mode="determinate",
-                                         style="Horizontal.TProgressbar")
-            progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
-            
-            # Button frame
-            button_frame = tk.Frame(progress_window, bg=theme["background"], pady=15)
-            button_frame.pack(fill=tk.X)
-            
-            # Cancel button
-            cancel_button = tk.Button(button_frame, text="Cancel", font=("Segoe UI", 10),
-                                    bg=theme["danger"], fg="white", bd=0, padx=15, pady=5,
-                                    command=lambda: self.cancel_organization(progress_window))
-            cancel_button.pack()
-            
-            # Start organizing in a separate thread
-            threading.Thread(target=self._organize_by_date_thread, 
-                            args=(destination, progress_window, progress_label, progress_bar), 
-                            daemon=True).start()
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not organize files: {str(e)}")
+        # Progress window, polled like the organize progress
+        progress_window = tk.Toplevel(self.root)
+        progress_window.title("Finding Duplicates")
+        progress_window.geometry("400x150")
+        progress_window.resizable(False, False)
+        progress_window.configure(bg=theme["background"])
+        
+        progress_label = tk.Label(progress_window, text="Scanning...", font=("Segoe UI", 11),
+                                bg=theme["background"], fg=theme["text"])
+        progress_label.pack(pady=(20, 10))
+        
+        progress_bar = ttk.Progressbar(progress_window, orient=tk.HORIZONTAL, length=350, mode="determinate",
+                                     style="Horizontal.TProgressbar")
+        progress_bar.pack(padx=20)
+        
+        def cancel():
+            finder.cancel()
+            progress_window.destroy()
+            self.update_status("Duplicate search cancelled")
+        
+        button_frame = tk.Frame(progress_window, bg=theme["background"], pady=15)
+        button_frame.pack(fill=tk.X)
+        tk.Button(button_frame, text="Cancel", font=("Segoe UI", 10), bg=theme["danger"], fg="white",
+                bd=0, padx=15, pady=5, command=cancel).pack()
+        
+        self.update_status(f"Searching {folder} for duplicates...")
+        threading.Thread(target=self._find_duplicates_thread, args=(folder, finder, progress_window),
+                         daemon=True).start()
+        self.poll_duplicate_search(finder, progress_window, progress_label, progress_bar)
 
-    def cancel_organization(self, progress_window):
-        self.cancel_operation = True
-        self.update_status("Organization cancelled")
-        progress_window.destroy()
+    def poll_duplicate_search(self, finder, progress_window, progress_label, progress_bar):
+        if not progress_window.winfo_exists():
+            return
+        stage, files, hashed, to_hash, bytes_read, finished = finder.snapshot()
+        if stage == "Scanning":
+            progress_label.config(text=f"Scanning: {files} files")
+        else:
+            progress_label.config(text=f"{stage}: {hashed}/{to_hash} files\n"
+                                       f"{self.format_size(bytes_read)} read")
+        progress_bar.config(maximum=max(to_hash, 1), value=hashed)
+        if not finished:
+            self.root.after(PROGRESS_POLL_MS, self.poll_duplicate_search, finder, progress_window,
+                            progress_label, progress_bar)
 
-    def _organize_by_date_thread(self, destination, progress_window, progress_label, progress_bar):
+    def _find_duplicates_thread(self, folder, finder, progress_window):
         try:
-            # Get files to organize
-            files_to_organize = [f for f in self.files if not f["is_dir"]]
-            total_files = len(files_to_organize)
-            
-            # Update progress bar
-            progress_bar["maximum"] = total_files
-            
-            # Organize files by date
-            for i, file_info in enumerate(files_to_organize):
-                # Check if operation was cancelled
-                if self.cancel_operation:
-                    return
-                
-                # Get file date
-                file_date = datetime.datetime.fromtimestamp(file_info["modified"])
-                date_folder = file_date.strftime("%Y-%m-%d")
-                
-                # Create date folder
-                date_path = os.path.join(destination, date_folder)
-                os.makedirs(date_path, exist_ok=True)
-                
-                # Copy file to date folder
-                dest_path = os.path.join(date_path, file_info["name"])
-                
-                # Skip if destination already exists
-                if os.path.exists(dest_path):
-                    continue
-                
-                # Copy file
-                shutil.copy2(file_info["path"], dest_path)
-                
-                # Update progress
-                self.root.after(0, lambda i=i, name=file_info["name"]: 
-                               progress_label.config(text=f"Organizing {i+1}/{total_files}: {name}"))
-                self.root.after(0, lambda i=i: progress_bar.step(1))
-                
-                # Small delay to make cancellation more responsive
-                time.sleep(0.01)
-            
-            # Close progress window
+            groups = finder.find(walk_files(folder))
+            self.flush_hash_cache()
+            if finder.cancelled:
+                return
             self.root.after(0, progress_window.destroy)
-            
-            # Show success message
-            self.root.after(0, lambda: messagebox.showinfo("Success", f"Files organized by date in {destination}"))
-            
-            # Refresh if organizing in current directory
-            if destination == self.current_dir:
-                self.root.after(0, lambda: self.load_directory(self.current_dir))
-            
-            # Update status
-            self.root.after(0, lambda: self.update_status(f"Organized {total_files} files by date"))
-            
+            self.root.after(0, lambda: self.show_duplicates(folder, finder, groups))
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", f"Could not organize files: {str(e)}"))
             self.root.after(0, progress_window.destroy)
+            self.root.after(0, lambda: messagebox.showerror("Error", f"Could not search for duplicates: {str(e)}"))
+
+    def show_duplicates(self, folder, finder, groups):
+        theme = self.themes[self.current_theme]
+        wasted = sum(size * (len(paths) - 1) for size, paths in groups)
+        read_share = finder.bytes_read / finder.total_bytes * 100 if finder.total_bytes else 0
+        self.update_status(f"Found {len(groups)} groups of duplicates in {folder}")
+        
+        window = tk.Toplevel(self.root)
+        window.title("Duplicate Files")
+        window.geometry("700x500")
+        window.configure(bg=theme["background"])
+        
+        summary = (f"{len(groups)} groups of identical files, {self.format_size(wasted)} in extra copies\n"
+                   f"Searched {finder.files} files ({self.format_size(finder.total_bytes)}), "
+                   f"read {self.format_size(finder.bytes_read)} ({read_share:.1f}%)")
+        tk.Label(window, text=summary, font=("Segoe UI", 10), justify=tk.LEFT,
+               bg=theme["background"], fg=theme["text"]).pack(anchor=tk.W, padx=20, pady=(15, 10))
+        
+        # One row per group, its files below it
+        tree_frame = tk.Frame(window, bg=theme["background"])
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=20)
+        tree = ttk.Treeview(tree_frame, show="tree")
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        for size, paths in groups:
+            group = tree.insert("", tk.END, text=f"{len(paths)} copies of {self.format_size(size)}", open=True)
+            for path in paths:
+                tree.insert(group, tk.END, text=path, values=(path,))
+        
+        def delete_selected():
+            paths = [tree.item(item, "values")[0] for item in tree.selection() if tree.item(item, "values")]
+            if not paths:
+                messagebox.showinfo("Info", "Select the copies to delete", parent=window)
+                return
+            if not messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete {len(paths)} files?",
+                                       parent=window):
+                return
+            failed = 0
+            for item in tree.selection():
+                if not tree.item(item, "values"):
+                    continue
+                try:
+                    os.remove(tree.item(item, "values")[0])
+                    tree.delete(item)
+                except OSError:
+                    failed += 1
+            if failed:
+                messagebox.showwarning("Warning", f"{failed} files could not be deleted", parent=window)
+            # The watcher reports the deletions itself; otherwise reload
+            if not self.watcher.available:
+                self.load_directory(self.current_dir)
+        
+        button_frame = tk.Frame(window, bg=theme["background"], pady=15)
+        button_frame.pack(fill=tk.X)
+        tk.Button(button_frame, text="Delete Selected", font=("Segoe UI", 10), bg=theme["danger"], fg="white",
+                bd=0, padx=15, pady=8, command=delete_selected).pack(side=tk.LEFT, padx=(20, 8))
+        tk.Button(button_frame, text="Close", font=("Segoe UI", 10), bg=theme["primary"], fg="white",
+                bd=0, padx=15, pady=8, command=window.destroy).pack(side=tk.RIGHT, padx=(0, 20))
+
+    def show_content_search(self):
+        if self.content_index is None:
+            messagebox.showinfo("Search Contents", "Content search is unavailable: the index could not be opened")
+            return
+        theme = self.themes[self.current_theme]
+        window = tk.Toplevel(self.root)
+        window.title("Search Contents")
+        window.geometry("700x500")
+        window.configure(bg=theme["background"])
+        
+        query_var = tk.StringVar()
+        query_frame = tk.Frame(window, bg=theme["background"])
+        query_frame.pack(fill=tk.X, padx=20, pady=(15, 5))
+        query_entry = ttk.Entry(query_frame, textvariable=query_var)
+        query_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 8))
+        query_entry.focus_set()
+        
+        def index_folder():
+            folder = filedialog.askdirectory(title="Select a Folder Tree to Index", initialdir=self.current_dir,
+                                             parent=window)
+            if folder:
+                self.content_index.enqueue(folder, recursive=True)
+        
+        ttk.Button(query_frame, text="Index Folder Tree...", command=index_folder).pack(side=tk.LEFT)
+        
+        status_label = tk.Label(window, text="", font=("Segoe UI", 9), anchor=tk.W,
+                                bg=theme["background"], fg=theme["text_secondary"])
+        status_label.pack(fill=tk.X, padx=20)
+        
+        # Ranked matches, best first, with the selected file's best passage below
+        tree_frame = tk.Frame(window, bg=theme["background"])
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(5, 0))
+        tree = ttk.Treeview(tree_frame, show="tree", selectmode="browse")
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        snippet_label = tk.Label(window, text="", font=("Segoe UI", 10), justify=tk.LEFT, anchor=tk.W,
+                                 wraplength=640, bg=theme["background"], fg=theme["text"])
+        snippet_label.pack(fill=tk.X, padx=20, pady=10)
+        
+        state = {"after": None, "query": ""}
+        
+        def run_query():
+            state["after"] = None
+            state["query"] = query_var.get().strip()
+            tree.delete(*tree.get_children())
+            snippet_label.config(text="")
+            try:
+                matches = self.content_index.search(state["query"])
+            except sqlite3.Error as e:
+                status_label.config(text=f"Search failed: {str(e)}")
+                return
+            for path, _ in matches:
+                tree.insert("", tk.END, text=path, values=(path,))
+            if state["query"]:
+                status_label.config(text=f"{len(matches)} best matches" if matches else "No matches")
+        
+        def on_key(event):
+            # Search once typing pauses
+            if state["after"] is not None:
+                window.after_cancel(state["after"])
+            state["after"] = window.after(SEARCH_DEBOUNCE_MS, run_query)
+        
+        def on_select(event):
+            selection = tree.selection()
+            if selection:
+                path = tree.item(selection[0], "values")[0]
+                snippet_label.config(text=self.content_index.snippet(path, state["query"]) or "")
+        
+        def open_selected(event=None):
+            selection = tree.selection()
+            if selection:
+                path = tree.item(selection[0], "values")[0]
+                self.open_file({"name": os.path.basename(path), "path": path, "is_dir": False})
+        
+        def poll_status():
+            # Show indexing progress while the window is open
+            if not window.winfo_exists():
+                return
+            folder, indexed, waiting = self.content_index.status()
+            if folder is not None and not state["query"]:
+                status_label.config(text=f"Indexing {folder}... {indexed} files indexed, "
+                                         f"{waiting} folders waiting")
+            elif not state["query"]:
+                status_label.config(text=f"{indexed} files indexed this session")
+            window.after(500, poll_status)
+        
+        query_entry.bind("<KeyRelease>", on_key)
+        tree.bind("<<TreeviewSelect>>", on_select)
+        tree.bind("<Double-1>", open_selected)
+        poll_status()
+        
+        button_frame = tk.Frame(window, bg=theme["background"], pady=15)
+        button_frame.pack(fill=tk.X)
+        tk.Button(button_frame, text="Open", font=("Segoe UI", 10), bg=theme["primary"], fg="white",
+                bd=0, padx=15, pady=8, command=open_selected).pack(side=tk.LEFT, padx=(20, 8))
+        tk.Button(button_frame, text="Close", font=("Segoe UI", 10), bg=theme["primary"], fg="white",
+                bd=0, padx=15, pady=8, command=window.destroy).pack(side=tk.RIGHT, padx=(0, 20))
+
+    def organize_by_date(self):
+        self.plan_organization("date")
 
     def organize_by_type(self):
+        self.plan_organization("type")
+
+    def plan_organization(self, mode):
+        if self.search_query is not None:
+            messagebox.showinfo("Organize", "Clear the search to organize the current folder.")
+            return
+        
         # Ask for destination
         destination = filedialog.askdirectory(title="Select Destination Folder (leave empty to organize in place)")
         if destination == "":
             destination = self.current_dir
         
-        # Confirm organization
-        if not messagebox.askyesno("Confirm Organization", 
-                                  f"Are you sure you want to organize files by type in {destination}?"):
+        # Offer to finish an interrupted run into the same destination first
+        state = read_journal(journal_path_for(destination))
+        if state and not state["end"] and state["plan"]:
+            resume = messagebox.askyesnocancel(
+                "Resume Organization",
+                f"A previous organization into {destination} was interrupted after "
+                f"{len(state['done'])} of {len(state['plan'])} files.\n"
+                f"Resume it? Choose No to plan a new run instead.")
+            if resume is None:
+                return
+            if resume:
+                self.execute_plan(state["header"], resume_operations(state), resume=True)
+                return
+        
+        # Plan from the listing we already have instead of walking the directory again
+        try:
+            plan = plan_organize(self.files, self.current_dir, destination, mode, self.organize_move.get(),
+                                 self.organize_verify.get(), self.hash_cache)
+            self.flush_hash_cache()
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not plan organization: {str(e)}")
+            return
+        self.show_plan_summary(plan)
+
+    def open_saved_plan(self):
+        plans_dir = os.path.join(user_cache_dir(), "plans")
+        path = filedialog.askopenfilename(title="Open Organize Plan", initialdir=plans_dir,
+                                          filetypes=[("Organize plans", "*.json"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            plan = refresh_plan_conflicts(load_plan(path), self.hash_cache)
+            self.flush_hash_cache()
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not open plan: {str(e)}")
+            return
+        self.show_plan_summary(plan)
+
+    def save_plan_as(self, plan):
+        plans_dir = os.path.join(user_cache_dir(), "plans")
+        os.makedirs(plans_dir, exist_ok=True)
+        default_name = datetime.datetime.fromtimestamp(plan["created"]).strftime(f"%Y%m%d-%H%M%S-{plan['mode']}.json")
+        path = filedialog.asksaveasfilename(title="Save Organize Plan", initialdir=plans_dir,
+                                            initialfile=default_name, defaultextension=".json",
+                                            filetypes=[("Organize plans", "*.json")])
+        if not path:
+            return
+        try:
+            save_plan(plan, path)
+            self.update_status(f"Saved plan to {path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not save plan: {str(e)}")
+
+    def show_plan_summary(self, plan):
+        summary = plan_summary(plan)
+        theme = self.themes[self.current_theme]
+        
+        # Create summary window
+        summary_window = tk.Toplevel(self.root)
+        summary_window.title("Organize Plan")
+        summary_window.geometry("450x390")
+        summary_window.resizable(False, False)
+        summary_window.configure(bg=theme["background"])
+        
+        # Add a modern header
+        header_frame = tk.Frame(summary_window, bg=theme["primary"], height=60)
+        header_frame.pack(fill=tk.X)
+        
+        header_label = tk.Label(header_frame, text=f"Organize by {plan['mode'].capitalize()}",
+                              font=("Segoe UI", 16, "bold"), bg=theme["primary"], fg="white")
+        header_label.pack(pady=15)
+        
+        # Plan content
+        content_frame = tk.Frame(summary_window, bg=theme["background"], padx=20, pady=20)
+        content_frame.pack(fill=tk.BOTH, expand=True)
+        
+        action = "Move" if plan["move"] else "Copy"
+        rows = [
+            ("Destination:", plan["destination"]),
+            ("Files:", f"{summary['files']} ({action.lower()}): {summary['new']} new, "
+                       f"{summary['updates']} updated"),
+            ("Data to write:", self.format_size(summary["bytes"])),
+            ("Renames:", str(summary["renames"])),
+            ("Folders:", str(summary["folders"])),
+            ("Unchanged:", f"{summary['unchanged']} already up to date, "
+                           f"{'sources removed' if plan['move'] else 'skipped'}"),
+            ("Skipped:", f"{summary['conflicts']} duplicate names")
+        ]
+        for row, (label, value) in enumerate(rows):
+            tk.Label(content_frame, text=label, font=("Segoe UI", 10, "bold"),
+                   bg=theme["background"], fg=theme["text"]).grid(row=row, column=0, sticky=tk.W, pady=4)
+            tk.Label(content_frame, text=value, font=("Segoe UI", 10), wraplength=280, justify=tk.LEFT,
+                   bg=theme["background"], fg=theme["text"]).grid(row=row, column=1, sticky=tk.W, pady=4)
+        
+        # Button frame
+        button_frame = tk.Frame(summary_window, bg=theme["background"], pady=15)
+        button_frame.pack(fill=tk.X)
+        
+        def run():
+            summary_window.destroy()
+            self.execute_plan(plan)
+        
+        run_button = tk.Button(button_frame, text="Run", font=("Segoe UI", 10),
+                             bg=theme["success"], fg="white", bd=0, padx=15, pady=8, command=run,
+                             state=tk.NORMAL if summary["files"] else tk.DISABLED)
+        run_button.pack(side=tk.LEFT, padx=(20, 8))
+        
+        save_button = tk.Button(button_frame, text="Save Plan...", font=("Segoe UI", 10),
+                              bg=theme["primary"], fg="white", bd=0, padx=15, pady=8,
+                              command=lambda: self.save_plan_as(plan))
+        save_button.pack(side=tk.LEFT)
+        
+        cancel_button = tk.Button(button_frame, text="Cancel", font=("Segoe UI", 10),
+                                bg=theme["danger"], fg="white", bd=0, padx=15, pady=8,
+                                command=summary_window.destroy)
+        cancel_button.pack(side=tk.RIGHT, padx=(0, 20))
+
+    def undo_organization(self):
+        destination = filedialog.askdirectory(title="Select the Organized Folder to Undo", initialdir=self.current_dir)
+        if not destination:
+            return
+        path = journal_path_for(destination)
+        state = read_journal(path)
+        if state is None:
+            messagebox.showinfo("Info", f"No organization of {destination} was recorded")
+            return
+        if state["end"] == "undone":
+            messagebox.showinfo("Info", f"The last organization of {destination} was already undone")
             return
         
+        count = len([i for i in state["done"] if i not in state["undone"]])
+        action = "moved back" if state["header"]["move"] else "deleted"
+        if not messagebox.askyesno("Confirm Undo",
+                                   f"Undo the last organization of {destination}?\n"
+                                   f"{count} organized files will be {action}."):
+            return
+        
+        self.update_status("Undoing organization...")
+        threading.Thread(target=self._undo_organization_thread, args=(path, state), daemon=True).start()
+
+    def _undo_organization_thread(self, path, state):
+        destination = state["header"]["destination"]
+        try:
+            failed = undo_journal(path, state)
+            if failed:
+                self.root.after(0, lambda: messagebox.showwarning("Warning", f"{failed} files could not be restored"))
+            self.root.after(0, lambda: self.update_status(f"Undid organization of {destination}"))
+            self.root.after(0, lambda: self.refresh_after_organize(destination, state["header"]["move"]))
+        except Exception as e:
+            self.root.after(0, lambda: messagebox.showerror("Error", f"Could not undo organization: {str(e)}"))
+
+    def execute_plan(self, plan, operations=None, resume=False):
         # Organize files
         try:
-            self.update_status("Organizing files by type...")
+            self.update_status(f"Organizing files by {plan['mode']}...")
             self.cancel_operation = False
             
             # Create progress window
@@ -1068,78 +2707,131 @@ class FileOrganizerApp:
                                     command=lambda: self.cancel_organization(progress_window))
             cancel_button.pack()
             
-            # Start organizing in a separate thread
-            threading.Thread(target=self._organize_by_type_thread, 
-                            args=(destination, progress_window, progress_label, progress_bar), 
+            # Progress is measured in bytes written plus one unit per file, so
+            # renames (no data) still move the bar and the ETA stays accurate
+            if operations is None:
+                operations = execution_order(plan)
+            total_units = sum(o["bytes"] for o in operations) + len(operations)
+            progress_bar["maximum"] = max(total_units, 1)
+            progress = OrganizeProgress(len(operations), total_units)
+            
+            # Start organizing in a separate thread and poll its progress
+            threading.Thread(target=self._execute_plan_thread, 
+                            args=(plan, operations, progress, progress_window, resume), 
                             daemon=True).start()
+            self.poll_organize_progress(progress, progress_window, progress_label, progress_bar)
             
         except Exception as e:
             messagebox.showerror("Error", f"Could not organize files: {str(e)}")
 
-    def _organize_by_type_thread(self, destination, progress_window, progress_label, progress_bar):
+    def cancel_organization(self, progress_window):
+        self.cancel_operation = True
+        self.update_status("Organization cancelled")
+        progress_window.destroy()
+
+    def format_eta(self, seconds):
+        seconds = int(seconds)
+        if seconds >= 3600:
+            return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+        return f"{seconds // 60}:{seconds % 60:02d}"
+
+    def poll_organize_progress(self, progress, progress_window, progress_label, progress_bar):
+        # Refresh the progress window from the worker's counters, then check again shortly
+        if not progress_window.winfo_exists():
+            return
+        done_files, name, done_units, rate, eta, finished = progress.snapshot()
+        if done_files:
+            progress_label.config(text=f"Organizing {done_files}/{progress.total_files}: {name}\n"
+                                       f"{self.format_size(int(rate))}/s, {self.format_eta(eta)} left")
+        progress_bar.config(value=done_units)
+        if not finished:
+            self.root.after(PROGRESS_POLL_MS, self.poll_organize_progress, progress, progress_window,
+                            progress_label, progress_bar)
+
+    def _execute_plan_thread(self, plan, operations, progress, progress_window, resume=False):
+        destination = plan["destination"]
+        journal = None
         try:
-            # Get files to organize
-            files_to_organize = [f for f in self.files if not f["is_dir"]]
-            total_files = len(files_to_organize)
+            total_files = len(operations)
+            
+            # Journal the run before touching anything, so it can be resumed or undone
+            path = journal_path_for(destination)
+            if resume:
+                journal = OrganizeJournal(path, append=True)
+            else:
+                journal = start_journal(path, plan, operations)
             
-            # Update progress bar
-            progress_bar["maximum"] = total_files
+            # Create every target folder once, up front
+            for folder in {os.path.dirname(o["target"]) for o in operations}:
+                os.makedirs(folder, exist_ok=True)
             
-            # Organize files by type
-            for i, file_info in enumerate(files_to_organize):
-                # Check if operation was cancelled
+            skipped = 0
+            failed = 0
+            updated = 0
+            
+            for operation in operations:
+                # Check if operation was cancelled; checked before every file,
+                # so cancelling takes effect as soon as the current file is done
                 if self.cancel_operation:
                     return
                 
-                # Get file extension
-                _, ext = os.path.splitext(file_info["name"])
-                ext = ext.lower()
-                
-                # Determine category folder
-                category = "Others"
-                for cat, extensions in self.file_categories.items():
-                    if ext in extensions:
-                        category = cat
-                        break
-                
-                # Create category folder
-                category_path = os.path.join(destination, category)
-                os.makedirs(category_path, exist_ok=True)
-                
-                # Copy file to category folder
-                dest_path = os.path.join(category_path, file_info["name"])
-                
-                # Skip if destination already exists
-                if os.path.exists(dest_path):
-                    continue
-                
-                # Copy file
-                shutil.copy2(file_info["path"], dest_path)
-                
-                # Update progress
-                self.root.after(0, lambda i=i, name=file_info["name"]: 
-                               progress_label.config(text=f"Organizing {i+1}/{total_files}: {name}"))
-                self.root.after(0, lambda i=i: progress_bar.step(1))
-                
-                # Small delay to make cancellation more responsive
-                time.sleep(0.01)
+                written = 0
+                target_exists = os.path.lexists(operation["target"])
+                if resume and operation["op"] != "copy" and target_exists and not os.path.lexists(operation["source"]):
+                    # Finished before the interruption, but not yet journaled
+                    journal.write({"done": operation["index"]})
+                elif target_exists and operation.get("status") == "unchanged":
+                    # Moving onto an up-to-date target only removes the source
+                    try:
+                        os.remove(operation["source"])
+                        journal.write({"done": operation["index"]})
+                    except OSError:
+                        failed += 1
+                elif (target_exists and operation.get("status") != "update"
+                      and not (resume and operation["op"] != "rename")):
+                    # The disk changed since the plan was made. A resumed copy
+                    # is redone instead, as it may have been cut short.
+                    skipped += 1
+                else:
+                    try:
+                        place_file(operation["source"], operation["target"], plan["move"],
+                                   operation["op"] == "rename")
+                        journal.write({"done": operation["index"]})
+                        written = operation["bytes"]
+                        if operation.get("status") == "update":
+                            updated += 1
+                    except OSError:
+                        failed += 1
+                progress.advance(os.path.basename(operation["source"]), operation["bytes"] + 1, written)
+            
+            if not failed:
+                journal.write({"end": "completed"}, sync=True)
             
             # Close progress window
             self.root.after(0, progress_window.destroy)
             
             # Show success message
-            self.root.after(0, lambda: messagebox.showinfo("Success", f"Files organized by type in {destination}"))
+            organized = total_files - skipped - failed
+            message = f"Organized {organized} files by {plan['mode']} in {destination}"
+            if updated:
+                message += f"\n{organized - updated} new, {updated} updated"
+            if skipped or failed:
+                message += f"\n{skipped} skipped, {failed} failed"
+            self.root.after(0, lambda: messagebox.showinfo("Success", message))
             
             # Refresh if organizing in current directory
-            if destination == self.current_dir:
-                self.root.after(0, lambda: self.load_directory(self.current_dir))
+            self.root.after(0, lambda: self.refresh_after_organize(destination, plan["move"]))
             
             # Update status
-            self.root.after(0, lambda: self.update_status(f"Organized {total_files} files by type"))
+            self.root.after(0, lambda: self.update_status(f"Organized {organized} files by {plan['mode']}"))
             
         except Exception as e:
             self.root.after(0, lambda: messagebox.showerror("Error", f"Could not organize files: {str(e)}"))
             self.root.after(0, progress_window.destroy)
+        finally:
+            if journal is not None:
+                journal.close()
+            progress.finish()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,66 @@
+import os
+import sys
+import ctypes
+import shutil
+import subprocess
+import importlib.util
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_SOURCE = os.path.join(ROOT, "Os main project ", "file_organizer_backend.cpp")
+STANDALONE_SOURCE = os.path.join(ROOT, "os project -2", "organizer_v1_05.py")
+
+sys.path.insert(0, ROOT)
+
+
+class OrganizeCounts(ctypes.Structure):
+    _fields_ = [("created", ctypes.c_ulonglong),
+                ("updated", ctypes.c_ulonglong),
+                ("unchanged", ctypes.c_ulonglong)]
+
+
+@pytest.fixture(scope="session")
+def standalone():
+    # organizer_v1_05 as a module; it imports Tk and Pillow at the top
+    pytest.importorskip("tkinter")
+    pytest.importorskip("PIL")
+    spec = importlib.util.spec_from_file_location("organizer_v1_05", STANDALONE_SOURCE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def backend(tmp_path_factory):
+    # The C++ backend built into a temporary directory, with the prototypes
+    # the tests call; skipped where there is no compiler
+    compiler = shutil.which("g++")
+    if compiler is None:
+        pytest.skip("g++ is needed to build the backend")
+    library = str(tmp_path_factory.mktemp("backend") / "file_organizer_backend.so")
+    result = subprocess.run([compiler, "-shared", "-fPIC", "-O2", "-o", library, BACKEND_SOURCE,
+                             "-std=c++17", "-pthread"], capture_output=True, text=True)
+    if result.returncode != 0:
+        pytest.fail(f"backend did not build:\n{result.stderr}")
+
+    lib = ctypes.CDLL(library)
+    lib.copy_file_with.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+    lib.copy_file_with.restype = ctypes.c_int
+    for kind in ("date", "type"):
+        organize = getattr(lib, f"organize_by_{kind}_progress")
+        organize.argtypes = [ctypes.c_char_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_void_p,
+                             ctypes.c_int, ctypes.c_void_p, ctypes.c_char_p, ctypes.POINTER(OrganizeCounts)]
+        organize.restype = ctypes.c_int
+        organize_recursive = getattr(lib, f"organize_by_{kind}_recursive")
+        organize_recursive.argtypes = [ctypes.c_char_p, ctypes.c_int, ctypes.POINTER(ctypes.c_char_p),
+                                       ctypes.POINTER(ctypes.c_char_p), ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                       ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p, ctypes.c_char_p,
+                                       ctypes.POINTER(OrganizeCounts)]
+        organize_recursive.restype = ctypes.c_int
+    lib.undo_organize.argtypes = [ctypes.c_char_p]
+    lib.undo_organize.restype = ctypes.c_int
+    lib.load_category_rules.argtypes = [ctypes.c_char_p]
+    lib.load_category_rules.restype = ctypes.c_int
+    lib.load_category_rules(None)
+    return lib
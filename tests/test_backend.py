@@ -0,0 +1,108 @@
+import os
+import ctypes
+import shutil
+
+from conftest import OrganizeCounts
+
+COPY_AUTO = -2
+COPY_REFLINK = 0
+COPY_BUFFERED = 3
+COPY_FAILED = -1
+ORGANIZE_OK = 0
+INCREMENTAL_METADATA = 1
+
+
+def listing(directory):
+    # Every file under directory, relative to it, as bytes
+    root = os.fsencode(directory)
+    return sorted(os.path.relpath(os.path.join(folder, name), root)
+                  for folder, _, names in os.walk(root) for name in names)
+
+
+def make_files(directory, names):
+    for name in names:
+        path = os.path.join(os.fsencode(directory), name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(name)
+
+
+def test_copy_file_with_copies_and_reports_its_strategy(backend, tmp_path):
+    source = tmp_path / "source.bin"
+    source.write_bytes(os.urandom(3 * 1024 * 1024 + 17))
+    for strategy in (COPY_AUTO, COPY_BUFFERED):
+        target = tmp_path / f"copy{strategy}.bin"
+        used = backend.copy_file_with(bytes(source), bytes(target), strategy)
+        assert used != COPY_FAILED and (strategy == COPY_AUTO or used == strategy)
+        assert target.read_bytes() == source.read_bytes()
+
+
+def test_copy_replaces_the_target_only_when_it_succeeds(backend, tmp_path):
+    # A reflink-only copy fails on filesystems without reflinks (tmpfs, ext4):
+    # the old target must survive that, and no temporary file may be left
+    source = tmp_path / "source.bin"
+    source.write_bytes(b"new content")
+    target = tmp_path / "target.bin"
+    target.write_bytes(b"old content")
+    if backend.copy_file_with(bytes(source), bytes(target), COPY_REFLINK) == COPY_FAILED:
+        assert target.read_bytes() == b"old content"
+    else:
+        assert target.read_bytes() == b"new content"
+    assert sorted(os.listdir(tmp_path)) == ["source.bin", "target.bin"]
+
+
+def test_organize_then_undo_restores_the_folder(backend, tmp_path):
+    folder = tmp_path / "folder"
+    names = [b"a.jpg", b"b.txt", b"bad\xff.mp3"]
+    make_files(folder, names)
+    journal = bytes(tmp_path / "organize.journal")
+    counts = OrganizeCounts()
+
+    assert backend.organize_by_type_progress(bytes(folder), 2, 1, 0, None, 100, None, journal,
+                                             ctypes.byref(counts)) == ORGANIZE_OK
+    assert listing(folder) == [b"Audio/bad\xff.mp3", b"Images/a.jpg", b"Text/b.txt"]
+    assert counts.created == 3
+
+    assert backend.undo_organize(journal) == ORGANIZE_OK
+    assert listing(folder) == sorted(names)
+    assert sorted(os.listdir(folder)) == ["a.jpg", "b.txt", os.fsdecode(b"bad\xff.mp3")]
+
+
+def test_undo_skips_malformed_journal_lines(backend, tmp_path):
+    folder = tmp_path / "folder"
+    make_files(folder, [b"a.jpg", b"b.txt"])
+    journal = tmp_path / "organize.journal"
+    assert backend.organize_by_type_progress(bytes(folder), 1, 0, 0, None, 100, None, bytes(journal),
+                                             None) == ORGANIZE_OK
+    with open(journal, "a") as f:
+        f.write('{"done": "\\uZZZZ"}\n{"plan": 9, "source": "\\ud800x"}\n{"undone": 1, "x": "\\u12')
+
+    assert backend.undo_organize(bytes(journal)) == ORGANIZE_OK
+    assert listing(folder) == [b"a.jpg", b"b.txt"]
+
+
+def test_moving_onto_up_to_date_targets_removes_the_sources(backend, tmp_path):
+    folder = tmp_path / "folder"
+    make_files(folder, [b"a.jpg", b"b.jpg"])
+    (folder / "Images").mkdir()
+    shutil.copy2(folder / "a.jpg", folder / "Images" / "a.jpg")
+    journal = bytes(tmp_path / "organize.journal")
+    counts = OrganizeCounts()
+
+    assert backend.organize_by_type_progress(bytes(folder), 1, 1, INCREMENTAL_METADATA, None, 100, None,
+                                             journal, ctypes.byref(counts)) == ORGANIZE_OK
+    assert (counts.created, counts.unchanged) == (1, 1)
+    assert listing(folder) == [b"Images/a.jpg", b"Images/b.jpg"]
+
+    assert backend.undo_organize(journal) == ORGANIZE_OK
+    assert listing(folder) == [b"Images/a.jpg", b"a.jpg", b"b.jpg"]
+
+
+def test_recursive_organize_keeps_subfolders_and_skips_hidden(backend, tmp_path):
+    folder = tmp_path / "folder"
+    make_files(folder, [b"a.jpg", b"trip/b.jpg", b"trip/notes.txt", b".git/config.txt"])
+    exclude = (ctypes.c_char_p * 2)(b".*", None)
+
+    assert backend.organize_by_type_recursive(bytes(folder), -1, None, exclude, 2, 1, 0, None, 100, None,
+                                              None, None) == ORGANIZE_OK
+    assert listing(folder) == [b".git/config.txt", b"Images/a.jpg", b"Images/trip/b.jpg", b"Text/trip/notes.txt"]
@@ -0,0 +1,188 @@
+import os
+import json
+import time
+
+import pytest
+
+from organizer_common import (DEFAULT_CATEGORY_RULES, OTHERS_CATEGORY, CategoryRules, ContentSniffer,
+                              DuplicateFinder, FileListing, HashCache, categorize, journal_path_for,
+                              make_file_record, parse_category_rules, read_journal, sniff_extension, walk_files)
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n" + b"\0" * 32
+
+
+@pytest.fixture
+def rules():
+    return CategoryRules(parse_category_rules(DEFAULT_CATEGORY_RULES))
+
+
+def write(path, data=b"x"):
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def test_default_rules_match_by_extension(rules):
+    assert rules.match("holiday.JPG") == "Images"
+    assert rules.match("notes.txt") == "Text"
+    assert rules.match("README") == OTHERS_CATEGORY
+    assert rules.match(".hidden") == OTHERS_CATEGORY
+
+
+def test_rules_apply_in_file_order_with_bounds():
+    rules = CategoryRules(parse_category_rules("""
+        # Big photos first, then camera names, then the rest by regex
+        Large: ext=.jpg size>1M
+        Camera: name=IMG_*
+        Reports: regex=^report-\\d{4}
+        Old: age>30d
+    """))
+    assert rules.match("a.jpg", size=2 * 1024 ** 2) == "Large"
+    assert rules.match("IMG_1.jpg", size=10) == "Camera"
+    assert rules.match("report-2024.pdf", modified=time.time()) == "Reports"
+    assert rules.match("report-x.pdf", modified=time.time() - 60 * 86400) == "Old"
+    assert rules.match("report-x.pdf", modified=time.time()) == OTHERS_CATEGORY
+
+
+@pytest.mark.parametrize("text, message", [
+    ("Images ext=.jpg", "line 1: expected"),
+    ("Images: colour=red", "unknown condition"),
+    ("Big: size>10Q", "unknown unit"),
+    ("Images: ext=.jpg ext=.png", "given twice"),
+    ("Bad: regex=(", "invalid regex"),
+    ("Bad: regex=a(?i)", "invalid regex"),
+])
+def test_invalid_rules_name_their_line(text, message):
+    with pytest.raises(ValueError, match=message):
+        parse_category_rules(text)
+
+
+def test_rule_errors_count_comment_and_blank_lines():
+    with pytest.raises(ValueError, match="^line 3: "):
+        parse_category_rules("# comment\n\nImages ext=.jpg")
+
+
+def test_sniffed_extension_only_counts_for_others(rules):
+    assert categorize("photo", rules, sniffed=".png") == "Images"
+    assert categorize("notes.txt", rules, sniffed=".png") == "Text"
+
+
+def test_sniff_extension(tmp_path):
+    assert sniff_extension(write(tmp_path / "a", PNG_HEADER)) == ".png"
+    assert sniff_extension(write(tmp_path / "b", b"%PDF-1.7")) == ".pdf"
+    assert sniff_extension(write(tmp_path / "c", b"plain text")) is None
+
+
+def test_content_sniffer_refines_records_left_in_others(tmp_path, rules):
+    pairs = []
+    for name, data in (("picture", PNG_HEADER), ("notes.txt", PNG_HEADER), ("unknown", b"???")):
+        path = str(write(tmp_path / name, data))
+        stats = os.stat(path)
+        pairs.append((make_file_record(name, path, stats, False, rules), stats))
+    sniffer = ContentSniffer(workers=2)
+    sniffer.refine(pairs, rules)
+    records = {record["name"]: record for record, _ in pairs}
+    assert (records["picture"]["sniffed"], records["picture"]["category"]) == (".png", "Images")
+    assert (records["notes.txt"]["sniffed"], records["notes.txt"]["category"]) == (None, "Text")
+    assert records["unknown"]["category"] == OTHERS_CATEGORY
+
+    # A second pass is served from the cache
+    os.remove(records["picture"]["path"])
+    records["picture"]["category"] = OTHERS_CATEGORY
+    sniffer.refine(pairs[:1], rules)
+    assert records["picture"]["category"] == "Images"
+
+
+def test_walk_files_handles_undecodable_names(tmp_path):
+    folder = os.path.join(os.fsencode(tmp_path), b"sub\xfe")
+    os.mkdir(folder)
+    write(os.path.join(folder, b"bad\xff.txt"), b"abc")
+    os.symlink(folder, os.path.join(os.fsencode(tmp_path), b"link"))
+    found = list(walk_files(str(tmp_path)))
+    assert [(os.fsencode(path), size) for path, size in found] == [(os.path.join(folder, b"bad\xff.txt"), 3)]
+
+
+def test_duplicate_finder_groups_identical_files(tmp_path):
+    big = os.urandom(20000)
+    for name, data in (("a", big), ("b", big), ("c", big[:-1] + b"!"), ("d", b"small"), ("e", b"small"),
+                       ("f", b"")):
+        write(tmp_path / name, data)
+    groups = DuplicateFinder(workers=2).find(walk_files(str(tmp_path)))
+    assert [(size, [os.path.basename(p) for p in paths]) for size, paths in groups] == [
+        (20000, ["a", "b"]), (5, ["d", "e"])]
+
+
+def test_duplicate_finder_reuses_cached_hashes(tmp_path):
+    data = os.urandom(20000)
+    write(tmp_path / "a", data)
+    write(tmp_path / "b", data)
+    cache = HashCache(str(tmp_path / "cache.db"))
+    try:
+        first = DuplicateFinder(workers=1, hash_cache=cache)
+        first.find(walk_files(str(tmp_path)))
+        assert first.snapshot()[4] > 0
+        second = DuplicateFinder(workers=1, hash_cache=cache)
+        assert len(second.find(walk_files(str(tmp_path)))) == 1
+        assert second.snapshot()[4] == 0
+    finally:
+        cache.close()
+
+
+def test_hash_cache_forgets_a_file_once_it_changes(tmp_path):
+    path = str(write(tmp_path / "a", b"one"))
+    cache = HashCache(str(tmp_path / "cache.db"))
+    try:
+        assert cache.digest(path, "full", lambda: "11") == ("11", True)
+        assert cache.digest(path, "full", lambda: "22") == ("11", False)
+        write(path, b"other")
+        os.utime(path, ns=(1, 1))
+        assert cache.digest(path, "full", lambda: "33") == ("33", True)
+    finally:
+        cache.close()
+
+
+def record(name, category="Text", size=0, modified=0.0):
+    return {"name": name, "path": "/x/" + name, "category": category, "size": size, "modified": modified}
+
+
+def test_file_listing_keeps_built_views_sorted():
+    listing = FileListing([record("b.txt", size=2), record("a.txt", size=3), record("c.jpg", "Images", 1)])
+    assert [f["name"] for f in listing.view("All", "Name (A-Z)")] == ["a.txt", "b.txt", "c.jpg"]
+    assert [f["name"] for f in listing.view("Text", "Size (Largest)")] == ["a.txt", "b.txt"]
+
+    listing.add(record("ab.txt", size=5))
+    listing.remove("/x/b.txt")
+    listing.add(record("a.txt", size=0))  # Replaces the record with the same path
+    assert [f["name"] for f in listing.view("All", "Name (A-Z)")] == ["a.txt", "ab.txt", "c.jpg"]
+    assert [f["name"] for f in listing.view("Text", "Size (Largest)")] == ["ab.txt", "a.txt"]
+    assert [f["name"] for f in listing.view("Images", "Name (Z-A)")] == ["c.jpg"]
+    assert listing.get("/x/b.txt") is None
+
+
+def test_read_journal_skips_torn_and_malformed_lines(tmp_path):
+    path = tmp_path / "journal"
+    source = os.fsdecode(b"/tmp/bad\xff.txt")
+    lines = [json.dumps({"journal": 1, "mode": "type", "move": True}),
+             json.dumps({"folder": "/tmp/Text"}),
+             json.dumps({"plan": 0, "op": "rename", "source": source, "target": "/tmp/Text/x", "bytes": 1},
+                        ensure_ascii=False),
+             json.dumps({"done": 0}),
+             '{"done": "\\uZZZZ"}',
+             json.dumps({"done": 0}),
+             '{"undone": 1, "x": "\\u12']
+    path.write_bytes("\n".join(lines).encode("utf-8", "surrogateescape"))
+    state = read_journal(str(path))
+    assert state["plan"][0]["source"] == source
+    assert state["plan"][0]["index"] == 0
+    assert state["folders"] == ["/tmp/Text"]
+    assert state["done"] == [0]
+    assert state["undone"] == set()
+    assert state["end"] is None
+    assert read_journal(str(tmp_path / "missing")) is None
+
+
+def test_journal_path_for_undecodable_destination(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    destination = os.fsdecode(b"/tmp/dir\xfe")
+    path = journal_path_for(destination)
+    assert path.startswith(str(tmp_path)) and path == journal_path_for(destination)
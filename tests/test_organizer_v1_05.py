@@ -0,0 +1,116 @@
+import os
+import shutil
+
+import pytest
+
+
+def undecodable(directory, name):
+    # A str path whose last part is not valid UTF-8 on disk
+    return os.fsdecode(os.path.join(os.fsencode(directory), name))
+
+
+@pytest.fixture
+def rules(standalone):
+    return standalone.CategoryRules(standalone.parse_category_rules(standalone.DEFAULT_CATEGORY_RULES))
+
+
+@pytest.mark.parametrize("text", ["plain", "café", undecodable("/tmp", b"bad\xff"), "\0", "\udcff\udcfe"])
+def test_db_text_round_trips(standalone, text):
+    stored = standalone.db_text(text)
+    stored.encode("utf-8")
+    assert standalone.from_db_text(stored) == text
+
+
+def test_metadata_index_keeps_undecodable_names(standalone, rules, tmp_path):
+    directory = undecodable(tmp_path, b"dir\xfe")
+    os.mkdir(directory)
+    for name in (b"bad\xff.txt", b"ok.jpg"):
+        open(os.path.join(os.fsencode(directory), name), "w").close()
+    files = [f for batch in standalone.scan_directory(directory, rules) for f in batch]
+
+    index = standalone.MetadataIndex(str(tmp_path / "metadata.db"))
+    try:
+        index.store(directory, os.stat(directory).st_mtime_ns, files)
+        mtime_ns, loaded = index.load(directory, rules)
+        assert mtime_ns == os.stat(directory).st_mtime_ns
+        assert sorted(f["path"] for f in loaded) == sorted(f["path"] for f in files)
+        assert all(os.path.exists(f["path"]) for f in loaded)
+        assert index.known_directories(str(tmp_path)) == [(directory, mtime_ns)]
+        found = [f["name"] for batch in index.search("bad", rules) for f in batch]
+        assert found == [os.path.basename(undecodable(tmp_path, b"bad\xff.txt"))]
+    finally:
+        index.close()
+
+
+def test_content_index_indexes_undecodable_names(standalone, tmp_path):
+    folder = tmp_path / "docs"
+    folder.mkdir()
+    with open(os.path.join(os.fsencode(folder), b"bad\xff.txt"), "w") as f:
+        f.write("zebra giraffe")
+    (folder / "good.txt").write_text("zebra lion")
+
+    index = standalone.ContentIndex(str(tmp_path / "content.db"))
+    try:
+        assert index.index_folder(str(folder)) == 2
+        assert index.index_folder(str(folder)) == 0
+        paths = sorted(path for path, _ in index.search("zebra"))
+        assert all(os.path.exists(path) for path in paths) and len(paths) == 2
+        assert "giraffe" in index.snippet(undecodable(folder, b"bad\xff.txt"), "giraffe")
+    finally:
+        index.close()
+
+
+def make_records(standalone, rules, directory):
+    return [f for batch in standalone.scan_directory(str(directory), rules) for f in batch]
+
+
+def test_plan_skips_up_to_date_targets_when_copying(standalone, rules, tmp_path):
+    (tmp_path / "a.jpg").write_text("same")
+    (tmp_path / "Images").mkdir()
+    shutil.copy2(tmp_path / "a.jpg", tmp_path / "Images" / "a.jpg")
+    (tmp_path / "b.jpg").write_text("new")
+    files = [f for f in make_records(standalone, rules, tmp_path) if not f["is_dir"]]
+
+    plan = standalone.plan_organize(files, str(tmp_path), str(tmp_path), "type")
+    summary = standalone.plan_summary(plan)
+    assert (summary["files"], summary["new"], summary["unchanged"]) == (1, 1, 1)
+
+    plan = standalone.plan_organize(files, str(tmp_path), str(tmp_path), "type", move=True)
+    summary = standalone.plan_summary(plan)
+    assert (summary["files"], summary["new"], summary["unchanged"]) == (2, 1, 1)
+    unchanged = [o for o in plan["operations"] if o["status"] == "unchanged"]
+    assert [os.path.basename(o["source"]) for o in unchanged] == ["a.jpg"]
+    assert unchanged[0]["conflict"] is None and unchanged[0]["bytes"] == 0
+
+
+def test_undo_journal_restores_moved_and_removed_sources(standalone, rules, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "a.jpg").write_text("same")
+    (source / "Images").mkdir()
+    shutil.copy2(source / "a.jpg", source / "Images" / "a.jpg")
+    with open(os.path.join(os.fsencode(source), b"bad\xff.txt"), "w") as f:
+        f.write("text")
+    files = [f for f in make_records(standalone, rules, source) if not f["is_dir"]]
+    plan = standalone.plan_organize(files, str(source), str(source), "type", move=True)
+    operations = standalone.execution_order(plan)
+
+    # Run the plan the way the organize thread does
+    path = standalone.journal_path_for(str(source))
+    journal = standalone.start_journal(path, plan, operations)
+    for operation in operations:
+        os.makedirs(os.path.dirname(operation["target"]), exist_ok=True)
+        if operation["status"] == "unchanged":
+            os.remove(operation["source"])
+        else:
+            standalone.place_file(operation["source"], operation["target"], move=True)
+        journal.write({"done": operation["index"]})
+    journal.close()
+    assert sorted(os.listdir(os.fsencode(source))) == [b"Images", b"Text"]
+
+    state = standalone.read_journal(path)
+    assert standalone.undo_journal(path, state) == 0
+    assert sorted(os.listdir(os.fsencode(source))) == [b"Images", b"a.jpg", b"bad\xff.txt"]
+    assert os.listdir(source / "Images") == ["a.jpg"]
+    assert standalone.read_journal(path)["end"] == "undone"